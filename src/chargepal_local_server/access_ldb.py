@@ -1,18 +1,34 @@
 #!/usr/bin/env python3
-from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from types import TracebackType
 from datetime import datetime, timedelta
+from chargepal_local_server.connection_pool import ConnectionPool
+from chargepal_local_server.parsing import parse_any
 from chargepal_local_server.pdb_interfaces import to_str
+from chargepal_local_server.sqlite_connection import connect
 import mysql.connector
 import mysql.connector.cursor
 import os
-import re
 import sqlite3
 import yaml
 
 
 SQLITE_DB_FILEPATH = os.path.join(os.path.dirname(__file__), "db/ldb.db")
 MYSQL_CONFIG_FILEPATH = os.path.expanduser("~/.my.cnf")
+# Call this before each statement executed with a pooled access if set,
+#  see use_statement_listener().
+statement_listener: Optional[Callable[[], None]] = None
 
 
 ALL_BOOKING_HEADERS = (
@@ -76,52 +92,79 @@ def time_str(
     return "{0:02d}:{1:02d}:{2:02d}".format(hours, minutes, seconds)
 
 
-def parse_any(obj: object) -> object:
-    """Parse any str into its supported object type."""
-    if isinstance(obj, str):
-        if re.match(r"(\d+)-(\d+)-(\d+) (\d+):(\d+):(\d+)$", obj):
-            return datetime.strptime(obj, "%Y-%m-%d %H:%M:%S")
-        if re.match(r"(\d+):(\d+):(\d+)$", obj):
-            hours_str, minutes_str, seconds_str = obj.split(":")
-            return timedelta(
-                hours=float(hours_str),
-                minutes=float(minutes_str),
-                seconds=float(seconds_str),
-            )
-        if obj.isnumeric() and not obj.startswith("0"):
-            return float(obj) if "." in obj else int(obj)
-    return obj
+def connect_sqlite() -> sqlite3.Connection:
+    # Note: The pool uses each connection only in its own thread, except for closing it.
+    return connect(SQLITE_DB_FILEPATH, check_same_thread=False)
 
 
-class SQLite3Access:
-    def __init__(self) -> None:
-        self.connection = sqlite3.connect(SQLITE_DB_FILEPATH)
-        self.cursor = self.connection.cursor()
+def is_sqlite_alive(connection: sqlite3.Connection) -> bool:
+    connection.execute("SELECT 1;").close()
+    return True
 
-    def __enter__(self) -> sqlite3.Cursor:
-        return self.cursor
 
-    def __exit__(
-        self,
-        exception_type: Type[BaseException],
-        exception_value: BaseException,
-        traceback: TracebackType,
-    ) -> None:
-        self.connection.commit()
-        self.connection.close()
+def connect_mysql() -> mysql.connector.MySQLConnection:
+    return mysql.connector.connect(
+        read_default_file=MYSQL_CONFIG_FILEPATH,
+        host="localhost",
+        database="LSV0002_DB",
+    )
+
+
+def is_mysql_alive(connection: mysql.connector.MySQLConnection) -> bool:
+    return connection.is_connected()
+
+
+sqlite_pool = ConnectionPool(connect_sqlite, is_sqlite_alive)
+mysql_pool = ConnectionPool(connect_mysql, is_mysql_alive)
+
+
+def use_statement_listener(listener: Optional[Callable[[], None]]) -> None:
+    """Call listener before each statement executed with a pooled access."""
+    global statement_listener
+    statement_listener = listener
+
+
+class ListenedCursor:
+    """Cursor calling listener before each execution, delegating all else."""
+
+    def __init__(self, cursor: Any, listener: Callable[[], None]) -> None:
+        self.cursor = cursor
+        self.listener = listener
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        self.listener()
+        return self.cursor.execute(*args, **kwargs)
 
+    def executemany(self, *args: Any, **kwargs: Any) -> Any:
+        self.listener()
+        return self.cursor.executemany(*args, **kwargs)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.cursor)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.cursor, name)
+
+
+class PooledAccess:
+    """
+    Provide a cursor of the current thread's pooled connection,
+    and commit on exit of the outermost block using it in this thread,
+    so that nested blocks do not commit unfinished writes of outer ones.
+    Discard the connection if it failed.
+    """
+
+    pool: ConnectionPool
+    connection_errors: Tuple[Type[BaseException], ...] = ()
 
-class MySQLAccess:
     def __init__(self) -> None:
-        self.connection = mysql.connector.connect(
-            read_default_file=MYSQL_CONFIG_FILEPATH,
-            host="localhost",
-            database="LSV0002_DB",
+        self.connection: Any = self.pool.enter()
+        self.cursor: Any = self.connection.cursor()
+        listener = statement_listener
+        # Note: Only wrap the cursor while statements are listened to.
+        self.listened_cursor: Any = (
+            self.cursor if listener is None else ListenedCursor(self.cursor, listener)
         )
-        self.cursor = self.connection.cursor()
-
-    def __enter__(self) -> mysql.connector.cursor.MySQLCursor:
-        return self.cursor
 
     def __exit__(
         self,
@@ -129,8 +172,37 @@ class MySQLAccess:
         exception_value: BaseException,
         traceback: TracebackType,
     ) -> None:
-        self.connection.commit()
-        self.connection.close()
+        outermost = self.pool.exit()
+        try:
+            self.cursor.close()
+            if outermost:
+                self.connection.commit()
+        except self.connection_errors:
+            self.pool.discard()
+            if exception_value is None:
+                raise
+        else:
+            if isinstance(exception_value, self.connection_errors):
+                self.pool.discard()
+
+
+class SQLite3Access(PooledAccess):
+    pool = sqlite_pool
+    connection_errors = (sqlite3.DatabaseError, sqlite3.ProgrammingError)
+
+    def __enter__(self) -> sqlite3.Cursor:
+        return self.listened_cursor
+
+
+class MySQLAccess(PooledAccess):
+    pool = mysql_pool
+    connection_errors = (
+        mysql.connector.errors.InterfaceError,
+        mysql.connector.errors.OperationalError,
+    )
+
+    def __enter__(self) -> mysql.connector.cursor.MySQLCursor:
+        return self.listened_cursor
 
     @staticmethod
     def is_configured() -> bool:
@@ -143,6 +215,20 @@ class LDB:
         """Return a MySQLAccess if the MySQL config file exists, else a SQLite3Access."""
         return MySQLAccess() if MySQLAccess.is_configured() else SQLite3Access()
 
+    @staticmethod
+    def get_pool_statistics() -> Dict[str, Dict[str, int]]:
+        """Return usage statistics of the SQLite and MySQL connection pools."""
+        return {
+            "sqlite": sqlite_pool.get_statistics(),
+            "mysql": mysql_pool.get_statistics(),
+        }
+
+    @staticmethod
+    def close_connections() -> None:
+        """Close all pooled connections, e.g. before replacing the ldb file."""
+        sqlite_pool.close_all()
+        mysql_pool.close_all()
+
     @classmethod
     def fetch_by_first_header(
         cls, table: str, headers: Iterable[str]
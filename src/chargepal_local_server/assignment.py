@@ -0,0 +1,74 @@
+"""Min-cost assignment of rows to columns of a cost matrix"""
+
+from typing import List, Tuple
+import numpy as np
+
+
+def solve_assignment(costs: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Return list of (row, column) pairs which assign each row to at most one column
+    and vice versa with minimum total cost. As many pairs as possible are assigned,
+    except for pairs with infinite cost.
+
+    Uses the Hungarian method with potentials, vectorized over columns,
+    in O(rows * rows * columns).
+    """
+    costs = np.asarray(costs, dtype=float)
+    if costs.ndim != 2 or costs.size == 0:
+        return []
+    transposed = costs.shape[0] > costs.shape[1]
+    if transposed:
+        costs = costs.T
+    feasible = np.isfinite(costs)
+    if not feasible.any():
+        return []
+    # Replace infinite costs by a cost higher than any feasible assignment.
+    finite_costs = np.where(feasible, costs, 0.0)
+    penalty = (np.abs(finite_costs).max() + 1.0) * (costs.shape[0] + 1)
+    finite_costs[~feasible] = penalty
+
+    row_count, column_count = finite_costs.shape
+    # Use index 0 as a virtual column to start augmenting paths from.
+    row_potentials = np.zeros(row_count + 1)
+    column_potentials = np.zeros(column_count + 1)
+    column_rows = np.zeros(column_count + 1, dtype=int)
+    previous_columns = np.zeros(column_count + 1, dtype=int)
+    for row in range(1, row_count + 1):
+        column_rows[0] = row
+        current_column = 0
+        min_slacks = np.full(column_count + 1, np.inf)
+        used = np.zeros(column_count + 1, dtype=bool)
+        while True:
+            used[current_column] = True
+            current_row = column_rows[current_column]
+            free = ~used[1:]
+            slacks = (
+                finite_costs[current_row - 1]
+                - row_potentials[current_row]
+                - column_potentials[1:]
+            )
+            improved = free & (slacks < min_slacks[1:])
+            min_slacks[1:][improved] = slacks[improved]
+            previous_columns[1:][improved] = current_column
+            candidates = np.where(free, min_slacks[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            used_columns = np.flatnonzero(used)
+            row_potentials[column_rows[used_columns]] += delta
+            column_potentials[used_columns] -= delta
+            min_slacks[1:][free] -= delta
+            current_column = next_column
+            if column_rows[current_column] == 0:
+                break
+        # Augment along the path of previous columns.
+        while current_column:
+            previous_column = previous_columns[current_column]
+            column_rows[current_column] = column_rows[previous_column]
+            current_column = previous_column
+
+    pairs: List[Tuple[int, int]] = []
+    for column in range(1, column_count + 1):
+        row = column_rows[column]
+        if row and feasible[row - 1, column - 1]:
+            pairs.append((column - 1, row - 1) if transposed else (row - 1, column - 1))
+    return sorted(pairs)
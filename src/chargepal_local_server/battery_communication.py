@@ -1,10 +1,19 @@
-from datetime import datetime
-from typing import Dict, Optional, Union
+from typing import Dict, Iterable, Optional, Union
+import threading
 
 import mysql.connector
-import paho.mqtt.client as mqtt
 
 from chargepal_local_server.access_ldb import MySQLAccess
+from chargepal_local_server.battery_mirror import BatteryMirror, FieldChange
+from chargepal_local_server.battery_snapshot import (
+    BatterySnapshot,
+    SnapshotCache,
+    create_snapshot,
+    query_battery_snapshot,
+)
+from chargepal_local_server.changelog import ChangeLog
+from chargepal_local_server.mqtt_publisher import MQTTPublisher
+from chargepal_local_server.waiter import ConditionWaiter, RowValues, read_columns
 
 feedback_receive_timeout = 60
 battery_live_monitor_timeout = 180
@@ -24,9 +33,66 @@ MESSAGE_UNLOCK_REQUEST = "1793,2,64,0"
 MESSAGE_PLUG_PROCESS_FINISHED = "1793,2,0,1"
 MESSAGE_EMERGENCY_STOP = "1793,2,0,2"
 
+# Seconds for which reads are served from the battery mirror before refreshing it.
+MIRROR_MAX_AGE = 0.1
+# Serve reads from this mirror of lsv_db instead if set, see use_mirror().
+battery_mirror: Optional[BatteryMirror] = None
+
+
+def use_mirror(mirror: Optional[BatteryMirror]) -> None:
+    """Serve battery reads from mirror, or directly from lsv_db if None."""
+    global battery_mirror
+    battery_mirror = mirror
+
+
+def get_mirror(table: str) -> Optional[BatteryMirror]:
+    """Return the battery mirror of table refreshed if needed, or None if unused."""
+    mirror = battery_mirror
+    if mirror is None or table not in mirror.tables.keys():
+        return None
+    mirror.refresh_if_older(MIRROR_MAX_AGE)
+    return mirror
+
+
+def read_mirrored_columns(
+    table: str, columns: Iterable[str], keys: Iterable[str]
+) -> RowValues:
+    """Return values of columns for rows with keys of table like read_columns()."""
+    mirror = get_mirror(table)
+    if mirror is None:
+        return read_columns(table, columns, keys)
+    columns = list(columns)
+    values: RowValues = {}
+    for key in keys:
+        row = mirror.get_row(table, key)
+        if row is not None:
+            values[key] = {column: row[column] for column in columns}
+    return values
+
+
+def read_battery_snapshot(battery_name: str) -> BatterySnapshot:
+    """Return a snapshot of battery_name from the battery mirror or lsv_db."""
+    mirror = get_mirror("CAN_MSG_RX_LIVE")
+    if mirror is None or "TX_ChargeOrdersFeedback" not in mirror.tables.keys():
+        return query_battery_snapshot(battery_name)
+    live_row = mirror.get_row("CAN_MSG_RX_LIVE", battery_name)
+    if live_row is None:
+        return query_battery_snapshot(battery_name)
+    feedback_row = mirror.get_row("TX_ChargeOrdersFeedback", battery_name)
+    return create_snapshot(battery_name, live_row, feedback_row, mirror.refresh_time)
+
+
+# Note: Poll conditions of all concurrent battery operations in one thread.
+battery_waiter = ConditionWaiter(read_mirrored_columns)
+# Note: Publish all battery commands with one persistent MQTT connection.
+mqtt_publisher = MQTTPublisher(MQTT_SERVER, MQTT_PORT, KEEPALIVE)
+battery_snapshots = SnapshotCache(read_battery_snapshot)
+
 
 class UpdateManager:
-    def __init__(self, battery_ids: Dict[str, str]) -> None:
+    def __init__(
+        self, battery_ids: Dict[str, str], changelog: Optional[ChangeLog] = None
+    ) -> None:
         assert len(set(battery_ids.keys())) == len(set(battery_ids.values()))
         self.battery_names = {
             battery_id: cart_name for cart_name, battery_id in battery_ids.items()
@@ -34,53 +100,71 @@ class UpdateManager:
         self.battery_states: Dict[str, Optional[str]] = {
             cart_name: None for cart_name in battery_ids.keys()
         }
-        self.last_time = datetime.min
+        # Read only batteries logged as changed in changelog instead if given.
+        self.mirror = BatteryMirror(changelog=changelog)
+        self.lock = threading.Lock()
+        self.updated_states: Dict[str, str] = {}
+        self.mirror.subscribe(
+            "CAN_MSG_RX_LIVE", "bat_state_charging", self.on_state_change
+        )
+
+    def on_state_change(self, change: FieldChange) -> None:
+        cart_name = self.battery_names.get(change.key)
+        if cart_name is not None and change.new_value is not None:
+            with self.lock:
+                self.updated_states[cart_name] = change.new_value
 
     def tick(self) -> Dict[str, str]:
         """
-        Return from CAN_MSG_RX_LIVE in lsv_db a dict of cart_names and battery states
-        for which last_change is greater than last time.
+        Refresh the mirror of lsv_db and return a dict of cart_names and battery
+        states which changed since the last tick, also by refreshes of other readers.
         """
-        sql_operation = f"SELECT Battry_ID, bat_state_charging FROM CAN_MSG_RX_LIVE WHERE last_change >= '{self.last_time}';"
-        self.last_time = datetime.now()
-        updated_states: Dict[str, str] = {}
         if MySQLAccess.is_configured():
-            with MySQLAccess() as cursor:
-                cursor.execute(sql_operation)
-                for battery_id, state in cursor.fetchall():
-                    updated_states[self.battery_names[battery_id]] = state
+            self.mirror.refresh()
+        with self.lock:
+            updated_states = self.updated_states
+            self.updated_states = {}
         self.battery_states.update(updated_states)
         return updated_states
 
 
-def publish_message(cart_name: str, message: str):
-    client = mqtt.Client()
-    client.connect(MQTT_SERVER, MQTT_PORT, KEEPALIVE)
-    client.publish(f"{cart_name}_ORDER", message)
-    client.disconnect()
+def publish_message(cart_name: str, message: str) -> bool:
+    # Note: Do not decide from a snapshot taken before the command.
+    battery_snapshots.invalidate(cart_name)
+    return mqtt_publisher.publish(f"{cart_name}_ORDER", message)
+
+
+def read_snapshot(cart_name: str, max_age: Optional[float] = None) -> BatterySnapshot:
+    return battery_snapshots.get(cart_name, max_age)
+
+
+def has_error(cart_name: str) -> bool:
+    """Return whether the battery of cart_name reports an error right now."""
+    return read_snapshot(cart_name, max_age=0.0).has_error()
 
 
 def read_data(table_name: str, battery_name: str, column_name: str) -> Union[str, int]:
-    sql = MySQLAccess()
+    mirror = get_mirror(table_name)
+    row = mirror.get_row(table_name, battery_name) if mirror else None
+    if row is not None:
+        return row[column_name]
+
     query = f"SELECT {column_name} FROM {table_name} WHERE Battry_ID = %s"
-    sql.cursor.execute(query, (battery_name,))
-    result = sql.cursor.fetchone()[0]
+    # Note: Commit on exit so that the pooled connection sees new data next time.
+    with MySQLAccess() as cursor:
+        cursor.execute(query, (battery_name,))
+        result = cursor.fetchone()[0]
     return result
 
 
 def check_feedback(cart_name, msg_to_check) -> bool:
-    feedback = False
-    time_passed = 0
-    feedback_start_time = datetime.now()
-    while time_passed < feedback_receive_timeout:
-        if msg_to_check == read_data(
-            "TX_ChargeOrdersFeedback", cart_name, "Bat_State_actual"
-        ):
-            feedback = True
-            break
-        else:
-            time_passed = (datetime.now() - feedback_start_time).total_seconds()
-    return feedback
+    return battery_waiter.wait_for(
+        "TX_ChargeOrdersFeedback",
+        cart_name,
+        "Bat_State_actual",
+        msg_to_check,
+        feedback_receive_timeout,
+    )
 
 
 def monitor_result(
@@ -89,34 +173,28 @@ def monitor_result(
     column_name: str,
     expected_result: Union[str, int],
 ) -> bool:
-    result_success = False
-    time_passed = 0
-    monitor_result_start_time = datetime.now()
-    while time_passed < battery_live_monitor_timeout:
-        if expected_result == read_data(table_name, battery_name, column_name):
-            result_success = True
-        else:
-            time_passed = (datetime.now() - monitor_result_start_time).total_seconds()
-
-    return result_success
+    return battery_waiter.wait_for(
+        table_name,
+        battery_name,
+        column_name,
+        expected_result,
+        battery_live_monitor_timeout,
+    )
 
 
 def wakeup(cart_name: str) -> bool:
-    battery_error_mode = read_data(
-        "CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR"
-    )
-    mode_bat_only = read_data("CAN_MSG_RX_LIVE", cart_name, "Mode_Bat_only")
+    snapshot = read_snapshot(cart_name)
     success = False
 
     # if current state is BAT_ONLY -> return true
-    if battery_error_mode != 1 and mode_bat_only == 1:
+    if not snapshot.has_error() and snapshot.mode_bat_only == 1:
         success = True
 
     # if current state is STANDBY -> proceed with request
-    elif battery_error_mode != 1 and mode_bat_only == 0:
+    elif not snapshot.has_error() and snapshot.mode_bat_only == 0:
         publish_message(cart_name, MESSAGE_WAKEUP)
         if monitor_result("CAN_MSG_RX_LIVE", cart_name, "Mode_Bat_only", 1):
-            if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
+            if not has_error(cart_name):
                 success = True
 
     return success
@@ -129,21 +207,17 @@ def mode_req_bat_only(cart_name: str) -> bool:
 
 
 def mode_req_standby(cart_name: str) -> bool:
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
-    feedback = read_data(
-        "TX_ChargeOrdersFeedback", cart_name, "Bat_State_actual"
-    ).lower()
-    mode_bat_only = read_data("CAN_MSG_RX_LIVE", cart_name, "Mode_Bat_only")
+    snapshot = read_snapshot(cart_name)
     success = False
     # if current state is STANDBY -> return true
-    if battery_error_mode != 1 and "standby_ok" in feedback:
+    if not snapshot.has_error() and "standby_ok" in snapshot.feedback.lower():
         success = True
 
     # if current state is BAT_ONLY -> proceed with request
-    elif battery_error_mode != 1 and mode_bat_only == 1:
+    elif not snapshot.has_error() and snapshot.mode_bat_only == 1:
         publish_message(cart_name, MESSAGE_MODE_REQ_STANDBY)
         if monitor_result("CAN_MSG_RX_LIVE", cart_name, "Mode_Bat_only", 0):
-            if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
+            if not has_error(cart_name):
                 success = True
 
     # else -> return false
@@ -151,104 +225,78 @@ def mode_req_standby(cart_name: str) -> bool:
 
 
 def mode_req_idle(cart_name: str) -> bool:
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
-    flg_modus = read_data("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus").lower()
-    mode_bat_only = read_data("CAN_MSG_RX_LIVE", cart_name, "Mode_Bat_only")
+    snapshot = read_snapshot(cart_name)
     success = False
     # if current state is IDLE -> return true
-    if battery_error_mode != 1 and "flag_idle" in flg_modus:
+    if not snapshot.has_error() and snapshot.has_flag("Flag_idle"):
         success = True
 
     # if current state is BAT_ONLY -> proceed with request
-    elif battery_error_mode != 1 and mode_bat_only == 1:
+    elif not snapshot.has_error() and snapshot.mode_bat_only == 1:
         publish_message(cart_name, MESSAGE_MODE_REQ_IDLE)
         if monitor_result("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus", "Flag_idle"):
-            if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
+            if not has_error(cart_name):
                 success = True
 
     # else -> return false
     return success
 
 
-def mode_req_EV_AC_Charge(cart_name: str) -> bool:
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
-    flg_modus = read_data("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus").lower()
+def request_charge_mode(cart_name: str, message: str, flag: str) -> bool:
+    """Request the charge mode with flag by message from IDLE."""
+    snapshot = read_snapshot(cart_name)
     success = False
 
-    # if current state is EV_AC_Charge -> return true
-    if battery_error_mode != 1 and "flag_ev_ac_charge" in flg_modus:
+    # if current state is the requested mode -> return true
+    if not snapshot.has_error() and snapshot.has_flag(flag):
         success = True
 
     # if current state is IDLE -> proceed with request
-    elif battery_error_mode != 1 and "flag_idle" in flg_modus:
-        publish_message(cart_name, MESSAGE_MODE_REQ_EV_AC_CHARGE)
+    elif not snapshot.has_error() and snapshot.has_flag("Flag_idle"):
+        publish_message(cart_name, message)
 
-        if monitor_result(
-            "CAN_MSG_RX_LIVE", cart_name, "Flag_Modus", "Flag_EV_AC_Charge"
-        ):
-            if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
+        if monitor_result("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus", flag):
+            if not has_error(cart_name):
                 success = True
 
     # else -> return false
     return success
 
 
-def mode_req_EV_DC_Charge(cart_name: str) -> bool:
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
-    flg_modus = read_data("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus").lower()
-    success = False
-
-    # if current state is EV_DC_Charge -> return true
-    if battery_error_mode != 1 and "flag_ev_dc_charge" in flg_modus:
-        success = True
-
-    # if current state is IDLE -> proceed with request
-    elif battery_error_mode != 1 and "flag_idle" in flg_modus:
-        publish_message(cart_name, MESSAGE_MODE_REQ_EV_DC_CHARGE)
+def mode_req_EV_AC_Charge(cart_name: str) -> bool:
+    return request_charge_mode(
+        cart_name, MESSAGE_MODE_REQ_EV_AC_CHARGE, "Flag_EV_AC_Charge"
+    )
 
-        if monitor_result(
-            "CAN_MSG_RX_LIVE", cart_name, "Flag_Modus", "Flag_EV_DC_Charge"
-        ):
-            if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
-                success = True
 
-    # else -> return false
-    return success
+def mode_req_EV_DC_Charge(cart_name: str) -> bool:
+    return request_charge_mode(
+        cart_name, MESSAGE_MODE_REQ_EV_DC_CHARGE, "Flag_EV_DC_Charge"
+    )
 
 
 def mode_req_Bat_AC_Charge(cart_name: str) -> bool:
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
-    flg_modus = read_data("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus").lower()
-    success = False
-    # if current state is Bat_AC_Charge -> return true
-    if battery_error_mode != 1 and "flag_bat_ac_charge" in flg_modus:
-        success = True
-
-    # if current state is IDLE -> proceed with request
-    elif battery_error_mode != 1 and "flag_idle" in flg_modus:
-        publish_message(cart_name, MESSAGE_MODE_REQ_BAT_AC_CHARGE)
+    return request_charge_mode(
+        cart_name, MESSAGE_MODE_REQ_BAT_AC_CHARGE, "Flag_Bat_AC_Charge"
+    )
 
-        if monitor_result(
-            "CAN_MSG_RX_LIVE", cart_name, "Flag_Modus", "Flag_Bat_AC_Charge"
-        ):
-            if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
-                success = True
 
-    # else -> return false
-    return success
+def is_charging(snapshot: BatterySnapshot) -> bool:
+    """Return whether snapshot is in EV_AC_Charge, EV_DC_Charge, or Bat_AC_Charge."""
+    # Note: As before, the error check applies to Bat_AC_Charge only.
+    return (
+        snapshot.has_flag("Flag_EV_AC_Charge")
+        or snapshot.has_flag("Flag_EV_DC_Charge")
+        or snapshot.has_flag("Flag_Bat_AC_Charge")
+        and not snapshot.has_error()
+    )
 
 
 def ladeprozess_start(cart_name: str, station_name: str, charging_type: str) -> bool:
-    flg_modus = read_data("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus").lower()
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
+    snapshot = read_snapshot(cart_name)
     success = False
-    if (
-        "flag_ev_ac_charge" in flg_modus
-        or "flag_ev_dc_charge" in flg_modus
-        or "flag_bat_ac_charge" in flg_modus
-        and battery_error_mode != 1
-    ):
-        if "flag_ev_dc_charge" not in flg_modus:
+    if is_charging(snapshot):
+        if not snapshot.has_flag("Flag_EV_DC_Charge"):
             publish_message(cart_name, MESSAGE_UNLOCK_REQUEST)
 
             if not monitor_plug_unlock(cart_name, station_name):
@@ -273,7 +321,7 @@ def ladeprozess_start(cart_name: str, station_name: str, charging_type: str) ->
                 ):
                     return success
 
-        if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
+        if not has_error(cart_name):
             success = True
 
     return success
@@ -289,26 +337,16 @@ def monitor_plug_unlock(cart_name: str, station_name: str) -> bool:
 
 
 def read_plug_unlock(cart_name: str, station_name: str) -> bool:
-    if "ADS" in station_name:
-        return read_data("CAN_MSG_RX_LIVE", cart_name, "AC_Car_inlet_UNLOCKED")
-    elif "BCS" in station_name:
-        return read_data("CAN_MSG_RX_LIVE", cart_name, "AC_Charger_inlet_UNLOCKED")
+    return read_snapshot(cart_name).get_plug_unlocked(station_name)
 
 
 def ladeprozess_end(cart_name: str, station_name: str, charging_type: str) -> bool:
-    flg_modus = read_data("CAN_MSG_RX_LIVE", cart_name, "Flag_Modus").lower()
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
-    unlock_state = read_plug_unlock(cart_name, station_name)
+    snapshot = read_snapshot(cart_name)
     success = False
 
     # if current state is EV_AC_Charge / EV_DC_Charge / Bat_AC_Charge Ladeprozess-> proceed with request
-    if (
-        "flag_ev_ac_charge" in flg_modus
-        or "flag_ev_dc_charge" in flg_modus
-        or "flag_bat_ac_charge" in flg_modus
-        and battery_error_mode != 1
-    ):
-        if unlock_state != 1:
+    if is_charging(snapshot):
+        if snapshot.get_plug_unlocked(station_name) != 1:
             publish_message(cart_name, MESSAGE_MODE_REQ_IDLE)
 
             if not monitor_plug_unlock(cart_name, station_name):
@@ -317,7 +355,7 @@ def ladeprozess_end(cart_name: str, station_name: str, charging_type: str) -> bo
         publish_message(cart_name, MESSAGE_PLUG_PROCESS_FINISHED)
 
         if monitor_result("CAN_MSG_RX_LIVE", cart_name, "Mode_Bat_only", 1):
-            if read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR") != 1:
+            if not has_error(cart_name):
                 success = True
 
     # if current state is BAT_ONLY-> return true
@@ -326,16 +364,41 @@ def ladeprozess_end(cart_name: str, station_name: str, charging_type: str) -> bo
 
 
 def mode_req_emergency_shutdown(cart_name):
-    battery_error_mode = read_data("CAN_MSG_RX_LIVE", cart_name, "State_bat_mod_ERROR")
-
-    feedback = read_data(
-        "TX_ChargeOrdersFeedback", cart_name, "Bat_State_actual"
-    ).lower()
+    snapshot = read_snapshot(cart_name)
     success = False
-    if feedback != "standby_ok" and battery_error_mode != 1:
+    if snapshot.feedback.lower() != "standby_ok" and not snapshot.has_error():
         publish_message(cart_name, MESSAGE_EMERGENCY_STOP)
         success = True
 
     # if current state is ANY_STATE -> proceed with request
     # if current state is STANDBY -> return true
     return success
+
+
+def run_request(request_name: str, cart_name: str, station_name: str) -> bool:
+    """Run the battery request with request_name for cart_name at station_name."""
+    if request_name == "wakeup":
+        return wakeup(cart_name)
+    elif request_name == "mode_req_bat_only":
+        return mode_req_bat_only(cart_name)
+    elif request_name == "mode_req_standby":
+        return mode_req_standby(cart_name)
+    elif request_name == "mode_req_idle":
+        return mode_req_idle(cart_name)
+    elif request_name == "mode_req_EV_AC_Charge":
+        return mode_req_EV_AC_Charge(cart_name)
+    elif request_name == "mode_req_EV_DC_Charge":
+        return mode_req_EV_DC_Charge(cart_name)
+    elif request_name == "mode_req_Bat_AC_Charge":
+        return mode_req_Bat_AC_Charge(cart_name)
+    elif "ladeprozess_start" in request_name:
+        return ladeprozess_start(
+            cart_name, station_name, request_name[len("ladeprozess_start_") :]
+        )
+    elif "ladeprozess_end" in request_name:
+        return ladeprozess_end(
+            cart_name, station_name, request_name[len("ladeprozess_end_") :]
+        )
+    elif request_name == "mode_req_emergency_shutdown":
+        return mode_req_emergency_shutdown(cart_name)
+    return False
@@ -0,0 +1,181 @@
+"""In-memory mirror of battery rows in lsv_db with field listeners"""
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import threading
+import time
+from chargepal_local_server.access_ldb import MySQLAccess
+from chargepal_local_server.changelog import ChangeLog, get_key_condition
+
+
+KEY_COLUMN = "Battry_ID"
+# Map mirrored tables to their column of the last change time,
+# or None if they are read completely unless a change log is used.
+MIRRORED_TABLES: Dict[str, Optional[str]] = {
+    "CAN_MSG_RX_LIVE": "last_change",
+    "TX_ChargeOrdersFeedback": None,
+}
+# Column names and rows of a table read with a WHERE clause, see read_rows().
+ReadRows = Callable[[str, str], Tuple[List[str], List[tuple]]]
+
+
+def read_rows(table: str, condition: str) -> Tuple[List[str], List[tuple]]:
+    """Return column names and rows of table in lsv_db selected by condition."""
+    with MySQLAccess() as cursor:
+        cursor.execute(f"SELECT * FROM {table}{condition};")
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+
+
+@dataclass
+class FieldChange:
+    """Change of column of the row with key in table, None if absent."""
+
+    table: str
+    key: str
+    column: str
+    old_value: object
+    new_value: object
+
+
+FieldListener = Callable[[FieldChange], None]
+
+
+class BatteryMirror:
+    """
+    Keep the rows of tables in memory by their Battry_ID, reading only rows
+    logged in changelog if given, or else rows changed since the last refresh.
+
+    Listeners subscribed to a column are called with each change of its values
+    in the thread which refreshes the mirror, so they must be thread-safe.
+    """
+
+    def __init__(
+        self,
+        tables: Dict[str, Optional[str]] = MIRRORED_TABLES,
+        changelog: Optional[ChangeLog] = None,
+        read: ReadRows = read_rows,
+    ) -> None:
+        self.tables = tables
+        self.changelog = changelog
+        self.read = read
+        # Note: Refreshes are serialized so that listeners get changes in order.
+        self.refresh_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.rows: Dict[str, Dict[str, Dict[str, object]]] = {
+            table: {} for table in tables.keys()
+        }
+        self.last_time = datetime.min
+        self.refresh_time: Optional[float] = None
+        self.refresh_count = 0
+        self.listeners: Dict[Tuple[str, str], List[FieldListener]] = {}
+
+    def subscribe(self, table: str, column: str, listener: FieldListener) -> None:
+        """Call listener with each change of column in table."""
+        with self.lock:
+            self.listeners.setdefault((table, column), []).append(listener)
+
+    def unsubscribe(self, table: str, column: str, listener: FieldListener) -> None:
+        with self.lock:
+            self.listeners[(table, column)].remove(listener)
+
+    def get_row(self, table: str, key: str) -> Optional[Dict[str, object]]:
+        """Return a copy of the row with key in table, or None if there is none."""
+        with self.lock:
+            row = self.rows[table].get(key)
+            return None if row is None else dict(row)
+
+    def get_age(self) -> float:
+        """Return seconds since the last refresh, or infinity if there was none."""
+        refresh_time = self.refresh_time
+        return float("inf") if refresh_time is None else time.monotonic() - refresh_time
+
+    def refresh_if_older(self, max_age: float) -> None:
+        """Refresh unless the last refresh is at most max_age seconds ago."""
+        if self.get_age() > max_age:
+            with self.refresh_lock:
+                # Note: Another thread may have refreshed while this one waited.
+                if self.get_age() > max_age:
+                    self.refresh_locked()
+
+    def refresh(self) -> List[FieldChange]:
+        """Read changed rows, notify listeners, and return the field changes."""
+        with self.refresh_lock:
+            return self.refresh_locked()
+
+    def refresh_locked(self) -> List[FieldChange]:
+        """Refresh while holding the refresh lock."""
+        refresh_time = time.monotonic()
+        batch = self.changelog.consume() if self.changelog else None
+        # Note: Take the time before reading so that no change is missed.
+        now = datetime.now()
+        changes: List[FieldChange] = []
+        for table, time_column in self.tables.items():
+            keys = batch.get_keys(table) if batch else None
+            if keys is not None and not keys:
+                continue
+            if batch or not time_column:
+                condition = get_key_condition(KEY_COLUMN, keys)
+                selected_keys = keys
+            else:
+                condition = f" WHERE {time_column} >= '{self.last_time}'"
+                # Note: Deleted rows are not detected without a change log.
+                selected_keys = set()
+            columns, rows = self.read(table, condition)
+            changes.extend(self.apply(table, columns, rows, selected_keys))
+        if batch and self.changelog.ack(batch):
+            self.changelog.compact()
+        self.last_time = now
+        self.refresh_time = refresh_time
+        self.refresh_count += 1
+
+        with self.lock:
+            listeners = {key: list(value) for key, value in self.listeners.items()}
+        for change in changes:
+            for listener in listeners.get((change.table, change.column), []):
+                try:
+                    listener(change)
+                except Exception as exception:
+                    logging.exception(f"Battery mirror listener failed: {exception}")
+        return changes
+
+    def apply(
+        self,
+        table: str,
+        columns: List[str],
+        rows: List[tuple],
+        selected_keys: Optional[Set[str]],
+    ) -> List[FieldChange]:
+        """
+        Update table with rows read with selected_keys, or all if None,
+        and return the field changes. Selected rows which were not read are deleted.
+        """
+        changes: List[FieldChange] = []
+        with self.lock:
+            mirrored_rows = self.rows[table]
+            read_keys: Set[str] = set()
+            for values in rows:
+                new_row = dict(zip(columns, values))
+                key = str(new_row[KEY_COLUMN])
+                read_keys.add(key)
+                old_row = mirrored_rows.get(key, {})
+                for column, new_value in new_row.items():
+                    old_value = old_row.get(column)
+                    if column not in old_row or old_value != new_value:
+                        changes.append(
+                            FieldChange(table, key, column, old_value, new_value)
+                        )
+                mirrored_rows[key] = new_row
+
+            if selected_keys is None:
+                selected_keys = set(mirrored_rows.keys())
+            for key in selected_keys - read_keys:
+                old_row = mirrored_rows.pop(key, None)
+                if old_row is not None:
+                    changes.extend(
+                        FieldChange(table, key, column, old_value, None)
+                        for column, old_value in old_row.items()
+                    )
+        return changes
@@ -0,0 +1,139 @@
+"""Asynchronous battery operations, serialized per cart and tracked by id"""
+
+from typing import Callable, Deque, Dict, Optional
+from collections import deque
+from concurrent import futures
+import logging
+import threading
+import time
+import uuid
+
+
+class OperationStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    UNKNOWN = "unknown"
+
+
+class BatteryOperation:
+    """Battery request of a cart with its status, awaited by future."""
+
+    def __init__(self, request_name: str, cart_name: str, station_name: str) -> None:
+        self.operation_id = uuid.uuid4().hex
+        self.request_name = request_name
+        self.cart_name = cart_name
+        self.station_name = station_name
+        self.status = OperationStatus.PENDING
+        self.error = ""
+        self.finish_time: Optional[float] = None
+        self.future: futures.Future = futures.Future()
+
+
+class BatteryOperationExecutor:
+    """
+    Run battery operations in a thread pool of max_workers, one at a time per cart
+    in the order they were submitted, so that waiting for battery hardware blocks
+    neither the caller nor operations of other carts.
+
+    An operation succeeds if run(request_name, cart_name, station_name) returns
+    True. Finished operations can be looked up for retention seconds.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str, str, str], bool],
+        max_workers: int = 4,
+        retention: float = 600.0,
+    ) -> None:
+        self.run = run
+        self.retention = retention
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers, thread_name_prefix="battery_operations"
+        )
+        self.lock = threading.Lock()
+        self.operations: Dict[str, BatteryOperation] = {}
+        # Map cart names to their queued operations, the first one being run.
+        self.cart_queues: Dict[str, Deque[BatteryOperation]] = {}
+
+    def submit(
+        self, request_name: str, cart_name: str, station_name: str = ""
+    ) -> BatteryOperation:
+        """Queue the battery request of cart_name and return its operation."""
+        operation = BatteryOperation(request_name, cart_name, station_name)
+        with self.lock:
+            self.forget_expired()
+            self.operations[operation.operation_id] = operation
+            queue = self.cart_queues.setdefault(cart_name, deque())
+            queue.append(operation)
+            start = len(queue) == 1
+        if start:
+            self.executor.submit(self.run_queue, cart_name)
+        return operation
+
+    def run_queue(self, cart_name: str) -> None:
+        """Run the first operation of cart_name, then submit the next one if any."""
+        with self.lock:
+            operation = self.cart_queues[cart_name][0]
+            operation.status = OperationStatus.RUNNING
+        try:
+            success = bool(
+                self.run(
+                    operation.request_name, operation.cart_name, operation.station_name
+                )
+            )
+            error = "" if success else "Battery request did not succeed."
+        except Exception as exception:
+            logging.exception(
+                f"Battery request '{operation.request_name}'"
+                f" of {cart_name} failed: {exception}"
+            )
+            success = False
+            error = repr(exception)
+
+        with self.lock:
+            finish(operation, success, error)
+            queue = self.cart_queues[cart_name]
+            queue.popleft()
+            has_next = bool(queue)
+            if not has_next:
+                del self.cart_queues[cart_name]
+        operation.future.set_result(success)
+        if has_next:
+            self.executor.submit(self.run_queue, cart_name)
+
+    def get(self, operation_id: str) -> Optional[BatteryOperation]:
+        """Return the operation with operation_id, or None if unknown or expired."""
+        with self.lock:
+            return self.operations.get(operation_id)
+
+    def forget_expired(self) -> None:
+        """Forget operations finished longer than retention ago. Requires the lock."""
+        now = time.monotonic()
+        for operation_id, operation in list(self.operations.items()):
+            if (
+                operation.finish_time is not None
+                and now - operation.finish_time > self.retention
+            ):
+                del self.operations[operation_id]
+
+    def shutdown(self) -> None:
+        """Fail queued operations and stop the thread pool without waiting."""
+        with self.lock:
+            queued_operations = []
+            for queue in self.cart_queues.values():
+                while len(queue) > 1:
+                    queued_operations.append(queue.pop())
+            for operation in queued_operations:
+                finish(operation, False, "Battery operations were shut down.")
+        for operation in queued_operations:
+            operation.future.set_result(False)
+        self.executor.shutdown(wait=False)
+
+
+def finish(operation: BatteryOperation, success: bool, error: str) -> None:
+    """Set the final status of operation, which is set last for lock-free readers."""
+    operation.error = error
+    operation.finish_time = time.monotonic()
+    operation.status = OperationStatus.SUCCEEDED if success else OperationStatus.FAILED
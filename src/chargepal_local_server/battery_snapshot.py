@@ -0,0 +1,131 @@
+"""Consistent snapshots of battery telemetry in lsv_db"""
+
+from typing import Callable, Dict, Optional
+from dataclasses import dataclass
+import threading
+import time
+from chargepal_local_server.access_ldb import MySQLAccess
+
+
+# Seconds for which a snapshot is reused by default.
+SNAPSHOT_TTL = 0.5
+SNAPSHOT_QUERY = (
+    "SELECT live.State_bat_mod_ERROR, live.Mode_Bat_only, live.Flag_Modus,"
+    " live.AC_Car_inlet_UNLOCKED, live.AC_Charger_inlet_UNLOCKED,"
+    " feedback.Bat_State_actual"
+    " FROM CAN_MSG_RX_LIVE AS live LEFT JOIN TX_ChargeOrdersFeedback AS feedback"
+    " ON feedback.Battry_ID = live.Battry_ID"
+    " WHERE live.Battry_ID = %s;"
+)
+
+
+@dataclass(frozen=True)
+class BatterySnapshot:
+    """State of a battery read at once from CAN_MSG_RX_LIVE and its feedback."""
+
+    battery_name: str
+    # State_bat_mod_ERROR
+    error_mode: int
+    # Mode_Bat_only
+    mode_bat_only: int
+    # Flag_Modus
+    flag_modus: str
+    # AC_Car_inlet_UNLOCKED
+    car_inlet_unlocked: int
+    # AC_Charger_inlet_UNLOCKED
+    charger_inlet_unlocked: int
+    # Bat_State_actual of TX_ChargeOrdersFeedback
+    feedback: str
+    # time.monotonic() when the snapshot was read
+    read_time: float
+
+    def has_error(self) -> bool:
+        return self.error_mode == 1
+
+    def has_flag(self, flag: str) -> bool:
+        """Return whether Flag_Modus contains flag, ignoring case."""
+        return flag.lower() in self.flag_modus.lower()
+
+    def get_plug_unlocked(self, station_name: str) -> Optional[int]:
+        """Return whether the inlet used at station_name is unlocked."""
+        if "ADS" in station_name:
+            return self.car_inlet_unlocked
+        elif "BCS" in station_name:
+            return self.charger_inlet_unlocked
+        return None
+
+
+def query_battery_snapshot(battery_name: str) -> BatterySnapshot:
+    """Return a snapshot of battery_name read with one query from lsv_db."""
+    with MySQLAccess() as cursor:
+        cursor.execute(SNAPSHOT_QUERY, (battery_name,))
+        row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Battery '{battery_name}' not found in CAN_MSG_RX_LIVE.")
+    return BatterySnapshot(
+        battery_name,
+        error_mode=row[0],
+        mode_bat_only=row[1],
+        flag_modus=row[2] or "",
+        car_inlet_unlocked=row[3],
+        charger_inlet_unlocked=row[4],
+        feedback=row[5] or "",
+        read_time=time.monotonic(),
+    )
+
+
+def create_snapshot(
+    battery_name: str,
+    live_row: Dict[str, object],
+    feedback_row: Optional[Dict[str, object]],
+    read_time: float,
+) -> BatterySnapshot:
+    """Return a snapshot of battery_name from its CAN_MSG_RX_LIVE and feedback rows."""
+    return BatterySnapshot(
+        battery_name,
+        error_mode=live_row["State_bat_mod_ERROR"],
+        mode_bat_only=live_row["Mode_Bat_only"],
+        flag_modus=live_row["Flag_Modus"] or "",
+        car_inlet_unlocked=live_row["AC_Car_inlet_UNLOCKED"],
+        charger_inlet_unlocked=live_row["AC_Charger_inlet_UNLOCKED"],
+        feedback=(feedback_row or {}).get("Bat_State_actual") or "",
+        read_time=read_time,
+    )
+
+
+class SnapshotCache:
+    """Reuse snapshots of batteries read with read for up to ttl seconds."""
+
+    def __init__(
+        self,
+        read: Callable[[str], BatterySnapshot] = query_battery_snapshot,
+        ttl: float = SNAPSHOT_TTL,
+    ) -> None:
+        self.read = read
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.snapshots: Dict[str, BatterySnapshot] = {}
+
+    def get(
+        self, battery_name: str, max_age: Optional[float] = None
+    ) -> BatterySnapshot:
+        """
+        Return the snapshot of battery_name if it is at most max_age seconds old,
+        by default ttl, or else read a new one.
+        """
+        if max_age is None:
+            max_age = self.ttl
+        with self.lock:
+            snapshot = self.snapshots.get(battery_name)
+        if snapshot is not None and time.monotonic() - snapshot.read_time <= max_age:
+            return snapshot
+
+        snapshot = self.read(battery_name)
+        with self.lock:
+            self.snapshots[battery_name] = snapshot
+        return snapshot
+
+    def invalidate(self, battery_name: str) -> None:
+        """Forget the snapshot of battery_name, e.g. after commanding it."""
+        with self.lock:
+            self.snapshots.pop(battery_name, None)
@@ -0,0 +1,237 @@
+"""Trigger-based change log of ldb and lsv_db tables"""
+
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Set
+from dataclasses import dataclass, field
+import logging
+import time
+
+
+CHANGELOG_TABLE = "changelog"
+# Seconds to wait for skipped sequence numbers before syncing all rows instead.
+GAP_TIMEOUT = 10.0
+# Number of skipped sequence numbers above which all rows are synced instead.
+MAX_GAPS = 1000
+
+
+class Dialect:
+    SQLITE = "sqlite"
+    MYSQL = "mysql"
+
+
+def get_ddl(
+    dialect: str, tables: Dict[str, str], changelog_table: str = CHANGELOG_TABLE
+) -> List[str]:
+    """
+    Return statements creating changelog_table and triggers which append
+    (table_name, row_key) to it for each inserted, updated, or deleted row of tables,
+    given as dict of table names and key columns.
+    """
+    if dialect == Dialect.SQLITE:
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {changelog_table} ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " table_name TEXT NOT NULL,"
+            " row_key TEXT NOT NULL);"
+        ]
+    elif dialect == Dialect.MYSQL:
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {changelog_table} ("
+            " seq BIGINT AUTO_INCREMENT PRIMARY KEY,"
+            " table_name VARCHAR(64) NOT NULL,"
+            " row_key VARCHAR(255) NOT NULL);"
+        ]
+    else:
+        raise ValueError(f"Unknown dialect '{dialect}'.")
+
+    for table, key_column in tables.items():
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            trigger = f"{CHANGELOG_TABLE}_{table}_{event.lower()}"
+            insert = (
+                f"INSERT INTO {changelog_table} (table_name, row_key)"
+                f" VALUES ('{table}', {row}.{key_column});"
+            )
+            # Note: Replace existing triggers, which may log to another table.
+            statements.append(f"DROP TRIGGER IF EXISTS {trigger};")
+            if dialect == Dialect.SQLITE:
+                statements.append(
+                    f"CREATE TRIGGER {trigger} AFTER {event} ON {table}"
+                    f" BEGIN {insert} END;"
+                )
+            else:
+                statements.append(
+                    f"CREATE TRIGGER {trigger} AFTER {event} ON {table}"
+                    f" FOR EACH ROW {insert}"
+                )
+    return statements
+
+
+def quote(key: str) -> str:
+    """Return key as SQL string literal."""
+    return "'" + str(key).replace("'", "''") + "'"
+
+
+def get_key_condition(key_column: str, keys: Optional[Iterable[str]]) -> str:
+    """Return a WHERE clause selecting rows with keys, or none if keys are None."""
+    if keys is None:
+        return ""
+    return f" WHERE {key_column} IN ({', '.join(quote(key) for key in sorted(keys))})"
+
+
+@dataclass
+class ChangeBatch:
+    """Changes consumed from a change log up to sequence number seq."""
+
+    seq: int
+    # Map table names to keys of changed rows, or None if all rows may have changed.
+    keys: Optional[Dict[str, Set[str]]] = None
+    # Sequence numbers up to seq which were skipped and may still be committed.
+    gaps: Set[int] = field(default_factory=set)
+
+    def get_keys(self, table: str) -> Optional[Set[str]]:
+        """Return keys of changed rows of table, or None if all may have changed."""
+        return None if self.keys is None else self.keys.get(table, set())
+
+
+class ChangeLog:
+    """
+    Consume changes of tables logged by triggers into changelog_table, see get_ddl().
+    Change logs on the same database need separate tables, since each one
+    compacts and reads its table on its own.
+
+    A batch returned by consume() is delivered again until it is acknowledged,
+    so that changes are not lost if applying them fails. Before the first
+    acknowledgement, or after reset(), consume() reports that all rows may have
+    changed, since changes before the triggers were installed are not logged.
+    Acknowledged changes are deleted by compact().
+
+    With concurrent MySQL writers, a change can become visible after changes
+    with greater sequence numbers. Skipped sequence numbers are therefore read
+    again until they appear. If one does not appear within gap_timeout seconds,
+    e.g. since its transaction was rolled back, consume() reports that all rows
+    may have changed.
+    """
+
+    def __init__(
+        self,
+        access: Callable[[], ContextManager[Any]],
+        dialect: str,
+        tables: Dict[str, str],
+        changelog_table: str = CHANGELOG_TABLE,
+        gap_timeout: float = GAP_TIMEOUT,
+    ) -> None:
+        self.access = access
+        self.dialect = dialect
+        self.tables = tables
+        self.changelog_table = changelog_table
+        self.gap_timeout = gap_timeout
+        self.acked_seq = 0
+        self.synced = False
+        # Skipped sequence numbers up to acked_seq.
+        self.gaps: Set[int] = set()
+        # Map skipped sequence numbers to when they were first noticed.
+        self.gap_times: Dict[int, float] = {}
+
+    def install(self) -> None:
+        """Create the change log table and triggers on tables if they do not exist."""
+        with self.access() as cursor:
+            for statement in get_ddl(self.dialect, self.tables, self.changelog_table):
+                cursor.execute(statement)
+
+    def uninstall(self) -> None:
+        """Drop the triggers on tables, keeping the change log table."""
+        with self.access() as cursor:
+            for table in self.tables:
+                for event in ("insert", "update", "delete"):
+                    cursor.execute(
+                        f"DROP TRIGGER IF EXISTS {CHANGELOG_TABLE}_{table}_{event};"
+                    )
+
+    def consume(self, limit: Optional[int] = None) -> ChangeBatch:
+        """Return a batch of up to limit changes which are not yet acknowledged."""
+        with self.access() as cursor:
+            if self.synced:
+                cursor.execute(
+                    f"SELECT seq, table_name, row_key FROM {self.changelog_table}"
+                    f" WHERE seq > {self.acked_seq}"
+                    + (
+                        f" OR seq IN ({', '.join(str(seq) for seq in self.gaps)})"
+                        if self.gaps
+                        else ""
+                    )
+                    + " ORDER BY seq"
+                    + (f" LIMIT {int(limit)};" if limit is not None else ";")
+                )
+                batch = self.create_batch(cursor.fetchall())
+                if batch:
+                    return batch
+                logging.warning(
+                    f"Change log of {', '.join(self.tables)} skipped sequence numbers"
+                    " which did not appear, syncing all rows."
+                )
+
+            cursor.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {self.changelog_table};")
+            return ChangeBatch(max(int(cursor.fetchone()[0]), self.acked_seq))
+
+    def create_batch(self, rows: List[tuple]) -> Optional[ChangeBatch]:
+        """
+        Return a batch of rows read after acked_seq or in gaps, or None if
+        a skipped sequence number did not appear in time.
+        """
+        now = time.monotonic()
+        batch = ChangeBatch(
+            self.acked_seq, {table: set() for table in self.tables}, set(self.gaps)
+        )
+        for seq, table_name, row_key in rows:
+            seq = int(seq)
+            if seq in batch.gaps:
+                batch.gaps.remove(seq)
+            else:
+                skipped_seqs = range(batch.seq + 1, seq)
+                if len(batch.gaps) + len(skipped_seqs) > MAX_GAPS:
+                    return None
+                for skipped_seq in skipped_seqs:
+                    batch.gaps.add(skipped_seq)
+                    self.gap_times.setdefault(skipped_seq, now)
+                batch.seq = seq
+            if table_name in batch.keys:
+                batch.keys[table_name].add(str(row_key))
+
+        if any(now - self.gap_times[seq] > self.gap_timeout for seq in batch.gaps):
+            return None
+        return batch
+
+    def ack(self, batch: ChangeBatch) -> bool:
+        """
+        Acknowledge that changes of batch have been applied.
+        Return whether there were any changes not yet acknowledged.
+        """
+        if batch.seq < self.acked_seq:
+            return False
+        acked_changes = batch.seq > self.acked_seq or bool(self.gaps - batch.gaps)
+        self.acked_seq = batch.seq
+        self.synced = True
+        self.gaps = set(batch.gaps)
+        self.gap_times = {
+            seq: noticed
+            for seq, noticed in self.gap_times.items()
+            if seq in self.gaps or seq > self.acked_seq
+        }
+        return acked_changes
+
+    def compact(self) -> None:
+        """Delete acknowledged changes from the change log."""
+        with self.access() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.changelog_table} WHERE seq <= {self.acked_seq}"
+                + (
+                    f" AND seq NOT IN ({', '.join(str(seq) for seq in self.gaps)});"
+                    if self.gaps
+                    else ";"
+                )
+            )
+
+    def reset(self) -> None:
+        """Let the next consume() report that all rows may have changed."""
+        self.synced = False
+        self.gaps.clear()
+        self.gap_times.clear()
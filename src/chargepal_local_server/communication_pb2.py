@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: chargepal_local_server/communication.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'chargepal_local_server/communication.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n*chargepal_local_server/communication.proto\"\xd1\x01\n\x07Request\x12\x12\n\nrobot_name\x18\x01 \x01(\t\x12\x14\n\x0crequest_name\x18\x02 \x01(\t\x12\x14\n\x0cstation_name\x18\x03 \x01(\t\x12\x11\n\tcart_name\x18\x04 \x01(\t\x12\x12\n\ntable_name\x18\x05 \x01(\t\x12\x10\n\x08job_name\x18\x06 \x01(\t\x12\x11\n\trdbc_data\x18\x07 \x03(\t\x12\x12\n\njob_status\x18\x08 \x01(\t\x12\x10\n\x08log_text\x18\t \x01(\t\x12\x14\n\x0coperation_id\x18\n \x01(\t\"4\n\x03Row\x12\x16\n\x0erow_identifier\x18\x01 \x01(\x05\x12\x15\n\rcolumn_values\x18\x02 \x01(\t\"I\n\tTableData\x12\x12\n\ntable_name\x18\x01 \x01(\t\x12\x14\n\x0c\x63olumn_names\x18\x02 \x03(\t\x12\x12\n\x04rows\x18\x03 \x03(\x0b\x32\x04.Row\"0\n\x12Response_UpdateRDB\x12\x1a\n\x06tables\x18\x01 \x03(\x0b\x32\n.TableData\"\x1f\n\x10Response_PullLDB\x12\x0b\n\x03ldb\x18\x01 \x01(\x0c\"\x99\x01\n\x0cResponse_Job\x12\x0e\n\x06job_id\x18\x01 \x01(\x05\x12\x10\n\x08job_type\x18\x02 \x01(\t\x12\x15\n\rcharging_type\x18\x03 \x01(\t\x12\x12\n\nrobot_name\x18\x04 \x01(\t\x12\x0c\n\x04\x63\x61rt\x18\x05 \x01(\t\x12\x16\n\x0esource_station\x18\x06 \x01(\t\x12\x16\n\x0etarget_station\x18\x07 \x01(\t\"@\n\x11Response_FetchJob\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x1a\n\x03job\x18\x02 \x01(\x0b\x32\r.Response_Job\",\n\x14Response_FreeStation\x12\x14\n\x0cstation_name\x18\x01 \x01(\t\"%\n\x12Response_PushToLDB\x12\x0f\n\x07success\x18\x01 \x01(\x08\"/\n\x1cResponse_ResetStationBlocker\x12\x0f\n\x07success\x18\x01 \x01(\x08\",\n\x19Response_UpdateJobMonitor\x12\x0f\n\x07success\x18\x01 \x01(\x08\"&\n\x16Response_OperationTime\x12\x0c\n\x04msec\x18\x01 \x01(\x03\"3\n\x18Response_Ready2PlugInADS\x12\x17\n\x0fready_to_plugin\x18\x01 \x01(\x08\"0\n\x1dResponse_BatteryCommunication\x12\x0f\n\x07success\x18\x01 \x01(\x08\"a\n\x19Response_BatteryOperation\x12\x14\n\x0coperation_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0f\n\x07success\x18\x03 \x01(\x08\x12\r\n\x05\x65rror\x18\x04 \x01(\t\"#\n\x10Response_LogText\x12\x0f\n\x07success\x18\x01 \x01(\x08\"v\n\x0fPhaseStatistics\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\x12\x0e\n\x06p50_ms\x18\x03 \x01(\x01\x12\x0e\n\x06p95_ms\x18\x04 \x01(\x01\x12\x0e\n\x06max_ms\x18\x05 \x01(\x01\x12\x16\n\x0esql_statements\x18\x06 \x01(\x01\"h\n\x17Response_TickStatistics\x12 \n\x06phases\x18\x01 \x03(\x0b\x32\x10.PhaseStatistics\x12\x1b\n\x13slow_tick_threshold\x18\x02 \x01(\x01\x12\x0e\n\x06report\x18\x03 \x01(\t2\xa7\x06\n\rCommunication\x12*\n\tUpdateRDB\x12\x08.Request\x1a\x13.Response_UpdateRDB\x12&\n\x07PullLDB\x12\x08.Request\x1a\x11.Response_PullLDB\x12\x38\n\x10UpdateJobMonitor\x12\x08.Request\x1a\x1a.Response_UpdateJobMonitor\x12(\n\x08\x46\x65tchJob\x12\x08.Request\x1a\x12.Response_FetchJob\x12\x31\n\x0e\x41skFreeStation\x12\x08.Request\x1a\x15.Response_FreeStation\x12*\n\tPushToLDB\x12\x08.Request\x1a\x13.Response_PushToLDB\x12>\n\x13ResetStationBlocker\x12\x08.Request\x1a\x1d.Response_ResetStationBlocker\x12\x32\n\rOperationTime\x12\x08.Request\x1a\x17.Response_OperationTime\x12\x36\n\x0fReady2PlugInADS\x12\x08.Request\x1a\x19.Response_Ready2PlugInADS\x12@\n\x14\x42\x61tteryCommunication\x12\x08.Request\x1a\x1e.Response_BatteryCommunication\x12\x42\n\x1aSubmitBatteryCommunication\x12\x08.Request\x1a\x1a.Response_BatteryOperation\x12>\n\x16\x42\x61tteryOperationStatus\x12\x08.Request\x1a\x1a.Response_BatteryOperation\x12&\n\x07LogText\x12\x08.Request\x1a\x11.Response_LogText\x12\x34\n\x0eTickStatistics\x12\x08.Request\x1a\x18.Response_TickStatistics\x12/\n\rSubscribeJobs\x12\x08.Request\x1a\x12.Response_FetchJob0\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'chargepal_local_server.communication_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_REQUEST']._serialized_start=47
+  _globals['_REQUEST']._serialized_end=256
+  _globals['_ROW']._serialized_start=258
+  _globals['_ROW']._serialized_end=310
+  _globals['_TABLEDATA']._serialized_start=312
+  _globals['_TABLEDATA']._serialized_end=385
+  _globals['_RESPONSE_UPDATERDB']._serialized_start=387
+  _globals['_RESPONSE_UPDATERDB']._serialized_end=435
+  _globals['_RESPONSE_PULLLDB']._serialized_start=437
+  _globals['_RESPONSE_PULLLDB']._serialized_end=468
+  _globals['_RESPONSE_JOB']._serialized_start=471
+  _globals['_RESPONSE_JOB']._serialized_end=624
+  _globals['_RESPONSE_FETCHJOB']._serialized_start=626
+  _globals['_RESPONSE_FETCHJOB']._serialized_end=690
+  _globals['_RESPONSE_FREESTATION']._serialized_start=692
+  _globals['_RESPONSE_FREESTATION']._serialized_end=736
+  _globals['_RESPONSE_PUSHTOLDB']._serialized_start=738
+  _globals['_RESPONSE_PUSHTOLDB']._serialized_end=775
+  _globals['_RESPONSE_RESETSTATIONBLOCKER']._serialized_start=777
+  _globals['_RESPONSE_RESETSTATIONBLOCKER']._serialized_end=824
+  _globals['_RESPONSE_UPDATEJOBMONITOR']._serialized_start=826
+  _globals['_RESPONSE_UPDATEJOBMONITOR']._serialized_end=870
+  _globals['_RESPONSE_OPERATIONTIME']._serialized_start=872
+  _globals['_RESPONSE_OPERATIONTIME']._serialized_end=910
+  _globals['_RESPONSE_READY2PLUGINADS']._serialized_start=912
+  _globals['_RESPONSE_READY2PLUGINADS']._serialized_end=963
+  _globals['_RESPONSE_BATTERYCOMMUNICATION']._serialized_start=965
+  _globals['_RESPONSE_BATTERYCOMMUNICATION']._serialized_end=1013
+  _globals['_RESPONSE_BATTERYOPERATION']._serialized_start=1015
+  _globals['_RESPONSE_BATTERYOPERATION']._serialized_end=1112
+  _globals['_RESPONSE_LOGTEXT']._serialized_start=1114
+  _globals['_RESPONSE_LOGTEXT']._serialized_end=1149
+  _globals['_PHASESTATISTICS']._serialized_start=1151
+  _globals['_PHASESTATISTICS']._serialized_end=1269
+  _globals['_RESPONSE_TICKSTATISTICS']._serialized_start=1271
+  _globals['_RESPONSE_TICKSTATISTICS']._serialized_end=1375
+  _globals['_COMMUNICATION']._serialized_start=1378
+  _globals['_COMMUNICATION']._serialized_end=2185
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,173 @@
+from google.protobuf.internal import containers as _containers
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from collections.abc import Iterable as _Iterable, Mapping as _Mapping
+from typing import ClassVar as _ClassVar, Optional as _Optional, Union as _Union
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class Request(_message.Message):
+    __slots__ = ("robot_name", "request_name", "station_name", "cart_name", "table_name", "job_name", "rdbc_data", "job_status", "log_text", "operation_id")
+    ROBOT_NAME_FIELD_NUMBER: _ClassVar[int]
+    REQUEST_NAME_FIELD_NUMBER: _ClassVar[int]
+    STATION_NAME_FIELD_NUMBER: _ClassVar[int]
+    CART_NAME_FIELD_NUMBER: _ClassVar[int]
+    TABLE_NAME_FIELD_NUMBER: _ClassVar[int]
+    JOB_NAME_FIELD_NUMBER: _ClassVar[int]
+    RDBC_DATA_FIELD_NUMBER: _ClassVar[int]
+    JOB_STATUS_FIELD_NUMBER: _ClassVar[int]
+    LOG_TEXT_FIELD_NUMBER: _ClassVar[int]
+    OPERATION_ID_FIELD_NUMBER: _ClassVar[int]
+    robot_name: str
+    request_name: str
+    station_name: str
+    cart_name: str
+    table_name: str
+    job_name: str
+    rdbc_data: _containers.RepeatedScalarFieldContainer[str]
+    job_status: str
+    log_text: str
+    operation_id: str
+    def __init__(self, robot_name: _Optional[str] = ..., request_name: _Optional[str] = ..., station_name: _Optional[str] = ..., cart_name: _Optional[str] = ..., table_name: _Optional[str] = ..., job_name: _Optional[str] = ..., rdbc_data: _Optional[_Iterable[str]] = ..., job_status: _Optional[str] = ..., log_text: _Optional[str] = ..., operation_id: _Optional[str] = ...) -> None: ...
+
+class Row(_message.Message):
+    __slots__ = ("row_identifier", "column_values")
+    ROW_IDENTIFIER_FIELD_NUMBER: _ClassVar[int]
+    COLUMN_VALUES_FIELD_NUMBER: _ClassVar[int]
+    row_identifier: int
+    column_values: str
+    def __init__(self, row_identifier: _Optional[int] = ..., column_values: _Optional[str] = ...) -> None: ...
+
+class TableData(_message.Message):
+    __slots__ = ("table_name", "column_names", "rows")
+    TABLE_NAME_FIELD_NUMBER: _ClassVar[int]
+    COLUMN_NAMES_FIELD_NUMBER: _ClassVar[int]
+    ROWS_FIELD_NUMBER: _ClassVar[int]
+    table_name: str
+    column_names: _containers.RepeatedScalarFieldContainer[str]
+    rows: _containers.RepeatedCompositeFieldContainer[Row]
+    def __init__(self, table_name: _Optional[str] = ..., column_names: _Optional[_Iterable[str]] = ..., rows: _Optional[_Iterable[_Union[Row, _Mapping]]] = ...) -> None: ...
+
+class Response_UpdateRDB(_message.Message):
+    __slots__ = ("tables",)
+    TABLES_FIELD_NUMBER: _ClassVar[int]
+    tables: _containers.RepeatedCompositeFieldContainer[TableData]
+    def __init__(self, tables: _Optional[_Iterable[_Union[TableData, _Mapping]]] = ...) -> None: ...
+
+class Response_PullLDB(_message.Message):
+    __slots__ = ("ldb",)
+    LDB_FIELD_NUMBER: _ClassVar[int]
+    ldb: bytes
+    def __init__(self, ldb: _Optional[bytes] = ...) -> None: ...
+
+class Response_Job(_message.Message):
+    __slots__ = ("job_id", "job_type", "charging_type", "robot_name", "cart", "source_station", "target_station")
+    JOB_ID_FIELD_NUMBER: _ClassVar[int]
+    JOB_TYPE_FIELD_NUMBER: _ClassVar[int]
+    CHARGING_TYPE_FIELD_NUMBER: _ClassVar[int]
+    ROBOT_NAME_FIELD_NUMBER: _ClassVar[int]
+    CART_FIELD_NUMBER: _ClassVar[int]
+    SOURCE_STATION_FIELD_NUMBER: _ClassVar[int]
+    TARGET_STATION_FIELD_NUMBER: _ClassVar[int]
+    job_id: int
+    job_type: str
+    charging_type: str
+    robot_name: str
+    cart: str
+    source_station: str
+    target_station: str
+    def __init__(self, job_id: _Optional[int] = ..., job_type: _Optional[str] = ..., charging_type: _Optional[str] = ..., robot_name: _Optional[str] = ..., cart: _Optional[str] = ..., source_station: _Optional[str] = ..., target_station: _Optional[str] = ...) -> None: ...
+
+class Response_FetchJob(_message.Message):
+    __slots__ = ("message", "job")
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    JOB_FIELD_NUMBER: _ClassVar[int]
+    message: str
+    job: Response_Job
+    def __init__(self, message: _Optional[str] = ..., job: _Optional[_Union[Response_Job, _Mapping]] = ...) -> None: ...
+
+class Response_FreeStation(_message.Message):
+    __slots__ = ("station_name",)
+    STATION_NAME_FIELD_NUMBER: _ClassVar[int]
+    station_name: str
+    def __init__(self, station_name: _Optional[str] = ...) -> None: ...
+
+class Response_PushToLDB(_message.Message):
+    __slots__ = ("success",)
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    def __init__(self, success: _Optional[bool] = ...) -> None: ...
+
+class Response_ResetStationBlocker(_message.Message):
+    __slots__ = ("success",)
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    def __init__(self, success: _Optional[bool] = ...) -> None: ...
+
+class Response_UpdateJobMonitor(_message.Message):
+    __slots__ = ("success",)
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    def __init__(self, success: _Optional[bool] = ...) -> None: ...
+
+class Response_OperationTime(_message.Message):
+    __slots__ = ("msec",)
+    MSEC_FIELD_NUMBER: _ClassVar[int]
+    msec: int
+    def __init__(self, msec: _Optional[int] = ...) -> None: ...
+
+class Response_Ready2PlugInADS(_message.Message):
+    __slots__ = ("ready_to_plugin",)
+    READY_TO_PLUGIN_FIELD_NUMBER: _ClassVar[int]
+    ready_to_plugin: bool
+    def __init__(self, ready_to_plugin: _Optional[bool] = ...) -> None: ...
+
+class Response_BatteryCommunication(_message.Message):
+    __slots__ = ("success",)
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    def __init__(self, success: _Optional[bool] = ...) -> None: ...
+
+class Response_BatteryOperation(_message.Message):
+    __slots__ = ("operation_id", "status", "success", "error")
+    OPERATION_ID_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    ERROR_FIELD_NUMBER: _ClassVar[int]
+    operation_id: str
+    status: str
+    success: bool
+    error: str
+    def __init__(self, operation_id: _Optional[str] = ..., status: _Optional[str] = ..., success: _Optional[bool] = ..., error: _Optional[str] = ...) -> None: ...
+
+class Response_LogText(_message.Message):
+    __slots__ = ("success",)
+    SUCCESS_FIELD_NUMBER: _ClassVar[int]
+    success: bool
+    def __init__(self, success: _Optional[bool] = ...) -> None: ...
+
+class PhaseStatistics(_message.Message):
+    __slots__ = ("name", "count", "p50_ms", "p95_ms", "max_ms", "sql_statements")
+    NAME_FIELD_NUMBER: _ClassVar[int]
+    COUNT_FIELD_NUMBER: _ClassVar[int]
+    P50_MS_FIELD_NUMBER: _ClassVar[int]
+    P95_MS_FIELD_NUMBER: _ClassVar[int]
+    MAX_MS_FIELD_NUMBER: _ClassVar[int]
+    SQL_STATEMENTS_FIELD_NUMBER: _ClassVar[int]
+    name: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    sql_statements: float
+    def __init__(self, name: _Optional[str] = ..., count: _Optional[int] = ..., p50_ms: _Optional[float] = ..., p95_ms: _Optional[float] = ..., max_ms: _Optional[float] = ..., sql_statements: _Optional[float] = ...) -> None: ...
+
+class Response_TickStatistics(_message.Message):
+    __slots__ = ("phases", "slow_tick_threshold", "report")
+    PHASES_FIELD_NUMBER: _ClassVar[int]
+    SLOW_TICK_THRESHOLD_FIELD_NUMBER: _ClassVar[int]
+    REPORT_FIELD_NUMBER: _ClassVar[int]
+    phases: _containers.RepeatedCompositeFieldContainer[PhaseStatistics]
+    slow_tick_threshold: float
+    report: str
+    def __init__(self, phases: _Optional[_Iterable[_Union[PhaseStatistics, _Mapping]]] = ..., slow_tick_threshold: _Optional[float] = ..., report: _Optional[str] = ...) -> None: ...
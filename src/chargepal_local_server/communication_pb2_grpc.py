@@ -0,0 +1,703 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from chargepal_local_server import communication_pb2 as chargepal__local__server_dot_communication__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in chargepal_local_server/communication_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class CommunicationStub:
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.UpdateRDB = channel.unary_unary(
+                '/Communication/UpdateRDB',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_UpdateRDB.FromString,
+                _registered_method=True)
+        self.PullLDB = channel.unary_unary(
+                '/Communication/PullLDB',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_PullLDB.FromString,
+                _registered_method=True)
+        self.UpdateJobMonitor = channel.unary_unary(
+                '/Communication/UpdateJobMonitor',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_UpdateJobMonitor.FromString,
+                _registered_method=True)
+        self.FetchJob = channel.unary_unary(
+                '/Communication/FetchJob',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_FetchJob.FromString,
+                _registered_method=True)
+        self.AskFreeStation = channel.unary_unary(
+                '/Communication/AskFreeStation',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_FreeStation.FromString,
+                _registered_method=True)
+        self.PushToLDB = channel.unary_unary(
+                '/Communication/PushToLDB',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_PushToLDB.FromString,
+                _registered_method=True)
+        self.ResetStationBlocker = channel.unary_unary(
+                '/Communication/ResetStationBlocker',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_ResetStationBlocker.FromString,
+                _registered_method=True)
+        self.OperationTime = channel.unary_unary(
+                '/Communication/OperationTime',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_OperationTime.FromString,
+                _registered_method=True)
+        self.Ready2PlugInADS = channel.unary_unary(
+                '/Communication/Ready2PlugInADS',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_Ready2PlugInADS.FromString,
+                _registered_method=True)
+        self.BatteryCommunication = channel.unary_unary(
+                '/Communication/BatteryCommunication',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_BatteryCommunication.FromString,
+                _registered_method=True)
+        self.SubmitBatteryCommunication = channel.unary_unary(
+                '/Communication/SubmitBatteryCommunication',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_BatteryOperation.FromString,
+                _registered_method=True)
+        self.BatteryOperationStatus = channel.unary_unary(
+                '/Communication/BatteryOperationStatus',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_BatteryOperation.FromString,
+                _registered_method=True)
+        self.LogText = channel.unary_unary(
+                '/Communication/LogText',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_LogText.FromString,
+                _registered_method=True)
+        self.TickStatistics = channel.unary_unary(
+                '/Communication/TickStatistics',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_TickStatistics.FromString,
+                _registered_method=True)
+        self.SubscribeJobs = channel.unary_stream(
+                '/Communication/SubscribeJobs',
+                request_serializer=chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+                response_deserializer=chargepal__local__server_dot_communication__pb2.Response_FetchJob.FromString,
+                _registered_method=True)
+
+
+class CommunicationServicer:
+    """Missing associated documentation comment in .proto file."""
+
+    def UpdateRDB(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PullLDB(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UpdateJobMonitor(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def FetchJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AskFreeStation(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PushToLDB(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ResetStationBlocker(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def OperationTime(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Ready2PlugInADS(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatteryCommunication(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitBatteryCommunication(self, request, context):
+        """Submit a battery request and return its operation without waiting for it.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatteryOperationStatus(self, request, context):
+        """Return the status of the battery operation with operation_id.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def LogText(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TickStatistics(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeJobs(self, request, context):
+        """Stream each job of the requesting robot as soon as it starts, interleaved
+        with keepalive messages. Resubscribing resends a current ongoing job.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_CommunicationServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'UpdateRDB': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateRDB,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_UpdateRDB.SerializeToString,
+            ),
+            'PullLDB': grpc.unary_unary_rpc_method_handler(
+                    servicer.PullLDB,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_PullLDB.SerializeToString,
+            ),
+            'UpdateJobMonitor': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateJobMonitor,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_UpdateJobMonitor.SerializeToString,
+            ),
+            'FetchJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.FetchJob,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_FetchJob.SerializeToString,
+            ),
+            'AskFreeStation': grpc.unary_unary_rpc_method_handler(
+                    servicer.AskFreeStation,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_FreeStation.SerializeToString,
+            ),
+            'PushToLDB': grpc.unary_unary_rpc_method_handler(
+                    servicer.PushToLDB,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_PushToLDB.SerializeToString,
+            ),
+            'ResetStationBlocker': grpc.unary_unary_rpc_method_handler(
+                    servicer.ResetStationBlocker,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_ResetStationBlocker.SerializeToString,
+            ),
+            'OperationTime': grpc.unary_unary_rpc_method_handler(
+                    servicer.OperationTime,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_OperationTime.SerializeToString,
+            ),
+            'Ready2PlugInADS': grpc.unary_unary_rpc_method_handler(
+                    servicer.Ready2PlugInADS,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_Ready2PlugInADS.SerializeToString,
+            ),
+            'BatteryCommunication': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatteryCommunication,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_BatteryCommunication.SerializeToString,
+            ),
+            'SubmitBatteryCommunication': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitBatteryCommunication,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_BatteryOperation.SerializeToString,
+            ),
+            'BatteryOperationStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatteryOperationStatus,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_BatteryOperation.SerializeToString,
+            ),
+            'LogText': grpc.unary_unary_rpc_method_handler(
+                    servicer.LogText,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_LogText.SerializeToString,
+            ),
+            'TickStatistics': grpc.unary_unary_rpc_method_handler(
+                    servicer.TickStatistics,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_TickStatistics.SerializeToString,
+            ),
+            'SubscribeJobs': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeJobs,
+                    request_deserializer=chargepal__local__server_dot_communication__pb2.Request.FromString,
+                    response_serializer=chargepal__local__server_dot_communication__pb2.Response_FetchJob.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Communication', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('Communication', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Communication:
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def UpdateRDB(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/UpdateRDB',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_UpdateRDB.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def PullLDB(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/PullLDB',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_PullLDB.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UpdateJobMonitor(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/UpdateJobMonitor',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_UpdateJobMonitor.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def FetchJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/FetchJob',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_FetchJob.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def AskFreeStation(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/AskFreeStation',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_FreeStation.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def PushToLDB(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/PushToLDB',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_PushToLDB.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ResetStationBlocker(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/ResetStationBlocker',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_ResetStationBlocker.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def OperationTime(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/OperationTime',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_OperationTime.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Ready2PlugInADS(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/Ready2PlugInADS',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_Ready2PlugInADS.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatteryCommunication(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/BatteryCommunication',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_BatteryCommunication.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitBatteryCommunication(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/SubmitBatteryCommunication',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_BatteryOperation.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatteryOperationStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/BatteryOperationStatus',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_BatteryOperation.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def LogText(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/LogText',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_LogText.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TickStatistics(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/Communication/TickStatistics',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_TickStatistics.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubscribeJobs(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/Communication/SubscribeJobs',
+            chargepal__local__server_dot_communication__pb2.Request.SerializeToString,
+            chargepal__local__server_dot_communication__pb2.Response_FetchJob.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,139 @@
+"""Per-thread pool of persistent database connections"""
+
+from typing import Any, Callable, Dict, Generic, TypeVar
+import logging
+import threading
+import time
+
+
+C = TypeVar("C")
+
+
+class PooledConnection(Generic[C]):
+    """
+    Connection owned by one thread with the time it was last used
+    and the number of nested blocks using it, see ConnectionPool.enter().
+    """
+
+    def __init__(self, connection: C) -> None:
+        self.connection = connection
+        self.last_use = time.monotonic()
+        self.depth = 0
+
+
+class ConnectionPool(Generic[C]):
+    """
+    Keep one persistent connection per thread, created with connect on first use.
+
+    A connection idle for longer than health_check_interval seconds is checked
+    with is_alive before it is handed out again and replaced if the check fails.
+    Connections which failed during use must be discarded by their thread,
+    so that its next acquire() reconnects.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], C],
+        is_alive: Callable[[C], bool],
+        health_check_interval: float = 30.0,
+    ) -> None:
+        self.connect = connect
+        self.is_alive = is_alive
+        self.health_check_interval = health_check_interval
+        self.lock = threading.Lock()
+        # Map thread idents to their connections.
+        self.connections: Dict[int, PooledConnection[C]] = {}
+        self.metrics: Dict[str, int] = {
+            "created": 0,
+            "reused": 0,
+            "health_checks": 0,
+            "reconnected": 0,
+            "discarded": 0,
+        }
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.metrics[name] += 1
+
+    def acquire(self) -> C:
+        """Return the connection of the current thread, (re-)connecting if needed."""
+        pooled = self.connections.get(threading.get_ident())
+        if pooled is not None:
+            now = time.monotonic()
+            # Note: Do not replace a connection which an outer block is using.
+            if pooled.depth == 0 and now - pooled.last_use > self.health_check_interval:
+                self.count("health_checks")
+                if not self.check(pooled.connection):
+                    logging.warning("Reconnecting pooled database connection.")
+                    self.count("reconnected")
+                    self.discard()
+                    return self.acquire()
+            pooled.last_use = now
+            self.count("reused")
+            return pooled.connection
+
+        connection = self.connect()
+        with self.lock:
+            self.close_dead_threads()
+            self.connections[threading.get_ident()] = PooledConnection(connection)
+            self.metrics["created"] += 1
+        return connection
+
+    def enter(self) -> C:
+        """Acquire the connection of the current thread for a possibly nested block."""
+        connection = self.acquire()
+        self.connections[threading.get_ident()].depth += 1
+        return connection
+
+    def exit(self) -> bool:
+        """Leave a block entered with enter(). Return whether it was the outermost."""
+        pooled = self.connections.get(threading.get_ident())
+        if pooled is None:
+            # The connection was discarded meanwhile.
+            return True
+        pooled.depth = max(pooled.depth - 1, 0)
+        return pooled.depth == 0
+
+    def check(self, connection: C) -> bool:
+        """Return whether connection is alive, treating errors as dead."""
+        try:
+            return self.is_alive(connection)
+        except Exception:
+            return False
+
+    def discard(self) -> None:
+        """Close and forget the connection of the current thread, if any."""
+        with self.lock:
+            pooled = self.connections.pop(threading.get_ident(), None)
+            if pooled is not None:
+                self.metrics["discarded"] += 1
+        if pooled is not None:
+            close(pooled.connection)
+
+    def close_dead_threads(self) -> None:
+        """Close connections of threads which have finished. Requires the lock."""
+        alive_idents = {thread.ident for thread in threading.enumerate()}
+        for ident in list(self.connections.keys()):
+            if ident not in alive_idents:
+                close(self.connections.pop(ident).connection)
+
+    def close_all(self) -> None:
+        """Close connections of all threads."""
+        with self.lock:
+            pooleds = list(self.connections.values())
+            self.connections.clear()
+        for pooled in pooleds:
+            close(pooled.connection)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Return counts of pool usage and the number of open connections."""
+        with self.lock:
+            return {**self.metrics, "open": len(self.connections)}
+
+
+def close(connection: Any) -> None:
+    """Close connection, ignoring errors of already broken connections."""
+    try:
+        connection.close()
+    except Exception as exception:
+        logging.debug(f"Closing pooled connection failed: {exception}")
@@ -1,10 +1,11 @@
 from typing import Dict, List, Optional, Tuple
 import os
 import sqlite3
+from chargepal_local_server.sqlite_connection import connect as connect_sqlite
 
 
 db_filepath = os.path.join(os.path.dirname(__file__), "db/ldb.db")
-connection = sqlite3.connect(db_filepath)
+connection = connect_sqlite(db_filepath)
 cursor = connection.cursor()
 
 
@@ -13,7 +14,7 @@ def connect(filepath: Optional[str] = None) -> None:
     global db_filepath, connection, cursor
     if filepath:
         db_filepath = filepath
-    connection = sqlite3.connect(db_filepath)
+    connection = connect_sqlite(db_filepath)
     cursor = connection.cursor()
 
 
@@ -0,0 +1,241 @@
+"""In-memory fleet state of the planning database (pdb)"""
+
+from typing import Dict, Iterable, List, Optional, Set, TypeVar
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from sqlmodel import Session, select
+from chargepal_local_server.pdb_interfaces import Booking, Cart, Robot, Station
+from chargepal_local_server.station_occupancy import StationOccupancy
+
+
+T = TypeVar("T")
+
+
+class FleetStore:
+    """
+    Index robots, carts, stations, and bookings of a pdb session by name.
+
+    The store holds the session's own objects, so they stay the source of truth
+    during a tick. Lookups do not query pdb, and modified objects are written back
+    in one batch when the session commits. The session must not expire its objects
+    on commit, see Session(expire_on_commit=False). When the session rolls back,
+    the store is loaded again to discard the changes.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.session.info["fleet_store"] = self
+        self.robots: Dict[str, Robot] = {}
+        self.carts: Dict[str, Cart] = {}
+        self.stations: Dict[str, Station] = {}
+        self.bookings: Dict[int, Booking] = {}
+        # Maintain names of available entities, updated on each assignment.
+        self.available_robots: Set[str] = set()
+        self.available_carts: Set[str] = set()
+        self.available_stations: Set[str] = set()
+        # Remember pdb order of entities for deterministic iteration.
+        self.order: Dict[str, int] = {}
+        self.occupancy = StationOccupancy([])
+        self.load()
+
+    def load(self) -> None:
+        """Load all robots, carts, and stations from pdb."""
+        self.robots = {
+            robot.name: robot for robot in self.select_existing(select(Robot))
+        }
+        self.carts = {cart.name: cart for cart in self.select_existing(select(Cart))}
+        self.stations = {
+            station.station_name: station
+            for station in self.select_existing(select(Station))
+        }
+        self.order = {
+            name: index
+            for index, name in enumerate(
+                [*self.robots.keys(), *self.carts.keys(), *self.stations.keys()]
+            )
+        }
+        self.update_available_sets()
+        self.occupancy = StationOccupancy(self.stations.keys())
+        for station in self.stations.values():
+            self.occupancy.update_reservation(station.station_name, station.reservation)
+        self.update_occupancy()
+
+    def refresh(
+        self,
+        robot_names: Optional[Iterable[str]] = None,
+        cart_names: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Reload robots and carts with names which have been updated from ldb,
+        or all of them if names are None.
+        """
+        robot_statement = select(Robot)
+        if robot_names is not None:
+            robot_names = list(robot_names)
+            robot_statement = robot_statement.where(Robot.name.in_(robot_names))
+        if robot_names is None or robot_names:
+            for robot in self.select_existing(robot_statement):
+                self.robots[robot.name] = robot
+        cart_statement = select(Cart)
+        if cart_names is not None:
+            cart_names = list(cart_names)
+            cart_statement = cart_statement.where(Cart.name.in_(cart_names))
+        if cart_names is None or cart_names:
+            for cart in self.select_existing(cart_statement):
+                self.carts[cart.name] = cart
+        self.update_available_sets()
+        self.update_occupancy()
+
+    def add_bookings(self, bookings: Iterable[Booking]) -> None:
+        """Index bookings which have been loaded by the store's session."""
+        for booking in bookings:
+            self.bookings[booking.id] = booking
+
+    def refresh_bookings(self, booking_ids: Iterable[int]) -> None:
+        """Reload bookings with booking_ids which have been updated in pdb."""
+        booking_ids = list(booking_ids)
+        if booking_ids:
+            for booking in self.select_existing(
+                select(Booking).where(Booking.id.in_(booking_ids))
+            ):
+                self.bookings[booking.id] = booking
+
+    def select_existing(self, statement: object) -> List[object]:
+        """Return results of statement, overwriting objects already in the session."""
+        return list(
+            self.session.exec(
+                statement.execution_options(populate_existing=True)
+            ).fetchall()
+        )
+
+    def update_available_sets(self) -> None:
+        """Rebuild the available sets from the current objects."""
+        self.available_robots = {
+            name for name, robot in self.robots.items() if robot.available
+        }
+        self.available_carts = {
+            name for name, cart in self.carts.items() if cart.available
+        }
+        self.available_stations = {
+            name for name, station in self.stations.items() if station.available
+        }
+
+    def update_occupancy(self) -> None:
+        """Update station occupancy from the current cart locations."""
+        for cart in self.carts.values():
+            self.occupancy.update_cart_location(cart.name, cart.cart_location)
+
+    def sorted_by_order(self, names: Iterable[str], entities: Dict[str, T]) -> List[T]:
+        """Return entities for names in pdb order."""
+        return [
+            entities[name]
+            for name in sorted(names, key=lambda name: self.order.get(name, -1))
+        ]
+
+    def get_robot(self, name: str) -> Optional[Robot]:
+        """Return robot with name."""
+        return self.robots.get(name)
+
+    def get_cart(self, name: str) -> Optional[Cart]:
+        """Return cart with name."""
+        return self.carts.get(name)
+
+    def get_station(self, name: str) -> Optional[Station]:
+        """Return station with name."""
+        return self.stations.get(name)
+
+    def get_booking(self, booking_id: int) -> Optional[Booking]:
+        """Return booking with booking_id, loading it from pdb on first access."""
+        if booking_id not in self.bookings.keys():
+            booking = self.session.get(Booking, booking_id)
+            if booking is None:
+                return None
+            self.bookings[booking_id] = booking
+        return self.bookings[booking_id]
+
+    def get_cart_for_booking(self, booking_id: int) -> Optional[Cart]:
+        """Return cart currently used for booking_id."""
+        for cart in self.carts.values():
+            if cart.booking_id == booking_id:
+                return cart
+        return None
+
+    def get_available_robots(self) -> List[Robot]:
+        """Return list of available robots."""
+        return self.sorted_by_order(self.available_robots, self.robots)
+
+    def get_available_carts(self) -> List[Cart]:
+        """Return list of available carts."""
+        return self.sorted_by_order(self.available_carts, self.carts)
+
+    def get_available_stations(self) -> List[Station]:
+        """Return list of available stations."""
+        return self.sorted_by_order(self.available_stations, self.stations)
+
+    def get_free_stations(self, station_prefix: str) -> List[Station]:
+        """Return list of stations with station_prefix neither occupied nor reserved."""
+        return self.sorted_by_order(
+            (
+                name
+                for name in self.occupancy.get_free_stations(station_prefix)
+                if name in self.stations.keys()
+            ),
+            self.stations,
+        )
+
+
+def get_fleet_store(instance: object) -> Optional[FleetStore]:
+    """Return the FleetStore of the session instance belongs to, if any."""
+    session = object_session(instance)
+    return session.info.get("fleet_store") if session else None
+
+
+def update_available(names: Set[str], name: str, available: bool) -> None:
+    """Add name to or discard it from names according to available."""
+    if available:
+        names.add(name)
+    else:
+        names.discard(name)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def on_rollback(session: Session, _: object) -> None:
+    store = session.info.get("fleet_store")
+    # Note: Reload only once the session can be used again.
+    if store and session.is_active:
+        store.load()
+
+
+@event.listens_for(Robot.available, "set")
+def on_robot_available(robot: Robot, value: bool, *_: object) -> None:
+    store = get_fleet_store(robot)
+    if store and robot.name in store.robots.keys():
+        update_available(store.available_robots, robot.name, value)
+
+
+@event.listens_for(Cart.available, "set")
+def on_cart_available(cart: Cart, value: bool, *_: object) -> None:
+    store = get_fleet_store(cart)
+    if store and cart.name in store.carts.keys():
+        update_available(store.available_carts, cart.name, value)
+
+
+@event.listens_for(Station.available, "set")
+def on_station_available(station: Station, value: bool, *_: object) -> None:
+    store = get_fleet_store(station)
+    if store and station.station_name in store.stations.keys():
+        update_available(store.available_stations, station.station_name, value)
+
+
+@event.listens_for(Cart.cart_location, "set")
+def on_cart_location(cart: Cart, value: str, *_: object) -> None:
+    store = get_fleet_store(cart)
+    if store and cart.name in store.carts.keys():
+        store.occupancy.update_cart_location(cart.name, value)
+
+
+@event.listens_for(Station.reservation, "set")
+def on_station_reservation(station: Station, value: Optional[str], *_: object) -> None:
+    store = get_fleet_store(station)
+    if store and station.station_name in store.stations.keys():
+        store.occupancy.update_reservation(station.station_name, value)
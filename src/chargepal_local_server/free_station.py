@@ -2,6 +2,7 @@ from typing import Dict, Iterable, Optional, List, Set, Tuple, Union
 from collections import defaultdict
 from chargepal_local_server.access_ldb import LDB
 from chargepal_local_server.layout import Layout
+from chargepal_local_server.sqlite_connection import connect
 import os
 import re
 import sqlite3
@@ -44,7 +45,7 @@ def search_free_station(robot_name: str, station_prefix: str) -> str:
     free_station = ""
     blocked_stations: Set[str] = set()
 
-    connection = sqlite3.connect(os.path.join(os.path.dirname(__file__), "db/ldb.db"))
+    connection = connect(os.path.join(os.path.dirname(__file__), "db/ldb.db"))
     cursor = connection.cursor()
     # Determine station_name from current robot_location
     #  and add it to this robot's blockers.
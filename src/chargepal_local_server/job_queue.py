@@ -0,0 +1,88 @@
+"""Deadline-ordered priority queue of open jobs"""
+
+from typing import Dict, Iterator, List, Set, Tuple
+from datetime import datetime
+import heapq
+import itertools
+from chargepal_local_server.pdb_interfaces import Job
+
+
+# Entry of (deadline, schedule, count, job), where count breaks ties in insertion order.
+QueueEntry = Tuple[datetime, datetime, int, Job]
+
+
+class JobQueue:
+    """
+    Maintain open jobs in a heap ordered by earliest deadline first, then by schedule.
+    Jobs without deadline come after all jobs with one.
+
+    Jobs which are no longer open are discarded lazily,
+    i.e. they are skipped and only removed once they reach the head of the heap.
+    """
+
+    def __init__(self) -> None:
+        self.heap: List[QueueEntry] = []
+        self.counter = itertools.count()
+        # Map job object ids to counts of their entries.
+        self.counts: Dict[int, int] = {}
+        self.discarded: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.heap) - len(self.discarded)
+
+    def __contains__(self, job: Job) -> bool:
+        return id(job) in self.counts.keys()
+
+    def push(self, job: Job) -> None:
+        """Add open job to the queue. Do not push while iterating."""
+        if job in self:
+            return
+        self.clean_up()
+        count = next(self.counter)
+        self.counts[id(job)] = count
+        heapq.heappush(
+            self.heap,
+            (
+                job.deadline if job.deadline else datetime.max,
+                job.schedule if job.schedule else datetime.max,
+                count,
+                job,
+            ),
+        )
+
+    def discard(self, job: Job) -> None:
+        """Remove job from the queue if it is queued. This is safe while iterating."""
+        count = self.counts.pop(id(job), None)
+        if count is not None:
+            self.discarded.add(count)
+
+    def clean_up(self) -> None:
+        """Remove discarded entries from the head of the heap, or compact the heap."""
+        while self.heap and self.heap[0][2] in self.discarded:
+            self.discarded.remove(heapq.heappop(self.heap)[2])
+        if len(self.discarded) > len(self.heap) // 2:
+            self.heap = [entry for entry in self.heap if entry[2] not in self.discarded]
+            heapq.heapify(self.heap)
+            self.discarded.clear()
+
+    def peek(self) -> Job:
+        """Return the most urgent job without removing it."""
+        self.clean_up()
+        return self.heap[0][-1]
+
+    def __iter__(self) -> Iterator[Job]:
+        """
+        Yield queued jobs in order without removing them. Each yielded job
+        costs O(log n), so stopping early only looks at the head of the queue.
+        Jobs discarded during iteration are skipped.
+        """
+        self.clean_up()
+        heap = self.heap
+        candidates: List[Tuple[QueueEntry, int]] = [(heap[0], 0)] if heap else []
+        while candidates:
+            entry, index = heapq.heappop(candidates)
+            if entry[2] not in self.discarded:
+                yield entry[-1]
+            for child_index in (2 * index + 1, 2 * index + 2):
+                if child_index < len(heap):
+                    heapq.heappush(candidates, (heap[child_index], child_index))
@@ -1,7 +1,9 @@
 """Helper script to define parking area layout details"""
 
+from typing import Dict, Iterable, Tuple
 from functools import lru_cache
 from sqlmodel import Session, select
+import numpy as np
 from chargepal_local_server.pdb_interfaces import Distance, pdb_engine
 
 # Use reference layout from simulation for now, see:
@@ -68,3 +70,38 @@ class Layout:
             if result is not None and hasattr(result, target):
                 return getattr(result, target)
         return MAX_DISTANCE
+
+    @classmethod
+    @lru_cache
+    def get_distance_table(cls) -> Tuple[Dict[str, int], Dict[str, int], np.ndarray]:
+        """
+        Return row indices of sources, column indices of targets,
+        and the matrix of all distances, retrieved from pdb.
+        The last row and column contain MAX_DISTANCE for unknown stations.
+        """
+        target_names = [name for name in Distance.__annotations__.keys()][1:]
+        with Session(pdb_engine) as session:
+            results = session.exec(select(Distance)).fetchall()
+            source_names = [result.start for result in results]
+            table = np.full(
+                (len(source_names) + 1, len(target_names) + 1), MAX_DISTANCE
+            )
+            for source_index, result in enumerate(results):
+                table[source_index, :-1] = [
+                    getattr(result, target) for target in target_names
+                ]
+        return (
+            {name: index for index, name in enumerate(source_names)},
+            {name: index for index, name in enumerate(target_names)},
+            table,
+        )
+
+    @classmethod
+    def get_distances(
+        cls, sources: Iterable[str], targets: Iterable[str]
+    ) -> np.ndarray:
+        """Return matrix of distances from each of sources to each of targets."""
+        source_indices, target_indices, table = cls.get_distance_table()
+        rows = np.array([source_indices.get(source, -1) for source in sources], int)
+        columns = np.array([target_indices.get(target, -1) for target in targets], int)
+        return table[np.ix_(rows, columns)]
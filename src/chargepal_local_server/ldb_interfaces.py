@@ -2,7 +2,8 @@
 
 from typing import Optional
 import os
-from sqlmodel import Field, SQLModel, create_engine
+from sqlmodel import Field, SQLModel
+from chargepal_local_server.sqlite_connection import create_sqlite_engine
 
 
 class Robot_info(SQLModel, table=True):
@@ -35,5 +36,5 @@ class Env_info(SQLModel, table=True):
 
 
 ldb_filepath = os.path.join(os.path.dirname(__file__), "db/ldb.db")
-ldb_engine = create_engine(f"sqlite:///{ldb_filepath}")
+ldb_engine = create_sqlite_engine(ldb_filepath)
 SQLModel.metadata.create_all(ldb_engine)
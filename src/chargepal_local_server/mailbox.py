@@ -0,0 +1,106 @@
+"""Thread-safe FIFO mailbox of requests handled by a single owner thread"""
+
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+from collections import deque
+from concurrent import futures
+import threading
+
+
+class MailboxEntry:
+    """Queued call of callback with args, awaited by futures."""
+
+    def __init__(
+        self,
+        callback: Callable[..., Any],
+        args: tuple,
+        key: Optional[Hashable],
+        unclaimed: Optional[Callable[[Any], None]],
+    ) -> None:
+        self.callback = callback
+        self.args = args
+        self.key = key
+        self.unclaimed = unclaimed
+        self.futures: List[futures.Future] = []
+
+
+class Mailbox:
+    """
+    Queue requests from any thread and handle them in FIFO order
+    in the thread which owns the state they access.
+
+    Requests with the same key are coalesced while they are queued,
+    i.e. the callback is called once and its result is set to all their futures.
+    Futures canceled before their request is handled do not receive a result.
+    If all futures of a request are canceled, its result is passed to unclaimed.
+    """
+
+    def __init__(self, on_request: Optional[Callable[[], None]] = None) -> None:
+        self.on_request = on_request
+        self.lock = threading.Lock()
+        self.entries: Deque[MailboxEntry] = deque()
+        # Map keys to their queued entries for coalescing.
+        self.keyed_entries: Dict[Hashable, MailboxEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def request(
+        self,
+        callback: Callable[..., Any],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        unclaimed: Optional[Callable[[Any], None]] = None,
+    ) -> futures.Future:
+        """Queue call of callback with args and return future of its result."""
+        future: futures.Future = futures.Future()
+        with self.lock:
+            entry = self.keyed_entries.get(key) if key is not None else None
+            if entry is None:
+                entry = MailboxEntry(callback, args, key, unclaimed)
+                self.entries.append(entry)
+                if key is not None:
+                    self.keyed_entries[key] = entry
+            entry.futures.append(future)
+        if self.on_request:
+            self.on_request()
+        return future
+
+    def handle(self, max_count: Optional[int] = None) -> int:
+        """
+        Handle up to max_count queued requests, or all which are queued
+        when called. Return number of handled requests.
+        """
+        with self.lock:
+            count = len(self.entries)
+            if max_count is not None:
+                count = min(count, max_count)
+            batch = [self.entries.popleft() for _ in range(count)]
+            for entry in batch:
+                if self.keyed_entries.get(entry.key) is entry:
+                    del self.keyed_entries[entry.key]
+        for index, entry in enumerate(batch):
+            waiting_futures = [
+                future
+                for future in entry.futures
+                if future.set_running_or_notify_cancel()
+            ]
+            try:
+                result = entry.callback(*entry.args)
+            except BaseException as exception:
+                for future in waiting_futures:
+                    future.set_exception(exception)
+                self.requeue(batch[index + 1 :])
+                raise
+            for future in waiting_futures:
+                future.set_result(result)
+            if not waiting_futures and entry.unclaimed:
+                entry.unclaimed(result)
+        return len(batch)
+
+    def requeue(self, entries: List[MailboxEntry]) -> None:
+        """Put entries back to the front of the queue in their order."""
+        with self.lock:
+            self.entries.extendleft(reversed(entries))
+            for entry in entries:
+                if entry.key is not None:
+                    self.keyed_entries.setdefault(entry.key, entry)
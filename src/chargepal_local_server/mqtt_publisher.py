@@ -0,0 +1,156 @@
+"""Long-lived MQTT client publishing from a background network loop"""
+
+from typing import Any, Deque, Dict, Optional, Set
+from collections import deque
+import logging
+import threading
+import time
+import paho.mqtt.client as mqtt
+
+
+class MQTTPublisher:
+    """
+    Publish messages with one persistent MQTT connection, which is opened
+    on first use and kept alive by paho's network loop thread.
+
+    The loop reconnects with backoff between reconnect_min_delay and
+    reconnect_max_delay seconds after the connection is lost. Messages are
+    published with qos, and up to max_queued_messages unconfirmed ones are queued
+    by paho and sent again after reconnecting. Further messages are rejected.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        keepalive: int,
+        qos: int = 1,
+        max_queued_messages: int = 100,
+        publish_timeout: float = 10.0,
+        reconnect_min_delay: int = 1,
+        reconnect_max_delay: int = 30,
+        latency_window: int = 1000,
+        client: Optional[mqtt.Client] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.qos = qos
+        self.publish_timeout = publish_timeout
+        if client is None:
+            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        self.client = client
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_publish = self.on_publish
+        self.client.reconnect_delay_set(reconnect_min_delay, reconnect_max_delay)
+        self.client.max_queued_messages_set(max_queued_messages)
+        self.lock = threading.Lock()
+        self.started = False
+        self.connected = False
+        # Map message ids to events set when the broker confirms them.
+        self.confirmations: Dict[int, threading.Event] = {}
+        # Message ids for which publish() stopped waiting, until paho reuses them.
+        self.abandoned_mids: Set[int] = set()
+        # Seconds from publishing until confirmation of recent messages.
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.metrics: Dict[str, int] = {
+            "published": 0,
+            "confirmed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "disconnects": 0,
+        }
+
+    def start(self) -> None:
+        """Connect asynchronously and start the network loop unless started."""
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        self.client.connect_async(self.host, self.port, self.keepalive)
+        self.client.loop_start()
+
+    def stop(self) -> None:
+        """Disconnect and stop the network loop if started."""
+        with self.lock:
+            if not self.started:
+                return
+            self.started = False
+        self.client.disconnect()
+        self.client.loop_stop()
+
+    def on_connect(self, client: Any, userdata: Any, *args: Any) -> None:
+        logging.info(f"Connected to MQTT broker at {self.host}:{self.port}.")
+        with self.lock:
+            self.connected = True
+            self.metrics["connects"] += 1
+
+    def on_disconnect(self, client: Any, userdata: Any, *args: Any) -> None:
+        logging.warning(f"Disconnected from MQTT broker at {self.host}:{self.port}.")
+        with self.lock:
+            self.connected = False
+            self.metrics["disconnects"] += 1
+
+    def on_publish(self, client: Any, userdata: Any, mid: int, *args: Any) -> None:
+        if self.qos == 0:
+            return
+        # Note: Confirmations can arrive before publish() starts waiting for them.
+        with self.lock:
+            if mid in self.abandoned_mids:
+                self.abandoned_mids.remove(mid)
+                self.metrics["confirmed"] += 1
+                return
+            confirmation = self.confirmations.setdefault(mid, threading.Event())
+        confirmation.set()
+
+    def publish(self, topic: str, payload: str) -> bool:
+        """
+        Publish payload to topic and wait up to publish_timeout seconds
+        for its confirmation. Return whether it was confirmed in time.
+        """
+        self.start()
+        start_time = time.monotonic()
+        info = self.client.publish(topic, payload, qos=self.qos)
+        if info.rc == mqtt.MQTT_ERR_QUEUE_SIZE:
+            logging.warning(f"MQTT queue is full, dropped '{payload}' to {topic}.")
+            with self.lock:
+                self.metrics["rejected"] += 1
+            return False
+
+        with self.lock:
+            self.metrics["published"] += 1
+            if self.qos == 0:
+                return True
+            if info.mid in self.abandoned_mids:
+                # Note: paho reuses message ids once they wrap around, so the abandoned
+                #  message with this id will not be confirmed anymore.
+                self.abandoned_mids.remove(info.mid)
+                self.confirmations[info.mid] = threading.Event()
+            confirmation = self.confirmations.setdefault(info.mid, threading.Event())
+        confirmed = confirmation.wait(self.publish_timeout)
+        with self.lock:
+            del self.confirmations[info.mid]
+            if confirmed:
+                self.metrics["confirmed"] += 1
+                self.latencies.append(time.monotonic() - start_time)
+            else:
+                # Note: paho still delivers the message, e.g. after reconnecting.
+                self.abandoned_mids.add(info.mid)
+                self.metrics["timeouts"] += 1
+        if not confirmed:
+            logging.warning(f"MQTT publish of '{payload}' to {topic} timed out.")
+        return confirmed
+
+    def get_statistics(self) -> Dict[str, float]:
+        """Return counts of publishing and connection events and latencies."""
+        with self.lock:
+            latencies = list(self.latencies)
+            return {
+                **self.metrics,
+                "connected": int(self.connected),
+                "waiting": len(self.confirmations),
+                "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+                "latency_max": max(latencies, default=0.0),
+            }
@@ -0,0 +1,77 @@
+"""Fast parsers of datetime, timedelta, and number values from SQL strings"""
+
+from typing import Optional, Union
+from datetime import datetime, timedelta
+from functools import lru_cache
+import re
+
+
+# Maximum number of distinct strings remembered by each parser.
+PARSE_CACHE_SIZE = 4096
+ISO_DATETIME_PATTERN = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}$"
+)
+DATETIME_PATTERN = re.compile(r"(\d+)-(\d+)-(\d+) (\d+):(\d+):(\d+)$")
+TIMEDELTA_PATTERN = re.compile(r"(\d+):(\d+):(\d+)$")
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_datetime_string(string: str) -> Optional[datetime]:
+    """Parse datetime from str in format "%Y-%m-%d %H:%M:%S", or return None."""
+    if ISO_DATETIME_PATTERN.match(string):
+        return datetime.fromisoformat(string)
+    if DATETIME_PATTERN.match(string):
+        # Note: Fall back to strptime for fields without leading zeros.
+        return datetime.strptime(string, "%Y-%m-%d %H:%M:%S")
+    return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_timedelta_string(string: str) -> Optional[timedelta]:
+    """Parse timedelta from str in format "hours:minutes:seconds", or return None."""
+    match = TIMEDELTA_PATTERN.match(string)
+    if not match:
+        return None
+
+    hours_str, minutes_str, seconds_str = match.groups()
+    return timedelta(
+        hours=int(hours_str), minutes=int(minutes_str), seconds=int(seconds_str)
+    )
+
+
+def parse_datetime(datetime_object: object) -> Optional[datetime]:
+    """Parse datetime from SQL object."""
+    if isinstance(datetime_object, datetime):
+        return datetime_object
+    if not datetime_object:
+        return None
+
+    return parse_datetime_string(datetime_object)
+
+
+def parse_timedelta(string: Optional[str]) -> Optional[timedelta]:
+    """Parse timedelta from SQL string."""
+    return parse_timedelta_string(string) if string else None
+
+
+def parse_number(string: str) -> Union[int, float, None]:
+    """Parse int or float from numeric str without leading zeros, or return None."""
+    if string.isnumeric() and not string.startswith("0"):
+        return float(string) if "." in string else int(string)
+    return None
+
+
+def parse_any(obj: object) -> object:
+    """Parse any str into its supported object type."""
+    if isinstance(obj, str):
+        for parse in (parse_datetime_string, parse_timedelta_string, parse_number):
+            result = parse(obj)
+            if result is not None:
+                return result
+    return obj
+
+
+def clear_caches() -> None:
+    """Forget all cached parse results."""
+    parse_datetime_string.cache_clear()
+    parse_timedelta_string.cache_clear()
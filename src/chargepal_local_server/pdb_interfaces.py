@@ -3,7 +3,8 @@
 from typing import Optional
 from datetime import datetime, timedelta
 import os
-from sqlmodel import Field, SQLModel, create_engine
+from sqlmodel import Field, SQLModel
+from chargepal_local_server.sqlite_connection import create_sqlite_engine
 
 
 def to_str(obj: object) -> str:
@@ -171,5 +172,5 @@ class Distance(SQLModel, table=True):
 
 
 pdb_filepath = os.path.join(os.path.dirname(__file__), "db/pdb.db")
-pdb_engine = create_engine(f"sqlite:///{pdb_filepath}")
+pdb_engine = create_sqlite_engine(pdb_filepath)
 SQLModel.metadata.create_all(pdb_engine)
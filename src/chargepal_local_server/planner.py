@@ -1,14 +1,20 @@
 """Rule-based planner for ChargePal robot fleet control"""
 
 #!/usr/bin/env python3
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, TypeVar
+from concurrent import futures
 from datetime import datetime, timedelta
 from enum import IntEnum
 from sqlmodel import Session, select
-from chargepal_local_server.access_ldb import LDB
-from chargepal_local_server.battery_communication import UpdateManager
+from chargepal_local_server.access_ldb import LDB, MySQLAccess, use_statement_listener
+from chargepal_local_server.assignment import solve_assignment
+from chargepal_local_server.battery_communication import UpdateManager, use_mirror
+from chargepal_local_server.changelog import ChangeLog, Dialect
+from chargepal_local_server.fleet_store import FleetStore
 from chargepal_local_server.free_station import search_free_station
+from chargepal_local_server.job_queue import JobQueue
 from chargepal_local_server.layout import Layout
+from chargepal_local_server.mailbox import Mailbox
 from chargepal_local_server.pdb_interfaces import (
     Booking,
     Cart,
@@ -17,10 +23,20 @@ from chargepal_local_server.pdb_interfaces import (
     Station,
     pdb_engine,
 )
-from chargepal_local_server.update_pdb import copy_from_ldb, fetch_updated_bookings
+from chargepal_local_server.tick_profiler import PhaseExecutor, TickProfiler
+from chargepal_local_server.update_pdb import (
+    copy_from_ldb,
+    fetch_updated_bookings,
+    reset_sync,
+    use_changelogs,
+)
 import logging
-import time
+import numpy as np
+import queue
+import threading
+
 
+T = TypeVar("T")
 
 # Estimate duration a robot needs to actively handle a job.
 ROBOT_JOB_DURATION = timedelta(minutes=1)
@@ -75,20 +91,68 @@ class PlugInState(IntEnum):
     SUCCESS = 5
 
 
+class AssignmentMode:
+    # Assign each open job in turn to its nearest cart and robot.
+    GREEDY = "greedy"
+    # Assign all open BRING_CHARGER jobs at once with minimum total travel.
+    OPTIMAL = "optimal"
+
+
 def get_list_str_of_dict(entries: Dict[str, str]) -> str:
     return ", ".join(f"{key}: {value}" for key, value in entries.items())
 
 
+def get_empty_job_details(robot_name: str) -> Dict[str, str]:
+    """Return job details for robot_name without any job."""
+    return {
+        "job_id": 0,
+        "job_type": "",
+        "charging_type": "",
+        "robot_name": robot_name,
+        "cart": "",
+        "source_station": "",
+        "target_station": "",
+    }
+
+
 class Planner:
-    def __init__(self) -> None:
-        self.session = Session(pdb_engine)
+    def __init__(
+        self,
+        assignment_mode: str = AssignmentMode.GREEDY,
+        slow_tick_threshold: Optional[float] = 1.0,
+        reply_timeout: float = 0.5,
+        lookahead_horizon: Optional[timedelta] = None,
+        use_changelog: bool = False,
+        single_transaction: bool = False,
+        io_workers: int = 2,
+    ) -> None:
+        # Note: Keep objects loaded after commits since the fleet store refers to them.
+        self.session = Session(pdb_engine, expire_on_commit=False)
+        self.fleet = FleetStore(self.session)
+        # Read only rows logged as changed by triggers instead of scanning tables.
+        use_changelogs(use_changelog)
+        battery_changelog: Optional[ChangeLog] = None
+        if use_changelog and MySQLAccess.is_configured():
+            battery_changelog = ChangeLog(
+                MySQLAccess,
+                Dialect.MYSQL,
+                {
+                    "CAN_MSG_RX_LIVE": "Battry_ID",
+                    "TX_ChargeOrdersFeedback": "Battry_ID",
+                },
+                "changelog_battery",
+            )
+            battery_changelog.install()
         self.battery_manager = UpdateManager(
-            {f"BAT_{number}": f"Battery_DUS_{number:02d}" for number in range(1, 7)}
+            {f"BAT_{number}": f"Battery_DUS_{number:02d}" for number in range(1, 7)},
+            battery_changelog,
         )
-        self.robot_count = len(self.session.exec(select(Robot)).fetchall())
-        carts = self.session.exec(select(Cart)).fetchall()
-        self.cart_count = len(carts)
-        self.stations = list(self.session.exec(select(Station)).fetchall())
+        if MySQLAccess.is_configured():
+            # Serve battery reads of battery requests from the same mirror.
+            use_mirror(self.battery_manager.mirror)
+        self.robot_count = len(self.fleet.robots)
+        self.cart_count = len(self.fleet.carts)
+        self.stations = list(self.fleet.stations.values())
         self.ADS_count, self.BCS_count, self.BWS_count, self.RBS_count = [
             sum(
                 1
@@ -98,6 +162,7 @@ class Planner:
             for prefix in ("ADS_", "BCS_", "BWS_", "RBS_")
         ]
         self.layout = Layout()
+        self.assignment_mode = assignment_mode
         self.active = True
         # Manage currently ready chargers, which expect their next commands.
         self.ready_chargers: Dict[str, ChargerCommand] = {}
@@ -105,40 +170,82 @@ class Planner:
         self.plugin_states: Dict[int, PlugInState] = {}
         # Delete existing bookings from the database for development phase.
         LDB.delete_bookings()
+        # Copy all of ldb in the first tick.
+        reset_sync()
         # Store whether planner received updated bookings.
         self.bookings_updated = False
-        # Store job requests from job for synchroneous handling.
-        self.job_requests: List[Tuple[Callable[..., object], Tuple[str, ...]]] = []
-        # Maintain jobs to be fetched by robots.
+        # Stage carts for booked bookings planned to arrive within lookahead_horizon.
+        self.lookahead_horizon = lookahead_horizon
+        # Maintain booked bookings without any job yet, which could be staged.
+        self.planned_bookings: Dict[int, Booking] = {}
+        # Queue requests from other threads, since only the planner thread
+        # may access the planner's state.
+        self.mailbox = Mailbox(on_request=self.notify)
+        # Hand over jobs to robots whose fetch requests timed out.
         self.next_jobs: Dict[str, object] = {}
+        # Wait at most reply_timeout seconds for the planner to handle a request.
+        self.reply_timeout = reply_timeout
+        # Maintain queues of robots subscribed to their jobs, see subscribe_jobs().
+        self.subscriptions: Dict[str, queue.Queue] = {}
+        self.subscription_lock = threading.Lock()
+        # Maintain open jobs ordered by urgency.
+        self.open_jobs = JobQueue()
+        for job in self.session.exec(
+            select(Job).where(Job.state == JobState.OPEN)
+        ).fetchall():
+            self.open_jobs.push(job)
+        # Wake up the planner loop as soon as there is something to handle.
+        self.wakeup = threading.Event()
+        # Measure phases of each tick and log ticks slower than slow_tick_threshold.
+        self.profiler = TickProfiler(slow_tick_threshold=slow_tick_threshold)
+        self.profiler.count_statements(pdb_engine)
+        use_statement_listener(self.profiler.on_execute)
+        # Share the planner session with syncs and commit once per tick.
+        self.single_transaction = single_transaction
+        self.ticking = False
+        # Fetch from ldb and lsv_db concurrently within ticks if there are io_workers,
+        #  measuring each fetch as phase of the tick.
+        self.io_executor = (
+            PhaseExecutor(
+                self.profiler,
+                futures.ThreadPoolExecutor(io_workers, thread_name_prefix="planner_io"),
+            )
+            if io_workers > 0
+            else None
+        )
+
+    def commit(self) -> None:
+        """Commit the planner session, unless the tick commits once at its end."""
+        if not (self.single_transaction and self.ticking):
+            self.session.commit()
+
+    def notify(self) -> None:
+        """Wake up the planner loop to tick as soon as possible."""
+        self.wakeup.set()
 
     def get_robot(self, name: str) -> Robot:
         """Return robot with name."""
-        return self.session.exec(select(Robot).where(Robot.name == name)).first()
+        return self.fleet.get_robot(name)
 
     def get_available_robots(self) -> List[Robot]:
         """Return list of available robots."""
-        return list(self.session.exec(select(Robot).where(Robot.available)).fetchall())
+        return self.fleet.get_available_robots()
 
     def get_cart(self, name: str) -> Cart:
         """Return cart with name."""
-        return self.session.exec(select(Cart).where(Cart.name == name)).first()
+        return self.fleet.get_cart(name)
 
     def get_available_carts(self) -> List[Cart]:
         """Return list of available carts."""
-        return list(self.session.exec(select(Cart).where(Cart.available)).fetchall())
+        return self.fleet.get_available_carts()
 
     def get_station(self, name: str) -> Station:
         """Return station with name."""
-        return self.session.exec(
-            select(Station).where(Station.station_name == name)
-        ).first()
+        return self.fleet.get_station(name)
 
     def get_booking(self, booking_id: int) -> Booking:
         """Return booking with booking_id."""
-        return self.session.exec(
-            select(Booking).where(Booking.id == booking_id)
-        ).first()
+        return self.fleet.get_booking(booking_id)
 
     def get_current_job(self, robot_name: str) -> Optional[Job]:
         """Return robot's currently assigned job."""
@@ -162,6 +269,8 @@ class Planner:
                 ).first()
             ), f"{job.robot_name} already has a pending job."
         self.session.add(job)
+        if job.state == JobState.OPEN:
+            self.open_jobs.push(job)
         return job
 
     def assign_job(self, job: Job, robot_name: str) -> None:
@@ -172,12 +281,14 @@ class Planner:
         job.state = JobState.PENDING
         job.currently_assigned = True
         job.robot_name = robot_name
+        self.open_jobs.discard(job)
         logging.debug(f"{job} assigned to {robot_name}.")
 
     def cancel_job(self, job: Job) -> None:
         """Cancel job and clear referenced resources."""
         job.state = JobState.CANCELED
         job.currently_assigned = False
+        self.open_jobs.discard(job)
         if job.robot_name:
             robot = self.get_robot(job.robot_name)
             robot.current_job = None
@@ -228,41 +339,39 @@ class Planner:
 
     def is_station_occupied(self, station_name: str) -> bool:
         """Return whether station is reserved for or used by any cart."""
-        cart_locations = self.session.exec(select(Cart.cart_location)).fetchall()
-        return self.get_station(station_name).reservation or any(
-            station_name in cart_location for cart_location in cart_locations
-        )
+        return self.fleet.occupancy.is_occupied(station_name)
 
-    def pop_nearest_station(self, location: str) -> Optional[Station]:
-        """Find nearest available battery charging station to location."""
-        available_stations = [
-            station
-            for station in self.stations
-            if station.station_name.startswith("BCS_")
-        ]
+    def pop_nearest_station(
+        self, location: str, station_prefix: str = "BCS_"
+    ) -> Optional[Station]:
+        """Find nearest available station to location, a battery charging station by default."""
+        available_stations = self.fleet.get_free_stations(station_prefix)
         station: Optional[Station] = None
         best_distance = float("inf")
         while available_stations:
             check = available_stations.pop(0)
-            if not self.is_station_occupied(check.station_name):
-                distance = self.layout.get_distance(check.station_name, location)
-                if distance < best_distance:
-                    station = check
-                    best_distance = distance
+            distance = self.layout.get_distance(check.station_name, location)
+            if distance < best_distance:
+                station = check
+                best_distance = distance
         return station
 
+    def wait_for_reply(self, future: futures.Future, default: T) -> T:
+        """
+        Wait up to reply_timeout seconds for the result of a mailbox request.
+        If it times out, cancel the request and return default.
+        """
+        try:
+            return future.result(self.reply_timeout)
+        except futures.TimeoutError:
+            # Wait for the result if the planner is already handling the request.
+            if not future.cancel():
+                return future.result()
+        return default
+
     def update_job(self, robot_name: str, job_type: str, job_status: str) -> bool:
         """Queue asynchronous update job request."""
-        self.job_requests.append(
-            (
-                self.handle_update_job,
-                (
-                    robot_name,
-                    job_type,
-                    job_status,
-                ),
-            )
-        )
+        self.mailbox.request(self.handle_update_job, robot_name, job_type, job_status)
         return True
 
     def handle_update_job(
@@ -300,6 +409,9 @@ class Planner:
                 ), f"{station} was not reserved for {job.cart_name}."
                 station.reservation = None
             LDB.update_location(job.target_station, robot_name, job.cart_name)
+            if job.cart_name:
+                # Update occupancy immediately instead of waiting for the next sync.
+                self.get_cart(job.cart_name).cart_location = job.target_station
             # Update charging_session_status.
             if job.type == JobType.BRING_CHARGER:
                 self.plugin_states[job.booking_id] = PlugInState.SUCCESS
@@ -309,8 +421,11 @@ class Planner:
                 #  until charger can confirm it in reality.
                 cart = self.get_cart(job.cart_name)
                 cart.available = True
+                if job.booking_id:
+                    # Keep cart staged for its planned booking instead of recharging it.
+                    logging.debug(f"{cart} staged for booking {job.booking_id}.")
                 # Note: In a real setup, there should always exist a BCS.
-                if self.BCS_count > 0:
+                elif self.BCS_count > 0:
                     # Immediately create a recharge job for cart.
                     new_job = self.add_new_job(
                         Job(
@@ -371,12 +486,21 @@ class Planner:
         Fetch updated bookings from the database and create new jobs for new bookings.
         Return whether there were updated bookings.
         """
-        updated_bookings = fetch_updated_bookings()  # Transition B0
+        if self.single_transaction:
+            updated_bookings = fetch_updated_bookings(self.session)  # Transition B0
+            self.fleet.add_bookings(updated_bookings.values())
+        else:
+            updated_bookings = fetch_updated_bookings()  # Transition B0
+            self.fleet.refresh_bookings(updated_bookings.keys())
         for booking_id, booking in updated_bookings.items():
             target_station = self.get_ads_for(booking.actual_BEV_location)
             if not target_station.startswith("ADS_"):
                 target_station = f"ADS_{int(target_station)}"
             booking = self.get_booking(booking_id)
+            if booking_id in self.planned_bookings.keys() and not BookingState.equals(
+                booking.charging_session_status, BookingState.BOOKED
+            ):
+                del self.planned_bookings[booking_id]
             if BookingState.equals(
                 booking.charging_session_status, BookingState.CHECKED_IN
             ):
@@ -408,6 +532,17 @@ class Planner:
                     booking_id, booking.charging_session_status
                 )  # Transition B1
                 logging.debug(f"{booking} scheduled.")
+            elif BookingState.equals(
+                booking.charging_session_status, BookingState.BOOKED
+            ):
+                # Note: Scheduled bookings are BOOKED as well, but have jobs.
+                if (
+                    self.lookahead_horizon is not None
+                    and not self.session.exec(
+                        select(Job).where(Job.booking_id == booking_id)
+                    ).first()
+                ):
+                    self.planned_bookings[booking_id] = booking
             elif BookingState.equals(
                 booking.charging_session_status, BookingState.PENDING
             ):
@@ -415,9 +550,7 @@ class Planner:
             elif BookingState.equals(
                 booking.charging_session_status, BookingState.READY
             ):
-                cart = self.session.exec(
-                    select(Cart).where(Cart.booking_id == booking.id)
-                ).first()
+                cart = self.fleet.get_cart_for_booking(booking.id)
                 if cart:
                     self.handle_charger_update(cart, ChargerCommand.BOOKING_FULFILLED)
             elif BookingState.equals(
@@ -439,6 +572,62 @@ class Planner:
                         logging.warning(f"Cannot cancel {job}.")
         return bool(updated_bookings)
 
+    def stage_planned_bookings(self) -> None:
+        """
+        Create STOW_CHARGER jobs for bookings planned to arrive within lookahead_horizon
+        to move charged carts to free battery waiting stations near their adapter stations.
+        Staged carts become available again, so that BRING_CHARGER jobs find them nearby.
+        """
+        if self.lookahead_horizon is None or not self.planned_bookings:
+            return
+
+        horizon = datetime.now() + self.lookahead_horizon
+        for booking_id, booking in sorted(
+            self.planned_bookings.items(),
+            key=lambda item: item[1].planned_BEV_drop_time,
+        ):
+            if booking.planned_BEV_drop_time > horizon:
+                return
+            if not self.fleet.available_robots or not self.fleet.available_carts:
+                return
+
+            try:
+                target_station = self.get_ads_for(booking.planned_BEV_location)
+            except ValueError:
+                del self.planned_bookings[booking_id]
+                continue
+            station = self.pop_nearest_station(target_station, "BWS_")
+            if not station:
+                return
+
+            del self.planned_bookings[booking_id]
+            cart = self.pop_nearest_cart(target_station, booking.actual_charge_request)
+            if not cart:
+                continue
+            if self.layout.get_distance(
+                cart.cart_location, target_station
+            ) <= self.layout.get_distance(station.station_name, target_station):
+                # The cart is already near enough.
+                cart.available = True
+                continue
+
+            station.available = False
+            station.reservation = cart.name
+            job = self.add_new_job(
+                Job(
+                    type=JobType.STOW_CHARGER,
+                    state=JobState.OPEN,
+                    schedule=datetime.now(),
+                    deadline=booking.planned_BEV_drop_time,
+                    booking_id=booking_id,
+                    currently_assigned=False,
+                    cart_name=cart.name,
+                    source_station=cart.cart_location,
+                    target_station=station.station_name,
+                )
+            )
+            logging.info(f"{job} created to stage {cart} for {booking}.")
+
     def confirm_charger_ready(self, robot_name: str) -> None:
         """Confirm charger brought and connected by robot as ready."""
         cart_name = self.get_current_job(robot_name).cart_name
@@ -446,7 +635,7 @@ class Planner:
             cart_name not in self.ready_chargers.keys()
         ), f"Charger {cart_name} is already ready."
         self.ready_chargers[cart_name] = ChargerCommand.START_CHARGING
-        self.session.commit()
+        self.commit()
 
     def handle_charger_update(self, cart: Cart, command: ChargerCommand) -> None:
         """Handle charger signaling command."""
@@ -457,11 +646,7 @@ class Planner:
         elif command == ChargerCommand.STOP_RECHARGING:
             assert not cart.available, f"{cart} was available during recharging."
             cart.available = True
-            if self.session.exec(
-                select(Job)
-                .where(Job.type == JobType.RECHARGE_CHARGER)
-                .where(Job.state == JobState.OPEN)
-            ).first():
+            if any(job.type == JobType.RECHARGE_CHARGER for job in self.open_jobs):
                 new_job = self.add_new_job(
                     Job(
                         type=JobType.STOW_CHARGER,
@@ -493,7 +678,7 @@ class Planner:
             )  # Transition J0
             logging.info(f"{job} created.")
             cart.booking_id = None  # Transition B2
-        self.session.commit()
+        self.commit()
 
     def handle_updated_battery_states(
         self, updated_battery_states: Dict[str, str]
@@ -509,19 +694,82 @@ class Planner:
             elif "_recharging" in self.battery_manager.battery_states[cart_name]:
                 self.handle_charger_update(cart, ChargerCommand.STOP_RECHARGING)
 
+    def assign_bring_charger_job(self, job: Job, cart: Cart, robot: Robot) -> None:
+        """Assign BRING_CHARGER job to robot for bringing cart."""
+        assert (
+            cart.booking_id is None
+        ), f"{cart} is already used for {self.get_booking(cart.booking_id)}."
+        cart.available = False
+        robot.available = False
+        self.assign_job(job, robot.name)  # Transition J1
+        job.cart_name = cart.name
+        job.source_station = cart.cart_location
+        self.get_station(job.target_station).available = False
+        cart.booking_id = job.booking_id
+        self.plugin_states[job.booking_id] = PlugInState.BRING_CHARGER
+
+    def assign_bring_charger_jobs(self, jobs: List[Job]) -> None:
+        """
+        Assign BRING_CHARGER jobs to available carts and robots all at once.
+        First match jobs with carts for the least total transport distance,
+        then match these carts with robots for the least total empty travel.
+        """
+        target_stations = set()
+        schedulable_jobs: List[Job] = []
+        for job in jobs:
+            assert job.booking_id and job.target_station, job
+            if (
+                job.target_station not in target_stations
+                and not self.is_station_occupied(job.target_station)
+            ):
+                target_stations.add(job.target_station)
+                schedulable_jobs.append(job)
+        carts = self.get_available_carts()
+        robots = self.get_available_robots()
+        if not (schedulable_jobs and carts and robots):
+            return
+
+        charge_requests = np.array(
+            [
+                self.get_booking(job.booking_id).actual_charge_request
+                for job in schedulable_jobs
+            ]
+        )
+        cart_charges = np.array([cart.cart_charge for cart in carts])
+        cart_costs = self.layout.get_distances(
+            [job.target_station for job in schedulable_jobs],
+            [cart.cart_location for cart in carts],
+        )
+        cart_costs[
+            charge_requests[:, np.newaxis] > cart_charges[np.newaxis, :]
+        ] = np.inf
+        job_carts = solve_assignment(cart_costs)
+        robot_costs = self.layout.get_distances(
+            [robot.robot_location for robot in robots],
+            [carts[cart_index].cart_location for _, cart_index in job_carts],
+        )
+        for robot_index, pair_index in solve_assignment(robot_costs):
+            job_index, cart_index = job_carts[pair_index]
+            self.assign_bring_charger_job(
+                schedulable_jobs[job_index], carts[cart_index], robots[robot_index]
+            )
+
     def schedule_jobs(self) -> None:
-        """Schedule open and due jobs for available robots."""
-        for job in self.session.exec(
-            select(Job).where(Job.state == JobState.OPEN)
-        ).fetchall():
-            if not self.get_available_robots():
+        """Schedule open and due jobs for available robots, most urgent first."""
+        if self.assignment_mode == AssignmentMode.OPTIMAL:
+            self.assign_bring_charger_jobs(
+                [job for job in self.open_jobs if job.type == JobType.BRING_CHARGER]
+            )
+        for job in self.open_jobs:
+            if not self.fleet.available_robots:
                 return
 
             if job.type == JobType.BRING_CHARGER:
                 assert job.booking_id and job.target_station, job
                 if (
-                    self.is_station_occupied(job.target_station)
-                    or not self.get_available_carts()
+                    self.assignment_mode != AssignmentMode.GREEDY
+                    or self.is_station_occupied(job.target_station)
+                    or not self.fleet.available_carts
                 ):
                     continue
 
@@ -531,17 +779,11 @@ class Planner:
                     self.get_booking(job.booking_id).actual_charge_request,
                 )
                 if cart:
-                    assert (
-                        cart.booking_id is None
-                    ), f"{cart} is already used for {self.get_booking(cart.booking_id)}."
                     robot = self.pop_nearest_robot(cart.cart_location)
                     if robot:
-                        self.assign_job(job, robot.name)  # Transition J1
-                        job.cart_name = cart.name
-                        job.source_station = cart.cart_location
-                        self.get_station(job.target_station).available = False
-                        cart.booking_id = job.booking_id
-                        self.plugin_states[job.booking_id] = PlugInState.BRING_CHARGER
+                        self.assign_bring_charger_job(job, cart, robot)
+                    else:
+                        cart.available = True
             elif job.type == JobType.RETRIEVE_CHARGER:
                 # Handle job to retrieve charger from adapter station.
                 assert job.cart_name and job.source_station, job
@@ -581,11 +823,13 @@ class Planner:
                 assert job.cart_name and job.source_station, job
                 robot = self.pop_nearest_robot(job.source_station)
                 assert robot, job
-                target_station = self.get_station(
-                    search_free_station(robot.name, "BWS_")
-                )
-                target_station.available = False
-                job.target_station = target_station.station_name
+                # Keep the target station of a cart staged for a booking.
+                if not job.target_station:
+                    target_station = self.get_station(
+                        search_free_station(robot.name, "BWS_")
+                    )
+                    target_station.available = False
+                    job.target_station = target_station.station_name
                 self.assign_job(job, robot.name)
             elif job.type == JobType.RECHARGE_CHARGER:
                 # Handle job to stow charger at battery charging station.
@@ -617,46 +861,124 @@ class Planner:
                 robot.available = False
 
     def fetch_job(self, robot_name: str) -> Dict[str, str]:
-        """Queue asynchronous fetch job request."""
-        self.job_requests.append((self.handle_fetch_job, (robot_name,)))
-        if robot_name in self.next_jobs.keys():
-            return self.next_jobs.pop(robot_name)
+        """
+        Queue fetch job request and wait up to reply_timeout seconds
+        for the planner to handle it. Return the pending job if any.
+        If the request times out, its job is kept for the next fetch.
+        """
+        job_details = self.next_jobs.pop(robot_name, None)
+        if job_details:
+            return job_details
 
-        return {
-            "job_id": 0,
-            "job_type": "",
-            "charging_type": "",
-            "robot_name": robot_name,
-            "cart": "",
-            "source_station": "",
-            "target_station": "",
-        }
+        future = self.mailbox.request(
+            self.handle_fetch_job,
+            robot_name,
+            key=(self.handle_fetch_job, robot_name),
+            unclaimed=self.keep_next_job,
+        )
+        job_details = self.wait_for_reply(future, None)
+        if job_details is None:
+            job_details = self.next_jobs.pop(robot_name, None)
+        return job_details if job_details else get_empty_job_details(robot_name)
 
-    def handle_fetch_job(self, robot_name: str) -> None:
+    def handle_fetch_job(self, robot_name: str) -> Optional[Dict[str, str]]:
         """Handle request to fetch pending job for robot with robot_name."""
+        return self.prepare_job(robot_name)
+
+    def keep_next_job(self, job_details: Optional[Dict[str, str]]) -> None:
+        """Keep job_details of a fetch nobody waited for until the next fetch."""
+        if job_details:
+            self.next_jobs[job_details["robot_name"]] = job_details
+
+    def prepare_job(self, robot_name: str) -> Optional[Dict[str, str]]:
+        """Return details of the pending job of robot_name and start it, if any."""
         job = self.get_current_job(robot_name)
         if job and job.state == JobState.PENDING:
             job.state = JobState.ONGOING  # Transition J2
-            job_details = {
-                "job_id": job.id,
-                "job_type": job.type,
-                "charging_type": job.charging_type,
-                "robot_name": robot_name,
-                "cart": job.cart_name,
-                "source_station": job.source_station,
-                "target_station": job.target_station,
-            }
+            job_details = self.get_job_details(job)
             logging.info(
                 f"Job {job.id} [ {get_list_str_of_dict(job_details)} ] prepared."
             )
-            self.next_jobs[robot_name] = job_details
-            return
+            return job_details
 
         # Consider robot trying to fetch a job as available.
         robot = self.get_robot(robot_name)
         # Make robot available only after it is cleared from its previous job.
         if not robot.available and not job:
             robot.available = True
+        return None
+
+    def get_job_details(self, job: Job) -> Dict[str, str]:
+        """Return details of job as sent to its robot."""
+        return {
+            "job_id": job.id,
+            "job_type": job.type,
+            "charging_type": job.charging_type,
+            "robot_name": job.robot_name,
+            "cart": job.cart_name,
+            "source_station": job.source_station,
+            "target_station": job.target_station,
+        }
+
+    def subscribe_jobs(self, robot_name: str) -> queue.Queue:
+        """
+        Return queue to which details of each job of robot_name are put
+        as soon as the job is started. A current ongoing job is put again,
+        so that a robot resubscribing after a lost connection does not miss it.
+        A previous subscription of robot_name receives None and ends.
+        """
+        subscription: queue.Queue = queue.Queue()
+        with self.subscription_lock:
+            previous_subscription = self.subscriptions.get(robot_name)
+            self.subscriptions[robot_name] = subscription
+        if previous_subscription:
+            previous_subscription.put(None)
+        self.mailbox.request(self.handle_subscribe_jobs, robot_name)
+        return subscription
+
+    def unsubscribe_jobs(self, robot_name: str, subscription: queue.Queue) -> None:
+        """End subscription of robot_name if it is still the current one."""
+        with self.subscription_lock:
+            if self.subscriptions.get(robot_name) is subscription:
+                del self.subscriptions[robot_name]
+
+    def handle_subscribe_jobs(self, robot_name: str) -> None:
+        """Resend an ongoing or already prepared job of robot_name to its subscription."""
+        job_details = self.next_jobs.pop(robot_name, None)
+        if job_details is None:
+            job = self.get_current_job(robot_name)
+            if job and job.state == JobState.ONGOING:
+                job_details = self.get_job_details(job)
+        if job_details:
+            self.publish_job(robot_name, job_details)
+
+    def publish_job(self, robot_name: str, job_details: Dict[str, str]) -> bool:
+        """Put job_details to the subscription of robot_name. Return whether there is one."""
+        with self.subscription_lock:
+            subscription = self.subscriptions.get(robot_name)
+        if subscription is None:
+            return False
+        subscription.put(job_details)
+        return True
+
+    def dispatch_subscribed_jobs(self) -> None:
+        """Start pending jobs of subscribed robots and publish them."""
+        with self.subscription_lock:
+            robot_names = list(self.subscriptions.keys())
+        for robot_name in robot_names:
+            job_details = self.prepare_job(robot_name)
+            if job_details and not self.publish_job(robot_name, job_details):
+                # Keep the job for a fetch if the robot unsubscribed meanwhile.
+                self.next_jobs[robot_name] = job_details
+
+    def request_plug_in(self, robot_name: str) -> bool:
+        """
+        Request handshake_plug_in for robot_name from the planner thread.
+        Return False if the planner does not reply in time.
+        """
+        return self.wait_for_reply(
+            self.mailbox.request(self.handshake_plug_in, robot_name), False
+        )
 
     def handshake_plug_in(self, robot_name: str) -> bool:
         booking_id = self.get_current_job(robot_name).booking_id
@@ -672,32 +994,83 @@ class Planner:
             return True
         return False
 
-    def handle_job_requests(self) -> None:
-        """Handle queued job requests."""
-        while self.job_requests:
-            callback, args = self.job_requests.pop()
-            callback(*args)
+    def handle_job_requests(self) -> bool:
+        """Handle queued requests in order. Return whether there were any."""
+        return self.mailbox.handle() > 0
 
-    def tick(self) -> None:
-        """Execute planning methods once."""
+    def tick(self) -> bool:
+        """Execute planning methods once. Return whether there was any activity."""
         self.bookings_updated = False
-        copy_from_ldb()
-        self.bookings_updated = self.handle_updated_bookings()
-        updated_battery_states = self.battery_manager.tick()
-        self.handle_updated_battery_states(updated_battery_states)
-        self.schedule_jobs()
-        self.handle_job_requests()
-        self.session.commit()
-
-    def run(self, update_interval: float = 1.0) -> None:
+        with self.profiler.tick():
+            self.ticking = True
+            try:
+                with self.profiler.phase("copy_from_ldb"):
+                    battery_future = (
+                        self.io_executor.submit_phase(
+                            "battery_manager.tick", self.battery_manager.tick
+                        )
+                        if self.io_executor
+                        else None
+                    )
+                    sync_report = copy_from_ldb(
+                        session=self.session if self.single_transaction else None,
+                        executor=self.io_executor,
+                    )
+                with self.profiler.phase("fleet.refresh"):
+                    self.fleet.refresh(
+                        sync_report.changed_robots, sync_report.changed_carts
+                    )
+                with self.profiler.phase("handle_updated_bookings"):
+                    self.bookings_updated = self.handle_updated_bookings()
+                with self.profiler.phase("stage_planned_bookings"):
+                    self.stage_planned_bookings()
+                if battery_future:
+                    with self.profiler.phase("battery_manager.wait"):
+                        updated_battery_states = battery_future.result()
+                else:
+                    with self.profiler.phase("battery_manager.tick"):
+                        updated_battery_states = self.battery_manager.tick()
+                with self.profiler.phase("handle_updated_battery_states"):
+                    self.handle_updated_battery_states(updated_battery_states)
+                with self.profiler.phase("schedule_jobs"):
+                    self.schedule_jobs()
+                with self.profiler.phase("handle_job_requests"):
+                    handled_requests = self.handle_job_requests()
+                with self.profiler.phase("dispatch_subscribed_jobs"):
+                    self.dispatch_subscribed_jobs()
+            finally:
+                self.ticking = False
+            with self.profiler.phase("commit"):
+                self.session.commit()
+        return self.bookings_updated or bool(updated_battery_states) or handled_requests
+
+    def run(self, update_interval: float = 1.0, idle_interval: float = 5.0) -> None:
+        """
+        Tick whenever notified, but at least every update_interval seconds.
+        While ticks find nothing to do, back off the fallback interval
+        up to idle_interval seconds unless MySQL is used.
+        """
         logging.basicConfig(level=logging.DEBUG)
         logging.info(
             f"robot_count: {self.robot_count}, cart_count: {self.cart_count}, ADS_count: {self.ADS_count},"
             f" BCS_count: {self.BCS_count}, BWS_count: {self.BWS_count}, RBS_count: {self.RBS_count}"
         )
+        interval = update_interval
+        # Note: Orders and battery states in MySQL change without notifying the planner.
+        can_back_off = not MySQLAccess.is_configured()
         while self.active:
-            self.tick()
-            time.sleep(update_interval)
+            # Clear before ticking so that notifications during the tick are kept.
+            self.wakeup.clear()
+            if self.tick() or not can_back_off:
+                interval = update_interval
+            else:
+                interval = min(2.0 * interval, max(update_interval, idle_interval))
+            self.wakeup.wait(interval)
+
+    def stop(self) -> None:
+        """Let the planner loop return after its current tick."""
+        self.active = False
+        self.notify()
 
 
 if __name__ == "__main__":
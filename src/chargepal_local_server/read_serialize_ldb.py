@@ -1,11 +1,12 @@
-import sqlite3
+import os
 from chargepal_local_server import communication_pb2
+from chargepal_local_server.sqlite_connection import connect
 
 
 def read_serialize() -> communication_pb2.Response_UpdateRDB:
     ldb_data = communication_pb2.Response_UpdateRDB()
 
-    conn_ldb = sqlite3.connect("db/ldb.db")
+    conn_ldb = connect(os.path.join(os.path.dirname(__file__), "db/ldb.db"))
     cur_ldb = conn_ldb.cursor()
 
     # Get list of tables
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 import os
-from typing import Any
+from typing import Any, Iterator
 from concurrent import futures
 from chargepal_local_server import communication_pb2_grpc
 from chargepal_local_server import free_station
 from chargepal_local_server import battery_communication
 import grpc
+import logging
+import queue
+import tempfile
 import threading
 from chargepal_local_server import update_ldb
+from chargepal_local_server.access_ldb import SQLITE_DB_FILEPATH
 from chargepal_local_server import read_serialize_ldb
 from chargepal_local_server.communication_pb2 import (
     Request,
@@ -21,17 +25,45 @@ from chargepal_local_server.communication_pb2 import (
     Response_UpdateRDB,
     Response_PullLDB,
     Response_BatteryCommunication,
+    Response_BatteryOperation,
     Response_OperationTime,
     Response_LogText,
+    Response_TickStatistics,
+    PhaseStatistics,
+)
+from chargepal_local_server.battery_operations import (
+    BatteryOperationExecutor,
+    OperationStatus,
 )
 from chargepal_local_server.planner import Planner
+from chargepal_local_server.sqlite_connection import copy_database
+
+
+# Server threads for unary RPCs in addition to one per robot's job subscription
+#  and one per cart's BatteryCommunication call.
+UNARY_RPC_WORKERS = 8
 
 
 class CommunicationServicer(communication_pb2_grpc.CommunicationServicer):
     def __init__(self, planner: Planner):
         self.planner = planner
+        # Note: Requests to the planner are serialized by its mailbox instead.
         self.request_lock = threading.Lock()
+        # Note: Battery requests can wait for minutes on the battery hardware,
+        #  so give each cart a thread to not block others.
+        self.battery_operations = BatteryOperationExecutor(
+            battery_communication.run_request, max_workers=max(planner.cart_count, 1)
+        )
         self.job_success_status = True
+        # Send keepalive messages to job subscriptions after this many seconds without a job.
+        self.keepalive_interval = 10.0
+        # Fail BatteryCommunication calls whose operation takes longer than this.
+        self.battery_request_timeout = float(
+            max(
+                battery_communication.feedback_receive_timeout,
+                battery_communication.battery_live_monitor_timeout,
+            )
+        )
 
     def UpdateRDB(self, request: Request, context: Any) -> Response_UpdateRDB:
         response = read_serialize_ldb.read_serialize()
@@ -44,20 +76,52 @@ class CommunicationServicer(communication_pb2_grpc.CommunicationServicer):
         return Response_LogText(success=True)
 
     def PullLDB(self, request: Request, context: Any) -> Response_PullLDB:
-        with open("db/ldb.db", "rb") as file:
-            file_content = file.read()
+        # Note: Copy a consistent snapshot including the write-ahead log.
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "ldb.db")
+            try:
+                copy_database(SQLITE_DB_FILEPATH, filepath, journal_mode="DELETE")
+            except FileNotFoundError as error:
+                context.abort(grpc.StatusCode.NOT_FOUND, str(error))
+            with open(filepath, "rb") as file:
+                file_content = file.read()
         return Response_PullLDB(ldb=file_content)
 
     def FetchJob(self, request: Request, context: Any) -> Response_FetchJob:
-        with self.request_lock:
-            self.job_success_status = False
-            job_details = self.planner.fetch_job(request.robot_name)
-            response = Response_FetchJob(
-                message="finished processing",
-                job=Response_Job(**job_details),
-            )
+        self.job_success_status = False
+        job_details = self.planner.fetch_job(request.robot_name)
+        response = Response_FetchJob(
+            message="finished processing",
+            job=Response_Job(**job_details),
+        )
         return response
 
+    def SubscribeJobs(
+        self, request: Request, context: Any
+    ) -> Iterator[Response_FetchJob]:
+        subscription = self.planner.subscribe_jobs(request.robot_name)
+        # Wake up the stream when the robot disconnects.
+        context.add_callback(lambda: subscription.put(None))
+        try:
+            while context.is_active():
+                try:
+                    job_details = subscription.get(timeout=self.keepalive_interval)
+                except queue.Empty:
+                    yield Response_FetchJob(
+                        message="keepalive",
+                        job=Response_Job(robot_name=request.robot_name),
+                    )
+                    continue
+                if job_details is None:
+                    # The robot disconnected or subscribed again with another stream.
+                    return
+                self.job_success_status = False
+                yield Response_FetchJob(
+                    message="finished processing", job=Response_Job(**job_details)
+                )
+        finally:
+            self.planner.unsubscribe_jobs(request.robot_name, subscription)
+
     def AskFreeStation(self, request: Request, context: Any) -> Response_FreeStation:
         with self.request_lock:
             if request.request_name == "ask_free_bcs":
@@ -77,6 +141,8 @@ class CommunicationServicer(communication_pb2_grpc.CommunicationServicer):
         with self.request_lock:
             status = update_ldb.update(request.rdbc_data)
             response = Response_PushToLDB(success=status)
+        # Let the planner pick up the robot's updates right away.
+        self.planner.notify()
         return response
 
     def ResetStationBlocker(
@@ -95,11 +161,10 @@ class CommunicationServicer(communication_pb2_grpc.CommunicationServicer):
     def UpdateJobMonitor(
         self, request: Request, context: Any
     ) -> Response_UpdateJobMonitor:
-        with self.request_lock:
-            self.job_success_status = self.planner.update_job(
-                request.robot_name, request.job_name, request.job_status
-            )
-            response = Response_UpdateJobMonitor(success=self.job_success_status)
+        self.job_success_status = self.planner.update_job(
+            request.robot_name, request.job_name, request.job_status
+        )
+        response = Response_UpdateJobMonitor(success=self.job_success_status)
         return response
 
     def OperationTime(self, request: Request, context: Any) -> Response_OperationTime:
@@ -112,63 +177,103 @@ class CommunicationServicer(communication_pb2_grpc.CommunicationServicer):
     def Ready2PlugInADS(
         self, request: Request, context: Any
     ) -> Response_Ready2PlugInADS:
-        with self.request_lock:
-            ready_to_plugin = self.planner.handshake_plug_in(request.robot_name)
-            response = Response_Ready2PlugInADS(ready_to_plugin)
+        ready_to_plugin = self.planner.request_plug_in(request.robot_name)
+        response = Response_Ready2PlugInADS(ready_to_plugin=ready_to_plugin)
         return response
 
     def BatteryCommunication(
         self, request: Request, context: Any
     ) -> Response_BatteryCommunication:
-        with self.request_lock:
+        # Note: Wait for the operation without holding request_lock.
+        operation = self.battery_operations.submit(
+            request.request_name, request.cart_name, request.station_name
+        )
+        try:
+            success = operation.future.result(self.battery_request_timeout)
+        except futures.TimeoutError:
+            logging.warning(
+                f"Battery request '{request.request_name}' of {request.cart_name}"
+                f" timed out, see operation {operation.operation_id}."
+            )
             success = False
-            if request.request_name == "wakeup":
-                success = battery_communication.wakeup(request.cart_name)
-            elif request.request_name == "mode_req_bat_only":
-                success = battery_communication.mode_req_bat_only(request.cart_name)
-            elif request.request_name == "mode_req_standby":
-                success = battery_communication.mode_req_standby(request.cart_name)
-            elif request.request_name == "mode_req_idle":
-                success = battery_communication.mode_req_idle(request.cart_name)
-            elif request.request_name == "mode_req_EV_AC_Charge":
-                success = battery_communication.mode_req_EV_AC_Charge(request.cart_name)
-            elif request.request_name == "mode_req_EV_DC_Charge":
-                success = battery_communication.mode_req_EV_DC_Charge(request.cart_name)
-            elif request.request_name == "mode_req_Bat_AC_Charge":
-                success = battery_communication.mode_req_Bat_AC_Charge(
-                    request.cart_name
-                )
-            elif "ladeprozess_start" in request.request_name:
-                success = battery_communication.ladeprozess_start(
-                    request.cart_name,
-                    request.station_name,
-                    request.request_name[len("ladeprozess_start_") :],
-                )
-            elif "ladeprozess_end" in request.request_name:
-                success = battery_communication.ladeprozess_end(
-                    request.cart_name, request.station_name
-                )
-            elif request.request_name == "mode_req_emergency_shutdown":
-                success = battery_communication.mode_req_emergency_shutdown(
-                    request.cart_name
+        response = Response_BatteryCommunication(success=success)
+        return response
+
+    def SubmitBatteryCommunication(
+        self, request: Request, context: Any
+    ) -> Response_BatteryOperation:
+        operation = self.battery_operations.submit(
+            request.request_name, request.cart_name, request.station_name
+        )
+        return Response_BatteryOperation(
+            operation_id=operation.operation_id, status=operation.status
+        )
+
+    def BatteryOperationStatus(
+        self, request: Request, context: Any
+    ) -> Response_BatteryOperation:
+        operation = self.battery_operations.get(request.operation_id)
+        if operation is None:
+            return Response_BatteryOperation(
+                operation_id=request.operation_id, status=OperationStatus.UNKNOWN
+            )
+        return Response_BatteryOperation(
+            operation_id=operation.operation_id,
+            status=operation.status,
+            success=operation.status == OperationStatus.SUCCEEDED,
+            error=operation.error,
+        )
+
+    def TickStatistics(self, request: Request, context: Any) -> Response_TickStatistics:
+        profiler = self.planner.profiler
+        return Response_TickStatistics(
+            phases=[
+                PhaseStatistics(
+                    name=name,
+                    count=summary["count"],
+                    p50_ms=summary["p50_ms"],
+                    p95_ms=summary["p95_ms"],
+                    max_ms=summary["max_ms"],
+                    sql_statements=summary["sql"],
                 )
+                for name, summary in profiler.get_statistics().items()
+            ],
+            slow_tick_threshold=profiler.slow_tick_threshold or 0.0,
+            report=profiler.get_report(),
+        )
 
-            response = Response_BatteryCommunication(success=success)
-            return response
+
+def create_server(servicer: CommunicationServicer) -> grpc.Server:
+    """
+    Return a server of servicer with a thread for each robot's SubscribeJobs stream,
+    each cart's BatteryCommunication call, and UNARY_RPC_WORKERS more, so that
+    open streams and battery requests cannot starve other unary RPCs.
+    RPCs which would queue behind more than UNARY_RPC_WORKERS others are rejected.
+    """
+    max_workers = (
+        servicer.planner.robot_count + servicer.planner.cart_count + UNARY_RPC_WORKERS
+    )
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers),
+        maximum_concurrent_rpcs=max_workers + UNARY_RPC_WORKERS,
+    )
+    communication_pb2_grpc.add_CommunicationServicer_to_server(servicer, server)
+    return server
 
 
 def server() -> None:
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
     planner = Planner()
-    communication_pb2_grpc.add_CommunicationServicer_to_server(
-        CommunicationServicer(planner), server
-    )
+    servicer = CommunicationServicer(planner)
+    server = create_server(servicer)
     server.add_insecure_port("[::]:50059")
     server.start()
     try:
         planner.run()
     except KeyboardInterrupt:
+        planner.stop()
         server.stop(0)
+        servicer.battery_operations.shutdown()
+        battery_communication.mqtt_publisher.stop()
 
 
 if __name__ == "__main__":
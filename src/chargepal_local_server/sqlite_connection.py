@@ -0,0 +1,102 @@
+"""Central factory of SQLite connections and engines with pragma profiles"""
+
+from typing import Any, Dict, Optional
+import os
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import create_engine
+
+
+# Select a profile of PRAGMA_PROFILES with this environment variable.
+PROFILE_ENVIRONMENT_VARIABLE = "CHARGEPAL_SQLITE_PROFILE"
+DEFAULT_PROFILE = "wal"
+# Note: Apply busy_timeout first so that switching journal_mode waits for locks.
+PRAGMA_PROFILES: Dict[str, Dict[str, object]] = {
+    # Concurrent readers do not block the writer, and commits do not sync to disk.
+    "wal": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 67108864,
+    },
+    # Like "wal", but every commit is synced to disk.
+    "durable": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 67108864,
+    },
+    # SQLite's default rollback journal.
+    "legacy": {
+        "busy_timeout": 5000,
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+    },
+}
+
+
+def get_pragmas(profile: Optional[str] = None) -> Dict[str, object]:
+    """Return pragmas of profile, or of the profile selected by the environment."""
+    if profile is None:
+        profile = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE, DEFAULT_PROFILE)
+    if profile not in PRAGMA_PROFILES.keys():
+        raise ValueError(
+            f"Unknown SQLite profile '{profile}', use one of {list(PRAGMA_PROFILES)}."
+        )
+    return PRAGMA_PROFILES[profile]
+
+
+def apply_pragmas(connection: Any, profile: Optional[str] = None) -> None:
+    """Apply pragmas of profile to the DBAPI connection."""
+    cursor = connection.cursor()
+    try:
+        for name, value in get_pragmas(profile).items():
+            cursor.execute(f"PRAGMA {name} = {value};")
+    finally:
+        cursor.close()
+
+
+def connect(
+    filepath: str, profile: Optional[str] = None, **kwargs: Any
+) -> sqlite3.Connection:
+    """Return a sqlite3 connection to filepath with pragmas of profile applied."""
+    connection = sqlite3.connect(filepath, **kwargs)
+    apply_pragmas(connection, profile)
+    return connection
+
+
+def create_sqlite_engine(filepath: str, profile: Optional[str] = None) -> Engine:
+    """Return an engine for filepath applying pragmas of profile to its connections."""
+    engine = create_engine(f"sqlite:///{filepath}")
+    event.listen(
+        engine,
+        "connect",
+        lambda dbapi_connection, _: apply_pragmas(dbapi_connection, profile),
+    )
+    return engine
+
+
+def copy_database(
+    source_filepath: str, target_filepath: str, journal_mode: Optional[str] = None
+) -> None:
+    """
+    Copy the database at source_filepath to target_filepath with the backup API,
+    which is consistent with open connections and a write-ahead log,
+    unlike copying the files. Set journal_mode of the copy if given.
+    Raise FileNotFoundError if there is no database at source_filepath.
+    """
+    # Note: Connecting would create an empty database instead.
+    if not os.path.isfile(source_filepath):
+        raise FileNotFoundError(f"No database at '{source_filepath}'.")
+    source = sqlite3.connect(source_filepath)
+    target = sqlite3.connect(target_filepath)
+    try:
+        source.backup(target)
+        if journal_mode:
+            target.execute(f"PRAGMA journal_mode = {journal_mode};").close()
+    finally:
+        target.close()
+        source.close()
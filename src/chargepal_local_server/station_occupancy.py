@@ -0,0 +1,89 @@
+"""Incremental index of stations occupied by carts or reserved for them"""
+
+from typing import Dict, Iterable, List, Optional, Set
+import re
+
+
+STATION_PREFIXES = ("ADS_", "BCS_", "BWS_", "RBS_")
+STATION_PATTERN = re.compile(r"(?:ADS|BCS|BWS|RBS)_\d+")
+
+
+def get_station_prefix(station_name: str) -> str:
+    """Return station prefix of station_name, e.g. "BCS_" for "BCS_1"."""
+    return station_name[: station_name.index("_") + 1]
+
+
+def parse_station_names(location: Optional[str]) -> List[str]:
+    """Return all station names mentioned in location."""
+    return STATION_PATTERN.findall(location) if location else []
+
+
+class StationOccupancy:
+    """
+    Index stations by name as occupied if a cart is located at them
+    or if they are reserved. Free stations are maintained per station prefix,
+    so that lookups neither scan carts nor access any database.
+    """
+
+    def __init__(self, station_names: Iterable[str]) -> None:
+        self.station_carts: Dict[str, Set[str]] = {}
+        self.reservations: Dict[str, str] = {}
+        self.free_stations: Dict[str, Set[str]] = {
+            prefix: set() for prefix in STATION_PREFIXES
+        }
+        # Remember stations of each cart to update only changed locations.
+        self.cart_stations: Dict[str, List[str]] = {}
+        for station_name in station_names:
+            self.add_station(station_name)
+
+    def add_station(self, station_name: str) -> None:
+        """Add station_name as a free station."""
+        self.station_carts.setdefault(station_name, set())
+        self.update_free(station_name)
+
+    def update_free(self, station_name: str) -> None:
+        """Update whether station_name is free."""
+        free_stations = self.free_stations.setdefault(
+            get_station_prefix(station_name), set()
+        )
+        if self.is_occupied(station_name):
+            free_stations.discard(station_name)
+        else:
+            free_stations.add(station_name)
+
+    def update_cart_location(self, cart_name: str, location: Optional[str]) -> None:
+        """Update stations occupied by cart_name being at location."""
+        new_stations = parse_station_names(location)
+        old_stations = self.cart_stations.get(cart_name, [])
+        if new_stations == old_stations:
+            return
+
+        self.cart_stations[cart_name] = new_stations
+        for station_name in old_stations:
+            self.station_carts[station_name].discard(cart_name)
+            self.update_free(station_name)
+        for station_name in new_stations:
+            if station_name not in self.station_carts.keys():
+                self.add_station(station_name)
+            self.station_carts[station_name].add(cart_name)
+            self.update_free(station_name)
+
+    def update_reservation(self, station_name: str, reservation: Optional[str]) -> None:
+        """Update reservation of station_name."""
+        if reservation:
+            self.reservations[station_name] = reservation
+        else:
+            self.reservations.pop(station_name, None)
+        if station_name not in self.station_carts.keys():
+            self.add_station(station_name)
+        self.update_free(station_name)
+
+    def is_occupied(self, station_name: str) -> bool:
+        """Return whether station is reserved for or used by any cart."""
+        return station_name in self.reservations.keys() or bool(
+            self.station_carts.get(station_name)
+        )
+
+    def get_free_stations(self, station_prefix: str) -> Set[str]:
+        """Return names of free stations with station_prefix."""
+        return self.free_stations.get(station_prefix, set())
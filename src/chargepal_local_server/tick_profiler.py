@@ -0,0 +1,207 @@
+"""Per-phase timing and SQL statement counting of planner ticks"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+import threading
+import time
+
+
+TICK = "tick"
+T = TypeVar("T")
+
+
+class PhaseStatistics:
+    """Rolling window of durations and SQL statement counts of one phase."""
+
+    def __init__(self, window: int) -> None:
+        self.durations: deque = deque(maxlen=window)
+        self.statement_counts: deque = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, duration: float, statement_count: int) -> None:
+        self.durations.append(duration)
+        self.statement_counts.append(statement_count)
+        self.count += 1
+
+    def get_summary(self) -> Dict[str, float]:
+        """Return count, p50, p95, and max of durations in ms, and mean statement count."""
+        durations = sorted(self.durations)
+        if not durations:
+            return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "sql": 0.0}
+        return {
+            "count": self.count,
+            "p50_ms": 1e3 * durations[int(0.50 * (len(durations) - 1))],
+            "p95_ms": 1e3 * durations[int(0.95 * (len(durations) - 1))],
+            "max_ms": 1e3 * durations[-1],
+            "sql": sum(self.statement_counts) / len(self.statement_counts),
+        }
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+
+class TickProfiler:
+    """
+    Measure the duration and SQL statement count of each phase of a tick.
+
+    Statements are counted for the engines given to count_statements()
+    and by calls of on_execute(), e.g. as statement listener of ldb accesses.
+    They are counted for the tick and phases which the executing thread is in,
+    which are only those of the thread running the tick, unless functions are
+    run in other threads as phases of the tick with in_phase().
+    Ticks taking longer than slow_tick_threshold seconds are logged
+    with a breakdown of their phases.
+    """
+
+    def __init__(
+        self, window: int = 1000, slow_tick_threshold: Optional[float] = 1.0
+    ) -> None:
+        self.window = window
+        self.slow_tick_threshold = slow_tick_threshold
+        self.statistics: Dict[str, PhaseStatistics] = {}
+        self.lock = threading.Lock()
+        # Statement counter of the current tick, if any.
+        self.tick_counter: Optional[StatementCounter] = None
+        # Hold the statement counters of the tick and phases each thread is in.
+        self.local = threading.local()
+        # Store (phase, duration, statement count) of the current tick.
+        self.current_phases: List[tuple] = []
+
+    def count_statements(self, engine: Engine) -> None:
+        """Count SQL statements executed with engine."""
+        event.listen(engine, "before_cursor_execute", self.on_execute)
+
+    def get_counters(self) -> List[StatementCounter]:
+        """Return the statement counters of the current thread."""
+        if not hasattr(self.local, "counters"):
+            self.local.counters = []
+        return self.local.counters
+
+    def on_execute(self, *_: Any) -> None:
+        counters = self.get_counters()
+        if counters:
+            # Note: The tick counter is shared with threads running its phases.
+            with self.lock:
+                for counter in counters:
+                    counter.count += 1
+
+    def add(self, name: str, duration: float, statement_count: int) -> None:
+        with self.lock:
+            if name not in self.statistics.keys():
+                self.statistics[name] = PhaseStatistics(self.window)
+            self.statistics[name].add(duration, statement_count)
+
+    @contextmanager
+    def tick(self) -> Iterator[None]:
+        """Measure a whole tick, consisting of phases."""
+        counter = StatementCounter()
+        self.tick_counter = counter
+        self.current_phases = []
+        self.local.counters = [counter]
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start_time
+            self.local.counters = []
+            self.tick_counter = None
+            statement_count = counter.count
+            self.add(TICK, duration, statement_count)
+            if (
+                self.slow_tick_threshold is not None
+                and duration > self.slow_tick_threshold
+            ):
+                logging.warning(
+                    f"Slow tick took {1e3 * duration:.1f} ms"
+                    f" with {statement_count} SQL statements: "
+                    + ", ".join(
+                        f"{name} {1e3 * phase_duration:.1f} ms"
+                        f" ({phase_statement_count} SQL)"
+                        for name, phase_duration, phase_statement_count in self.current_phases
+                    )
+                )
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure phase with name within a tick."""
+        counter = StatementCounter()
+        counters = self.get_counters()
+        counters.append(counter)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start_time
+            counters.remove(counter)
+            self.add(name, duration, counter.count)
+            self.current_phases.append((name, duration, counter.count))
+
+    def in_phase(self, name: str, function: Callable[[], T]) -> Callable[[], T]:
+        """
+        Return function measured as phase with name of the current tick,
+        also if it is run in another thread before the tick ends.
+        """
+        tick_counter = self.tick_counter
+
+        def run() -> T:
+            counters = self.get_counters()
+            outer_counters = list(counters)
+            if tick_counter is not None and tick_counter not in counters:
+                counters.append(tick_counter)
+            try:
+                with self.phase(name):
+                    return function()
+            finally:
+                counters[:] = outer_counters
+
+        return run
+
+    def get_statistics(self) -> Dict[str, Dict[str, float]]:
+        """Return summaries of the whole tick and all phases, see PhaseStatistics."""
+        with self.lock:
+            return {
+                name: statistics.get_summary()
+                for name, statistics in self.statistics.items()
+            }
+
+    def get_report(self) -> str:
+        """Return a human-readable table of get_statistics()."""
+        lines = [
+            f"{'phase':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'SQL':>8}"
+        ]
+        for name, summary in self.get_statistics().items():
+            lines.append(
+                f"{name:<28}{summary['count']:>8}{summary['p50_ms']:>10.1f}"
+                f"{summary['p95_ms']:>10.1f}{summary['max_ms']:>10.1f}{summary['sql']:>8.1f}"
+            )
+        return "\n".join(lines)
+
+
+class PhaseExecutor(Executor):
+    """Submit functions to executor as phases of the current tick of profiler."""
+
+    def __init__(self, profiler: TickProfiler, executor: Executor) -> None:
+        self.profiler = profiler
+        self.executor = executor
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future:
+        """Submit fn with args as phase named after it."""
+        return self.submit_phase(fn.__name__, fn, *args, **kwargs)
+
+    def submit_phase(
+        self, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> Future:
+        """Submit fn with args as phase with name."""
+        return self.executor.submit(
+            self.profiler.in_phase(name, lambda: fn(*args, **kwargs))
+        )
+
+    def shutdown(self, wait: bool = True, **kwargs: Any) -> None:
+        self.executor.shutdown(wait, **kwargs)
@@ -1,13 +1,13 @@
 from typing import List, Tuple
-import sqlite3
 import ast
 import os
+from chargepal_local_server.sqlite_connection import connect
 
-current_directory = os.getcwd()
+ldb_filepath = os.path.join(os.path.dirname(__file__), "db/ldb.db")
 
 
 def update(packaged_strings: List[str]) -> bool:
-    with sqlite3.connect(current_directory + "/db/ldb.db") as ldb_connection:
+    with connect(ldb_filepath) as ldb_connection:
         ldb_cursor = ldb_connection.cursor()
 
         for data_package_str in packaged_strings:
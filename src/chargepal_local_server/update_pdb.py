@@ -4,12 +4,22 @@ reading from local sqlite3 database (ldb)
 """
 
 #!/usr/bin/env python3
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import os
-import re
-from sqlmodel import Session, insert, select, update
-from chargepal_local_server.access_ldb import LDB, SQLite3Access
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import Table, bindparam, event
+from sqlmodel import Session, select, update
+from chargepal_local_server.access_ldb import LDB, MySQLAccess, SQLite3Access
+from chargepal_local_server.changelog import (
+    ChangeBatch,
+    ChangeLog,
+    Dialect,
+    get_key_condition,
+)
+from chargepal_local_server.parsing import parse_datetime
 from chargepal_local_server.pdb_interfaces import (
     Booking,
     Cart,
@@ -19,8 +29,197 @@ from chargepal_local_server.pdb_interfaces import (
 
 
 ldb_filepath = os.path.join(os.path.dirname(__file__), "db/ldb.db")
-# Store which bookings were fetched from pdb.
-fetched_bookings: Dict[int, Booking] = {}
+# Map ids of active bookings to hashes of their synced column values.
+booking_hashes: Dict[int, int] = {}
+# Store ids of bookings changed by syncs which have not yet been fetched.
+changed_booking_ids: Set[int] = set()
+# Map names of robots or carts to column values.
+NamedValues = Dict[str, Dict[str, object]]
+# Map names of robots and carts to their last synced values.
+robot_snapshots: NamedValues = {}
+cart_snapshots: NamedValues = {}
+# Consume changes from these change logs instead of scanning ldb tables if enabled.
+robot_cart_changelog: Optional[ChangeLog] = None
+orders_changelog: Optional[ChangeLog] = None
+
+
+class Watermark:
+    """
+    High-water mark of the last_change column of an ldb table,
+    so that syncs only copy rows changed since the last sync.
+
+    Since last_change has a resolution of seconds, rows changed at the mark
+    are selected again. The last copied row of each key at the mark is remembered
+    to skip it, while a row changed again within the same second differs
+    from it and is copied.
+
+    Rows without last_change are selected by every sync,
+    and likewise only copied if they differ from their last copied row.
+    """
+
+    def __init__(self, key_index: int = 0) -> None:
+        self.key_index = key_index
+        self.last_change = datetime.min
+        self.rows_at_mark: Dict[object, Tuple[object, ...]] = {}
+        self.rows_without_change: Dict[object, Tuple[object, ...]] = {}
+
+    def reset(self) -> None:
+        """Let the next sync copy all rows."""
+        self.last_change = datetime.min
+        self.rows_at_mark.clear()
+        self.rows_without_change.clear()
+
+    def get_condition(self) -> str:
+        """Return SQL condition for rows changed since the last sync, if any."""
+        if self.last_change == datetime.min:
+            return ""
+        return f" WHERE last_change >= '{self.last_change}' OR last_change IS NULL"
+
+    def is_new(self, row: Tuple[object, ...]) -> bool:
+        """Return whether row differs from the last row copied with its key."""
+        key = row[self.key_index]
+        return row not in (
+            self.rows_at_mark.get(key),
+            self.rows_without_change.get(key),
+        )
+
+    def update(
+        self, rows: Iterable[Tuple[Optional[datetime], Tuple[object, ...]]]
+    ) -> None:
+        """Move the mark to the latest of (last_change, row) of copied rows."""
+        for last_change, row in rows:
+            key = row[self.key_index]
+            if last_change is None:
+                self.rows_without_change[key] = row
+                continue
+            self.rows_without_change.pop(key, None)
+            if last_change < self.last_change:
+                continue
+            if last_change > self.last_change:
+                self.last_change = last_change
+                self.rows_at_mark.clear()
+            self.rows_at_mark[key] = row
+
+
+@dataclass
+class SyncStatistics:
+    """Numbers of rows inserted, updated, and left unchanged by a sync."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+@dataclass
+class SyncReport:
+    """Changes copied from ldb to pdb by copy_from_ldb()."""
+
+    bookings: SyncStatistics = field(default_factory=SyncStatistics)
+    changed_robots: Set[str] = field(default_factory=set)
+    changed_carts: Set[str] = field(default_factory=set)
+
+
+# Select these headers from orders_in, see parse_order().
+ORDER_HEADERS = (
+    "charging_session_id",
+    "bev_Port_Location",
+    "drop_location",
+    "BEV_slot_planned",
+    "plugintime_calculated",
+    "drop_date_time",
+    "pick_up_date_time",
+    "booking_date_time_dev",
+    "charging_session_status",
+    "last_change",
+    "Actual_Drop_SOC",
+    "Actual_Target_SOC",
+    "Actual_plugintime_calculated",
+    "Actual_BEV_Drop_Time",
+    "Actual_BEV_Pickup_Time",
+)
+LAST_CHANGE_INDEX = ORDER_HEADERS.index("last_change")
+# Update these columns of existing bookings.
+BOOKING_SYNC_COLUMNS = (
+    "charging_session_status",
+    "last_change",
+    "planned_BEV_drop_time",
+    "planned_BEV_location",
+    "planned_plugintime_calculated",
+    "planned_BEV_pickup_time",
+    "BEV_slot_planned",
+    "BEV_port_location",
+    "actual_BEV_drop_time",
+    "actual_BEV_location",
+    "actual_charge_request",
+    "actual_plugintime_calculated",
+    "actual_BEV_pickup_time",
+)
+# Forget bookings in these states after syncing them.
+TERMINAL_BOOKING_STATES = ("canceled", "no_show", "completed")
+# Note: robot_info and cart_info have no last_change column to sync incrementally.
+orders_watermark = Watermark()
+# Key in Session.info of callbacks finishing syncs when the session commits.
+PENDING_SYNCS = "pending_syncs"
+
+
+def reset_sync() -> None:
+    """
+    Let the next copy_from_ldb() copy all rows again, e.g. after pdb was recreated,
+    and forget changes not yet fetched.
+    """
+    orders_watermark.reset()
+    booking_hashes.clear()
+    changed_booking_ids.clear()
+    robot_snapshots.clear()
+    cart_snapshots.clear()
+    for changelog in (robot_cart_changelog, orders_changelog):
+        if changelog:
+            changelog.reset()
+
+
+def use_changelogs(enabled: bool = True) -> None:
+    """
+    Install triggers logging changes of ldb tables and consume them in syncs,
+    or uninstall them if not enabled and scan the tables again.
+    """
+    global robot_cart_changelog, orders_changelog
+    if not enabled:
+        for changelog in (robot_cart_changelog, orders_changelog):
+            if changelog:
+                changelog.uninstall()
+        robot_cart_changelog = orders_changelog = None
+        return
+
+    robot_cart_changelog = ChangeLog(
+        SQLite3Access,
+        Dialect.SQLITE,
+        {"robot_info": "name", "cart_info": "name"},
+        "changelog_robot_cart",
+    )
+    orders_changelog = ChangeLog(
+        LDB.get,
+        Dialect.MYSQL if MySQLAccess.is_configured() else Dialect.SQLITE,
+        {"orders_in": "charging_session_id"},
+        "changelog_orders",
+    )
+    robot_cart_changelog.install()
+    orders_changelog.install()
+
+
+def consume_changes(changelog: Optional[ChangeLog]) -> Optional[ChangeBatch]:
+    """Return changes of changelog if it is enabled."""
+    return changelog.consume() if changelog else None
+
+
+def get_changed_keys(batch: Optional[ChangeBatch], table: str) -> Optional[Set[str]]:
+    """Return keys of changed rows of table in batch, or None if all may be changed."""
+    return batch.get_keys(table) if batch else None
+
+
+def ack_changes(changelog: Optional[ChangeLog], batch: Optional[ChangeBatch]) -> None:
+    """Acknowledge and compact applied changes of batch."""
+    if changelog and batch and changelog.ack(batch):
+        changelog.compact()
 
 
 def is_sql_none(string: Optional[str]) -> bool:
@@ -33,35 +232,174 @@ def parse_sql_string(string: Optional[str]) -> Optional[str]:
     return None if is_sql_none(string) else string
 
 
-def parse_datetime(datetime_object: object) -> Optional[datetime]:
-    """Parse datetime from SQL object."""
-    if isinstance(datetime_object, datetime):
-        return datetime_object
-    if not datetime_object or not re.match(
-        r"(\d+)-(\d+)-(\d+) (\d+):(\d+):(\d+)$", datetime_object
-    ):
-        return None
+def parse_order(row: Tuple[object, ...]) -> Dict[str, object]:
+    """Parse row of ORDER_HEADERS from orders_in into column values of Booking."""
+    (
+        charging_session_id,
+        BEV_port_location,
+        drop_location,
+        BEV_slot_planned,
+        plugintime_calculated,
+        drop_date_time,
+        pick_up_date_time,
+        booking_date_time_dev,
+        charging_session_status,
+        last_change,
+        actual_drop_SOC,
+        actual_target_SOC,
+        actual_plugintime_calculated,
+        actual_BEV_drop_time,
+        actual_BEV_pickup_time,
+    ) = row
+    creation_time = parse_datetime(booking_date_time_dev)
+    return dict(
+        id=int(charging_session_id),
+        charging_session_status=charging_session_status,
+        # Note: Fall back to the creation time for orders written without last_change.
+        last_change=parse_datetime(last_change) or creation_time,
+        planned_BEV_drop_time=parse_datetime(drop_date_time),
+        planned_BEV_location=drop_location,
+        planned_plugintime_calculated=timedelta(minutes=float(plugintime_calculated)),
+        planned_BEV_pickup_time=parse_datetime(pick_up_date_time),
+        BEV_slot_planned=BEV_slot_planned,
+        BEV_port_location=BEV_port_location,
+        actual_BEV_drop_time=parse_datetime(actual_BEV_drop_time),
+        actual_BEV_location=drop_location,
+        actual_charge_request=float(actual_target_SOC) - float(actual_drop_SOC),
+        actual_plugintime_calculated=timedelta(
+            minutes=(
+                0.0
+                if is_sql_none(actual_plugintime_calculated)
+                else float(actual_plugintime_calculated)
+            )
+        ),
+        actual_BEV_pickup_time=parse_datetime(actual_BEV_pickup_time),
+        creation_time=creation_time,
+    )
 
-    return datetime.strptime(datetime_object, "%Y-%m-%d %H:%M:%S")
 
+def upsert_bookings(
+    session: Session, bookings: List[Dict[str, object]]
+) -> SyncStatistics:
+    """
+    Insert new and update changed bookings with one executemany statement,
+    and remember their ids for fetch_updated_bookings().
+    Bookings equal to their last synced values or their pdb rows are not written.
+    """
+    statistics = SyncStatistics()
+    values = {
+        booking["id"]: tuple(booking[name] for name in BOOKING_SYNC_COLUMNS)
+        for booking in bookings
+    }
+    columns = [Booking.__table__.c[name] for name in BOOKING_SYNC_COLUMNS]
+    existing_rows: Dict[int, Tuple[object, ...]] = {}
+    # Look up only bookings not synced before in pdb.
+    booking_ids = [
+        booking_id
+        for booking_id in values.keys()
+        if booking_id not in booking_hashes.keys()
+    ]
+    # Note: Stay below SQLite's limit of variables per statement.
+    for index in range(0, len(booking_ids), 500):
+        for booking_id, *row in session.execute(
+            select(Booking.__table__.c.id, *columns).where(
+                Booking.__table__.c.id.in_(booking_ids[index : index + 500])
+            )
+        ):
+            existing_rows[booking_id] = tuple(row)
+    changed_bookings: Dict[int, Dict[str, object]] = {}
+    for booking in bookings:
+        booking_id = booking["id"]
+        values_hash = hash(values[booking_id])
+        if booking_id in booking_hashes.keys():
+            if values_hash == booking_hashes[booking_id]:
+                statistics.unchanged += 1
+            else:
+                statistics.updated += 1
+                changed_bookings[booking_id] = booking
+        elif booking_id in existing_rows.keys():
+            if values[booking_id] == existing_rows[booking_id]:
+                statistics.unchanged += 1
+            else:
+                statistics.updated += 1
+                changed_bookings[booking_id] = booking
+        else:
+            statistics.inserted += 1
+            changed_bookings[booking_id] = booking
+        if str(booking["charging_session_status"]).lower() in TERMINAL_BOOKING_STATES:
+            booking_hashes.pop(booking_id, None)
+        else:
+            booking_hashes[booking_id] = values_hash
+    changed_booking_ids.update(changed_bookings.keys())
+    if changed_bookings:
+        statement = sqlite_insert(Booking.__table__)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[Booking.__table__.c.id],
+                set_={name: statement.excluded[name] for name in BOOKING_SYNC_COLUMNS},
+            ),
+            list(changed_bookings.values()),
+        )
+    return statistics
 
-def parse_timedelta(string: Optional[str]) -> Optional[timedelta]:
-    """Parse timedelta from SQL string."""
-    if not string or not re.match(r"(\d+):(\d+):(\d+)$", string):
-        return None
 
-    hours_str, minutes_str, seconds_str = string.split(":")
-    return timedelta(
-        hours=float(hours_str),
-        minutes=float(minutes_str),
-        seconds=float(seconds_str),
-    )
+def update_changed(
+    session: Session,
+    table: Table,
+    entries: NamedValues,
+    snapshots: NamedValues,
+) -> Set[str]:
+    """
+    Update rows of table named like entries whose values differ from their snapshots
+    with one executemany statement. Return names of the updated rows.
+    """
+    changed_entries = {
+        name: values
+        for name, values in entries.items()
+        if snapshots.get(name) != values
+    }
+    if changed_entries:
+        session.execute(
+            update(table).where(table.c.name == bindparam("entry_name")),
+            [
+                {"entry_name": name, **values}
+                for name, values in changed_entries.items()
+            ],
+        )
+        snapshots.update(changed_entries)
+    return set(changed_entries.keys())
+
+
+@event.listens_for(Session, "after_commit")
+def on_commit(session: Session) -> None:
+    for finish_sync in session.info.pop(PENDING_SYNCS, []):
+        finish_sync()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def on_rollback(session: Session, _: object) -> None:
+    if session.info.pop(PENDING_SYNCS, None):
+        # Copy everything again, since the synced state was not written to pdb.
+        reset_sync()
+
 
+def defer_until_commit(session: Session, finish_sync: Callable[[], None]) -> None:
+    """Call finish_sync when session commits, or reset_sync() if it rolls back."""
+    session.info.setdefault(PENDING_SYNCS, []).append(finish_sync)
 
-def copy_from_ldb(filepath: str = ldb_filepath) -> None:
-    """Copy robot_info, cart_info, and orders_in from ldb to pdb."""
-    with Session(pdb_engine) as session:
-        with SQLite3Access() as ldb_cursor:
+
+def fetch_robots_and_carts() -> Tuple[Optional[ChangeBatch], NamedValues, NamedValues]:
+    """
+    Return consumed changes of robot_info and cart_info, and dicts of names
+    and values of robots and carts which may have changed in ldb.
+    """
+    changes = consume_changes(robot_cart_changelog)
+    robot_names = get_changed_keys(changes, "robot_info")
+    cart_names = get_changed_keys(changes, "cart_info")
+    robots: NamedValues = {}
+    carts: NamedValues = {}
+    with SQLite3Access() as ldb_cursor:
+        if robot_names is None or robot_names:
             ldb_cursor.execute(
                 """SELECT
                 name,
@@ -69,160 +407,139 @@ def copy_from_ldb(filepath: str = ldb_filepath) -> None:
                 ongoing_action,
                 previous_action,
                 robot_charge,
-                error_count FROM robot_info;"""
+                error_count FROM robot_info"""
+                + get_key_condition("name", robot_names)
+                + ";"
             )
-            for (
-                name,
-                robot_location,
-                ongoing_action,
-                previous_action,
-                robot_charge,
-                error_count,
-            ) in ldb_cursor.fetchall():
-                session.exec(
-                    update(Robot)
-                    .values(
-                        robot_location=robot_location,
-                        ongoing_action=parse_sql_string(ongoing_action),
-                        previous_action=parse_sql_string(previous_action),
-                        robot_charge=float(robot_charge),
-                        error_count=int(error_count),
-                    )
-                    .where(Robot.name == name)
+            robots = {
+                name: dict(
+                    robot_location=robot_location,
+                    ongoing_action=parse_sql_string(ongoing_action),
+                    previous_action=parse_sql_string(previous_action),
+                    robot_charge=float(robot_charge),
+                    error_count=int(error_count),
                 )
+                for (
+                    name,
+                    robot_location,
+                    ongoing_action,
+                    previous_action,
+                    robot_charge,
+                    error_count,
+                ) in ldb_cursor.fetchall()
+            }
 
+        if cart_names is None or cart_names:
             ldb_cursor.execute(
                 """SELECT
                 name,
-                cart_location FROM cart_info;"""
+                cart_location FROM cart_info"""
+                + get_key_condition("name", cart_names)
+                + ";"
             )
-            for (
-                name,
-                cart_location,
-            ) in ldb_cursor.fetchall():
-                session.exec(
-                    update(Cart)
-                    .values(
-                        cart_location=cart_location,
-                    )
-                    .where(Cart.name == name)
-                )
+            carts = {
+                name: dict(cart_location=cart_location)
+                for name, cart_location in ldb_cursor.fetchall()
+            }
+    return changes, robots, carts
 
+
+def fetch_orders() -> Tuple[Optional[ChangeBatch], List[Tuple[object, ...]]]:
+    """
+    Return consumed changes of orders_in, and rows of ORDER_HEADERS
+    from orders_in changed since the last sync.
+    """
+    changes = consume_changes(orders_changelog)
+    order_ids = get_changed_keys(changes, "orders_in")
+    rows: List[Tuple[object, ...]] = []
+    if order_ids is None or order_ids:
         with LDB.get() as ldb_cursor:
             ldb_cursor.execute(
-                """SELECT
-                charging_session_id,
-                bev_Port_Location,
-                drop_location,
-                BEV_slot_planned,
-                plugintime_calculated,
-                drop_date_time,
-                pick_up_date_time,
-                booking_date_time_dev,
-                charging_session_status,
-                last_change,
-                Actual_Drop_SOC,
-                Actual_Target_SOC,
-                Actual_plugintime_calculated,
-                Actual_BEV_Drop_Time,
-                Actual_BEV_Pickup_Time FROM orders_in;"""
-            )
-            for (
-                charging_session_id,
-                BEV_port_location,
-                drop_location,
-                BEV_slot_planned,
-                plugintime_calculated,
-                drop_date_time,
-                pick_up_date_time,
-                booking_date_time_dev,
-                charging_session_status,
-                last_change,
-                actual_drop_SOC,
-                actual_target_SOC,
-                actual_plugintime_calculated,
-                actual_BEV_drop_time,
-                actual_BEV_pickup_time,
-            ) in ldb_cursor.fetchall():
-                booking_id = int(charging_session_id)
-                charging_session_status = charging_session_status
-                last_change = parse_datetime(last_change)
-                planned_BEV_drop_time = parse_datetime(drop_date_time)
-                planned_BEV_location = drop_location
-                planned_plugintime_calculated = timedelta(
-                    minutes=float(plugintime_calculated)
-                )
-                planned_BEV_pickup_time = parse_datetime(pick_up_date_time)
-                actual_BEV_drop_time = parse_datetime(actual_BEV_drop_time)
-                actual_BEV_location = drop_location
-                actual_charge_request = float(actual_target_SOC) - float(actual_drop_SOC)
-                actual_plugintime_calculated = timedelta(
-                    minutes=(
-                        0.0
-                        if is_sql_none(actual_plugintime_calculated)
-                        else float(actual_plugintime_calculated)
-                    )
+                f"SELECT {', '.join(ORDER_HEADERS)} FROM orders_in"
+                + (
+                    orders_watermark.get_condition()
+                    if order_ids is None
+                    else get_key_condition("charging_session_id", order_ids)
                 )
-                actual_BEV_pickup_time = parse_datetime(actual_BEV_pickup_time)
-                if session.exec(
-                    select(Booking).where(Booking.id == charging_session_id)
-                ).first():
-                    session.exec(
-                        update(Booking)
-                        .values(
-                            charging_session_status=charging_session_status,
-                            last_change=last_change,
-                            planned_BEV_drop_time=planned_BEV_drop_time,
-                            planned_BEV_location=planned_BEV_location,
-                            planned_plugintime_calculated=planned_plugintime_calculated,
-                            planned_BEV_pickup_time=planned_BEV_pickup_time,
-                            BEV_slot_planned=BEV_slot_planned,
-                            BEV_port_location=BEV_port_location,
-                            actual_BEV_drop_time=actual_BEV_drop_time,
-                            actual_BEV_location=actual_BEV_location,
-                            actual_charge_request=actual_charge_request,
-                            actual_plugintime_calculated=actual_plugintime_calculated,
-                            actual_BEV_pickup_time=actual_BEV_pickup_time,
-                        )
-                        .where(Booking.id == charging_session_id)
-                    )
-                else:
-                    session.exec(
-                        insert(Booking).values(
-                            id=booking_id,
-                            charging_session_status=charging_session_status,
-                            last_change=last_change,
-                            planned_BEV_drop_time=planned_BEV_drop_time,
-                            planned_BEV_location=planned_BEV_location,
-                            planned_plugintime_calculated=planned_plugintime_calculated,
-                            planned_BEV_pickup_time=planned_BEV_pickup_time,
-                            BEV_slot_planned=BEV_slot_planned,
-                            BEV_port_location=BEV_port_location,
-                            actual_BEV_drop_time=actual_BEV_drop_time,
-                            actual_BEV_location=actual_BEV_location,
-                            actual_charge_request=actual_charge_request,
-                            actual_plugintime_calculated=actual_plugintime_calculated,
-                            actual_BEV_pickup_time=actual_BEV_pickup_time,
-                            creation_time=parse_datetime(booking_date_time_dev),
-                        )
-                    )
-
-            session.commit()
-
-
-def fetch_updated_bookings() -> Dict[int, Booking]:
-    """Return bookings updated in pdb which have not yet been fetched."""
+                + ";"
+            )
+            rows = [
+                row for row in ldb_cursor.fetchall() if orders_watermark.is_new(row)
+            ]
+    return changes, rows
+
+
+def copy_from_ldb(
+    filepath: str = ldb_filepath,
+    full_sync: bool = False,
+    session: Optional[Session] = None,
+    executor: Optional[Executor] = None,
+) -> SyncReport:
+    """
+    Copy robot_info, cart_info, and orders_in from ldb to pdb.
+    Copy only robots and carts changed since the last sync,
+    and only rows of orders_in changed since the last sync, unless full_sync.
+    If change logs are enabled, read only rows logged as changed.
+
+    Write to session without committing if given, else commit a new session.
+    The sync is only remembered once session commits.
+    Read orders_in concurrently with executor if given.
+    """
+    if session is None:
+        with Session(pdb_engine) as session, session.begin():
+            return copy_from_ldb(filepath, full_sync, session, executor)
+
+    report = SyncReport()
+    if full_sync:
+        orders_watermark.reset()
+        booking_hashes.clear()
+        robot_snapshots.clear()
+        cart_snapshots.clear()
+        for changelog in (robot_cart_changelog, orders_changelog):
+            if changelog:
+                changelog.reset()
+    orders_future = executor.submit(fetch_orders) if executor else None
+    robot_cart_changes, robots, carts = fetch_robots_and_carts()
+    orders_changes, rows = orders_future.result() if orders_future else fetch_orders()
+    report.changed_robots = update_changed(
+        session, Robot.__table__, robots, robot_snapshots
+    )
+    report.changed_carts = update_changed(
+        session, Cart.__table__, carts, cart_snapshots
+    )
+    bookings = [parse_order(row) for row in rows]
+    report.bookings = upsert_bookings(session, bookings)
+
+    def finish_sync() -> None:
+        orders_watermark.update(
+            (parse_datetime(row[LAST_CHANGE_INDEX]), row) for row in rows
+        )
+        ack_changes(robot_cart_changelog, robot_cart_changes)
+        ack_changes(orders_changelog, orders_changes)
+
+    defer_until_commit(session, finish_sync)
+    return report
+
+
+def fetch_updated_bookings(session: Optional[Session] = None) -> Dict[int, Booking]:
+    """
+    Return bookings changed by syncs which have not yet been fetched,
+    loaded by session if given, else by a new session.
+    """
+    if session is None:
+        with Session(pdb_engine) as session:
+            return fetch_updated_bookings(session)
+
+    booking_ids = list(changed_booking_ids)
+    changed_booking_ids.clear()
     updated_bookings: Dict[int, Booking] = {}
-    with Session(pdb_engine) as session:
-        bookings = session.exec(select(Booking)).fetchall()
-        for booking in bookings:
-            booking_id = booking.id
-            if (
-                booking.id not in fetched_bookings.keys()
-                or booking != fetched_bookings[booking_id]
-            ):
-                fetched_bookings[booking_id] = booking
-                updated_bookings[booking_id] = booking
+    for index in range(0, len(booking_ids), 500):
+        for booking in session.exec(
+            select(Booking)
+            .where(Booking.id.in_(booking_ids[index : index + 500]))
+            .execution_options(populate_existing=True)
+        ):
+            updated_bookings[booking.id] = booking
     return updated_bookings
 
 
@@ -0,0 +1,137 @@
+"""Shared polling of database conditions awaited by multiple threads"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from concurrent import futures
+import logging
+import threading
+import time
+from chargepal_local_server.access_ldb import MySQLAccess
+
+
+# Map keys of rows to values of their columns.
+RowValues = Dict[str, Dict[str, object]]
+# Read values of columns for rows with keys of table, see read_columns().
+ReadColumns = Callable[[str, Iterable[str], Iterable[str]], RowValues]
+
+
+def read_columns(table: str, columns: Iterable[str], keys: Iterable[str]) -> RowValues:
+    """Return values of columns by Battry_ID for rows with keys of table in lsv_db."""
+    columns = list(columns)
+    keys = list(keys)
+    with MySQLAccess() as cursor:
+        cursor.execute(
+            f"SELECT Battry_ID, {', '.join(columns)} FROM {table}"
+            f" WHERE Battry_ID IN ({', '.join(['%s'] * len(keys))});",
+            keys,
+        )
+        return {key: dict(zip(columns, values)) for key, *values in cursor.fetchall()}
+
+
+class Waiter:
+    """Condition that column of the row with key in table equals expected."""
+
+    def __init__(
+        self, table: str, key: str, column: str, expected: object, deadline: float
+    ) -> None:
+        self.table = table
+        self.key = key
+        self.column = column
+        self.expected = expected
+        self.deadline = deadline
+        self.future: futures.Future = futures.Future()
+
+
+class ConditionWaiter:
+    """
+    Poll conditions of all waiting threads in one thread, with one query per table
+    and poll, so that all waiters share the poller's pooled connection.
+
+    Polls start at poll_interval seconds after a condition was met or added,
+    and back off by backoff_factor up to max_poll_interval while none is met.
+    """
+
+    def __init__(
+        self,
+        read: ReadColumns = read_columns,
+        poll_interval: float = 0.1,
+        max_poll_interval: float = 1.0,
+        backoff_factor: float = 1.5,
+    ) -> None:
+        self.read = read
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff_factor = backoff_factor
+        self.lock = threading.Lock()
+        self.waiters: List[Waiter] = []
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.poll_count = 0
+
+    def wait_for(
+        self, table: str, key: str, column: str, expected: object, timeout: float
+    ) -> bool:
+        """
+        Wait until column of the row with key in table equals expected.
+        Return whether it did within timeout seconds.
+        """
+        waiter = Waiter(table, key, column, expected, time.monotonic() + timeout)
+        with self.lock:
+            self.waiters.append(waiter)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+        return waiter.future.result()
+
+    def run(self) -> None:
+        interval = self.poll_interval
+        while True:
+            with self.lock:
+                waiters = list(self.waiters)
+            if not waiters:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                interval = self.poll_interval
+                continue
+
+            if self.poll(waiters):
+                interval = self.poll_interval
+            else:
+                interval = min(interval * self.backoff_factor, self.max_poll_interval)
+            with self.lock:
+                deadlines = [waiter.deadline for waiter in self.waiters]
+            now = time.monotonic()
+            timeout = min([interval, *(deadline - now for deadline in deadlines)])
+            if self.wakeup.wait(max(timeout, 0.0)):
+                self.wakeup.clear()
+                interval = self.poll_interval
+
+    def poll(self, waiters: List[Waiter]) -> bool:
+        """Resolve waiters whose condition is met or expired. Return whether any met."""
+        self.poll_count += 1
+        queries: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        for waiter in waiters:
+            columns, keys = queries.setdefault(waiter.table, (set(), set()))
+            columns.add(waiter.column)
+            keys.add(waiter.key)
+        values: Dict[str, RowValues] = {}
+        for table, (columns, keys) in queries.items():
+            try:
+                values[table] = self.read(table, sorted(columns), sorted(keys))
+            except Exception as exception:
+                logging.warning(f"Polling {table} failed: {exception}")
+
+        now = time.monotonic()
+        resolved: List[Tuple[Waiter, bool]] = []
+        for waiter in waiters:
+            row = values.get(waiter.table, {}).get(waiter.key, {})
+            if waiter.column in row.keys() and row[waiter.column] == waiter.expected:
+                resolved.append((waiter, True))
+            elif now >= waiter.deadline:
+                resolved.append((waiter, False))
+        with self.lock:
+            for waiter, _ in resolved:
+                self.waiters.remove(waiter)
+        for waiter, met in resolved:
+            waiter.future.set_result(met)
+        return any(met for _, met in resolved)
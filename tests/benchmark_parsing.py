@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Compare the parsing module with the previous inline parsers"""
+
+from typing import Callable, List, Optional
+from datetime import datetime, timedelta
+import re
+import timeit
+from chargepal_local_server import parsing
+
+
+def legacy_parse_datetime(datetime_object: object) -> Optional[datetime]:
+    """Parse datetime as update_pdb did before the parsing module."""
+    if isinstance(datetime_object, datetime):
+        return datetime_object
+    if not datetime_object or not re.match(
+        r"(\d+)-(\d+)-(\d+) (\d+):(\d+):(\d+)$", datetime_object
+    ):
+        return None
+
+    return datetime.strptime(datetime_object, "%Y-%m-%d %H:%M:%S")
+
+
+def legacy_parse_any(obj: object) -> object:
+    """Parse any str as access_ldb did before the parsing module."""
+    if isinstance(obj, str):
+        if re.match(r"(\d+)-(\d+)-(\d+) (\d+):(\d+):(\d+)$", obj):
+            return datetime.strptime(obj, "%Y-%m-%d %H:%M:%S")
+        if re.match(r"(\d+):(\d+):(\d+)$", obj):
+            hours_str, minutes_str, seconds_str = obj.split(":")
+            return timedelta(
+                hours=float(hours_str),
+                minutes=float(minutes_str),
+                seconds=float(seconds_str),
+            )
+        if obj.isnumeric() and not obj.startswith("0"):
+            return float(obj) if "." in obj else int(obj)
+    return obj
+
+
+def create_values(count: int, distinct_count: int) -> List[str]:
+    """Return count datetime strings of which distinct_count are different."""
+    start = datetime(2024, 1, 1)
+    return [
+        str(start + timedelta(minutes=index % distinct_count)) for index in range(count)
+    ]
+
+
+def measure(parse: Callable[[object], object], values: List[str]) -> float:
+    """Return the best duration in µs per value of parsing all values."""
+    durations = timeit.repeat(
+        lambda: [parse(value) for value in values], number=1, repeat=5
+    )
+    return 1e6 * min(durations) / len(values)
+
+
+def main() -> None:
+    mixed_values = ["2024-01-01 12:00:00", "00:45:00", "42", "ADS_1", "None"] * 2000
+    for name, values in (
+        ("repeating datetimes", create_values(10000, 100)),
+        ("distinct datetimes", create_values(10000, 10000)),
+    ):
+        parsing.clear_caches()
+        print(
+            f"{name:<24}legacy {measure(legacy_parse_datetime, values):6.2f} µs,"
+            f" parsing {measure(parsing.parse_datetime, values):6.2f} µs"
+        )
+    parsing.clear_caches()
+    print(
+        f"{'mixed parse_any':<24}legacy {measure(legacy_parse_any, mixed_values):6.2f} µs,"
+        f" parsing {measure(parsing.parse_any, mixed_values):6.2f} µs"
+    )
+
+
+if __name__ == "__main__":
+    main()
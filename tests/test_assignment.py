@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+from typing import List, Tuple
+import itertools
+import numpy as np
+from chargepal_local_server.assignment import solve_assignment
+
+
+def brute_force_cost(costs: np.ndarray) -> Tuple[int, float]:
+    """Return most assigned pairs and their least total cost by trying all assignments."""
+    best = (0, 0.0)
+    rows, columns = costs.shape
+    for permutation in itertools.permutations(range(max(rows, columns))):
+        pairs = [
+            (row, column)
+            for row, column in enumerate(permutation[:rows])
+            if column < columns and np.isfinite(costs[row, column])
+        ]
+        total = sum(costs[row, column] for row, column in pairs)
+        if len(pairs) > best[0] or len(pairs) == best[0] and total < best[1]:
+            best = (len(pairs), total)
+    return best
+
+
+def get_cost(costs: np.ndarray, pairs: List[Tuple[int, int]]) -> Tuple[int, float]:
+    return len(pairs), sum(costs[row, column] for row, column in pairs)
+
+
+def test_solve_assignment() -> None:
+    costs = np.array([[4.0, 1.0, 3.0], [2.0, 0.0, 5.0], [3.0, 2.0, 2.0]])
+    assert solve_assignment(costs) == [(0, 1), (1, 0), (2, 2)]
+    # Greedy would assign row 0 to column 0 and leave row 1 with cost 10.
+    costs = np.array([[1.0, 2.0], [2.0, 10.0]])
+    assert solve_assignment(costs) == [(0, 1), (1, 0)]
+    assert solve_assignment(np.zeros((0, 3))) == []
+    assert solve_assignment(np.full((2, 2), np.inf)) == []
+
+
+def test_solve_assignment_random() -> None:
+    generator = np.random.default_rng(0)
+    for _ in range(200):
+        rows, columns = generator.integers(1, 6, 2)
+        costs = generator.integers(0, 20, (rows, columns)).astype(float)
+        costs[generator.random((rows, columns)) < 0.3] = np.inf
+        pairs = solve_assignment(costs)
+        assert len(set(row for row, _ in pairs)) == len(pairs), pairs
+        assert len(set(column for _, column in pairs)) == len(pairs), pairs
+        assert get_cost(costs, pairs) == brute_force_cost(costs), (costs, pairs)
+
+
+if __name__ == "__main__":
+    test_solve_assignment()
+    test_solve_assignment_random()
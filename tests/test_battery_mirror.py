@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Tuple
+from datetime import datetime
+import re
+import time
+from chargepal_local_server import battery_communication
+from chargepal_local_server.battery_communication import UpdateManager
+from chargepal_local_server.battery_mirror import BatteryMirror, FieldChange
+from chargepal_local_server.changelog import ChangeBatch
+
+
+COLUMNS = {
+    "CAN_MSG_RX_LIVE": ["Battry_ID", "bat_state_charging", "last_change"],
+    "TX_ChargeOrdersFeedback": ["Battry_ID", "Bat_State_actual"],
+}
+
+
+class FakeLsvDb:
+    """Tables of rows in memory, answering the conditions of BatteryMirror."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, Dict[str, Dict[str, object]]] = {
+            table: {} for table in COLUMNS.keys()
+        }
+        self.conditions: List[Tuple[str, str]] = []
+
+    def set_live(self, battery_id: str, state: str) -> None:
+        self.rows["CAN_MSG_RX_LIVE"][battery_id] = {
+            "Battry_ID": battery_id,
+            "bat_state_charging": state,
+            "last_change": datetime.now(),
+        }
+
+    def read(self, table: str, condition: str) -> Tuple[List[str], List[tuple]]:
+        self.conditions.append((table, condition))
+        rows = list(self.rows[table].values())
+        time_match = re.match(r" WHERE last_change >= '(.*)'$", condition)
+        if time_match:
+            last_time = datetime.fromisoformat(time_match.group(1))
+            rows = [row for row in rows if row["last_change"] >= last_time]
+        elif condition:
+            keys = re.findall(r"'([^']*)'", condition)
+            rows = [row for row in rows if row["Battry_ID"] in keys]
+        return COLUMNS[table], [
+            tuple(row[column] for column in COLUMNS[table]) for row in rows
+        ]
+
+
+class FakeChangeLog:
+    def __init__(self) -> None:
+        self.batch = ChangeBatch(0)
+        self.acked: List[ChangeBatch] = []
+
+    def consume(self) -> ChangeBatch:
+        return self.batch
+
+    def ack(self, batch: ChangeBatch) -> bool:
+        self.acked.append(batch)
+        return False
+
+
+def test_incremental_refresh() -> None:
+    lsv_db = FakeLsvDb()
+    lsv_db.set_live("Battery_DUS_01", "idle")
+    lsv_db.set_live("Battery_DUS_02", "idle")
+    lsv_db.rows["TX_ChargeOrdersFeedback"]["Battery_DUS_01"] = {
+        "Battry_ID": "Battery_DUS_01",
+        "Bat_State_actual": "standby_ok",
+    }
+    mirror = BatteryMirror(read=lsv_db.read)
+    changes: List[FieldChange] = []
+    mirror.subscribe("CAN_MSG_RX_LIVE", "bat_state_charging", changes.append)
+    mirror.refresh()
+    assert sorted(change.key for change in changes) == [
+        "Battery_DUS_01",
+        "Battery_DUS_02",
+    ]
+    assert mirror.get_row("TX_ChargeOrdersFeedback", "Battery_DUS_01") == {
+        "Battry_ID": "Battery_DUS_01",
+        "Bat_State_actual": "standby_ok",
+    }
+
+    # Check that only changed live rows are read and only changed fields notified.
+    changes.clear()
+    lsv_db.set_live("Battery_DUS_02", "bat_charging")
+    lsv_db.conditions.clear()
+    mirror.refresh()
+    assert lsv_db.conditions[0][1].startswith(" WHERE last_change >= ")
+    assert changes == [
+        FieldChange(
+            "CAN_MSG_RX_LIVE",
+            "Battery_DUS_02",
+            "bat_state_charging",
+            "idle",
+            "bat_charging",
+        )
+    ]
+    # Check that deleted rows of completely read tables are removed.
+    del lsv_db.rows["TX_ChargeOrdersFeedback"]["Battery_DUS_01"]
+    mirror.refresh()
+    assert mirror.get_row("TX_ChargeOrdersFeedback", "Battery_DUS_01") is None
+    # Check that reads are not refreshed again within max_age.
+    refresh_count = mirror.refresh_count
+    mirror.refresh_if_older(60.0)
+    assert mirror.refresh_count == refresh_count
+
+
+def test_changelog_refresh() -> None:
+    lsv_db = FakeLsvDb()
+    lsv_db.set_live("Battery_DUS_01", "idle")
+    lsv_db.set_live("Battery_DUS_02", "idle")
+    changelog = FakeChangeLog()
+    mirror = BatteryMirror(changelog=changelog, read=lsv_db.read)
+    mirror.refresh()
+    assert lsv_db.conditions == [
+        ("CAN_MSG_RX_LIVE", ""),
+        ("TX_ChargeOrdersFeedback", ""),
+    ]
+
+    lsv_db.conditions.clear()
+    del lsv_db.rows["CAN_MSG_RX_LIVE"]["Battery_DUS_02"]
+    changelog.batch = ChangeBatch(
+        1, {"CAN_MSG_RX_LIVE": {"Battery_DUS_02"}, "TX_ChargeOrdersFeedback": set()}
+    )
+    changes = mirror.refresh()
+    assert lsv_db.conditions == [
+        ("CAN_MSG_RX_LIVE", " WHERE Battry_ID IN ('Battery_DUS_02')")
+    ]
+    assert changelog.acked[-1] is changelog.batch
+    assert mirror.get_row("CAN_MSG_RX_LIVE", "Battery_DUS_02") is None
+    assert {change.new_value for change in changes} == {None}
+
+
+def test_update_manager() -> None:
+    lsv_db = FakeLsvDb()
+    lsv_db.set_live("Battery_DUS_01", "idle")
+    lsv_db.set_live("Battery_DUS_09", "idle")
+    manager = UpdateManager({"BAT_1": "Battery_DUS_01"})
+    manager.mirror.read = lsv_db.read
+    # Note: Refresh the mirror as another reader would since MySQL is not used.
+    manager.mirror.refresh()
+    assert manager.tick() == {"BAT_1": "idle"}
+    assert manager.tick() == {}
+    lsv_db.set_live("Battery_DUS_01", "bat_charging")
+    battery_communication.use_mirror(manager.mirror)
+    try:
+        # Check that reads are served from the mirror, refreshed when outdated.
+        time.sleep(2.0 * battery_communication.MIRROR_MAX_AGE)
+        assert (
+            battery_communication.read_data(
+                "CAN_MSG_RX_LIVE", "Battery_DUS_01", "bat_state_charging"
+            )
+            == "bat_charging"
+        )
+    finally:
+        battery_communication.use_mirror(None)
+    assert manager.tick() == {"BAT_1": "bat_charging"}
+    assert manager.battery_states["BAT_1"] == "bat_charging"
+
+
+if __name__ == "__main__":
+    test_incremental_refresh()
+    test_changelog_refresh()
+    test_update_manager()
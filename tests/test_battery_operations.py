@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+from typing import Dict, List, Tuple
+import threading
+from chargepal_local_server.battery_operations import (
+    BatteryOperationExecutor,
+    OperationStatus,
+)
+
+
+class FakeBattery:
+    """Run battery requests which finish once released, recording their order."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.releases: Dict[str, threading.Event] = {}
+        self.started: List[Tuple[str, str]] = []
+
+    def release(self, request_name: str) -> None:
+        with self.lock:
+            self.releases.setdefault(request_name, threading.Event()).set()
+
+    def run(self, request_name: str, cart_name: str, station_name: str) -> bool:
+        with self.lock:
+            self.started.append((cart_name, request_name))
+            release = self.releases.setdefault(request_name, threading.Event())
+        assert release.wait(5.0)
+        if request_name == "broken":
+            raise RuntimeError("No feedback")
+        return request_name != "mode_req_idle"
+
+
+def test_operations() -> None:
+    battery = FakeBattery()
+    executor = BatteryOperationExecutor(battery.run, max_workers=2)
+    wakeup = executor.submit("wakeup", "ChargePal1")
+    idle = executor.submit("mode_req_idle", "ChargePal1")
+    broken = executor.submit("broken", "ChargePal2")
+    assert len({wakeup.operation_id, idle.operation_id, broken.operation_id}) == 3
+    assert executor.get(wakeup.operation_id) is wakeup
+    assert executor.get("missing") is None
+
+    # Check that a blocked cart blocks neither the caller nor other carts.
+    battery.release("broken")
+    assert not broken.future.result(timeout=1.0)
+    assert broken.status == OperationStatus.FAILED
+    assert "No feedback" in broken.error
+    # Check that operations of the same cart run one at a time in order.
+    assert idle.status == OperationStatus.PENDING
+    battery.release("wakeup")
+    battery.release("mode_req_idle")
+    assert wakeup.future.result(timeout=1.0)
+    assert not idle.future.result(timeout=1.0)
+    assert wakeup.status == OperationStatus.SUCCEEDED
+    assert idle.status == OperationStatus.FAILED
+    assert battery.started.index(("ChargePal1", "wakeup")) < battery.started.index(
+        ("ChargePal1", "mode_req_idle")
+    )
+    assert not executor.cart_queues
+
+    # Check that finished operations expire.
+    executor.retention = 0.0
+    executor.submit("wakeup", "ChargePal1").future.result(timeout=1.0)
+    executor.submit("wakeup", "ChargePal2")
+    assert executor.get(wakeup.operation_id) is None
+    executor.shutdown()
+
+
+def test_shutdown() -> None:
+    battery = FakeBattery()
+    executor = BatteryOperationExecutor(battery.run)
+    running = executor.submit("wakeup", "ChargePal1")
+    queued = executor.submit("mode_req_standby", "ChargePal1")
+    executor.shutdown()
+    assert queued.status == OperationStatus.FAILED
+    assert not queued.future.result(timeout=1.0)
+    battery.release("wakeup")
+    assert running.future.result(timeout=1.0)
+    assert ("ChargePal1", "mode_req_standby") not in battery.started
+
+
+if __name__ == "__main__":
+    test_operations()
+    test_shutdown()
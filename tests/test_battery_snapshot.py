@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+from typing import List
+import time
+from chargepal_local_server import battery_communication
+from chargepal_local_server.battery_snapshot import BatterySnapshot, SnapshotCache
+
+
+def create_snapshot(
+    battery_name: str, flag_modus: str = "Flag_idle"
+) -> BatterySnapshot:
+    return BatterySnapshot(
+        battery_name,
+        error_mode=0,
+        mode_bat_only=1,
+        flag_modus=flag_modus,
+        car_inlet_unlocked=0,
+        charger_inlet_unlocked=1,
+        feedback="standby_ok",
+        read_time=time.monotonic(),
+    )
+
+
+def test_snapshot_cache() -> None:
+    reads: List[str] = []
+
+    def read(battery_name: str) -> BatterySnapshot:
+        reads.append(battery_name)
+        return create_snapshot(battery_name)
+
+    cache = SnapshotCache(read, ttl=60.0)
+    snapshot = cache.get("ChargePal1")
+    assert cache.get("ChargePal1") is snapshot
+    assert cache.get("ChargePal2") is not snapshot
+    assert reads == ["ChargePal1", "ChargePal2"]
+    # Check that max_age and invalidate() force new reads.
+    assert cache.get("ChargePal1", max_age=0.0) is not snapshot
+    cache.invalidate("ChargePal2")
+    cache.get("ChargePal2")
+    assert reads == ["ChargePal1", "ChargePal2", "ChargePal1", "ChargePal2"]
+
+
+def test_snapshot_decisions() -> None:
+    snapshot = create_snapshot("ChargePal1", "FLAG_EV_AC_CHARGE")
+    assert not snapshot.has_error()
+    assert snapshot.has_flag("Flag_EV_AC_Charge")
+    assert not snapshot.has_flag("Flag_idle")
+    assert snapshot.get_plug_unlocked("ADS_1") == 0
+    assert snapshot.get_plug_unlocked("BCS_1") == 1
+    assert battery_communication.is_charging(snapshot)
+
+    reads: List[str] = []
+
+    def read(battery_name: str) -> BatterySnapshot:
+        reads.append(battery_name)
+        return snapshot
+
+    snapshots = battery_communication.battery_snapshots
+    battery_communication.battery_snapshots = SnapshotCache(read)
+    try:
+        # Check that states already reached are decided from one snapshot.
+        assert battery_communication.wakeup("ChargePal1")
+        assert battery_communication.mode_req_EV_AC_Charge("ChargePal1")
+        assert battery_communication.mode_req_standby("ChargePal1")
+        assert not battery_communication.mode_req_emergency_shutdown("ChargePal1")
+        assert reads == ["ChargePal1"]
+    finally:
+        battery_communication.battery_snapshots = snapshots
+
+
+if __name__ == "__main__":
+    test_snapshot_cache()
+    test_snapshot_decisions()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+from typing import Callable, ContextManager, Iterator
+from contextlib import contextmanager
+import os
+import sqlite3
+import tempfile
+import time
+from chargepal_local_server import access_ldb, update_pdb
+from chargepal_local_server.access_ldb import LDB, SQLite3Access
+from chargepal_local_server.changelog import ChangeLog, Dialect, get_ddl
+from chargepal_local_server.create_pdb import create_default_db
+from chargepal_local_server.sqlite_connection import copy_database
+from chargepal_local_server.update_pdb import copy_from_ldb
+
+
+def get_access(filepath: str) -> Callable[[], ContextManager[sqlite3.Cursor]]:
+    """Return a function accessing the database at filepath with a new connection."""
+
+    @contextmanager
+    def access() -> Iterator[sqlite3.Cursor]:
+        connection = sqlite3.connect(filepath)
+        try:
+            yield connection.cursor()
+            connection.commit()
+        finally:
+            connection.close()
+
+    return access
+
+
+def test_changelog() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        access = get_access(os.path.join(directory, "test.db"))
+        with access() as cursor:
+            cursor.execute("CREATE TABLE robot_info (name TEXT, robot_location TEXT);")
+            cursor.execute("INSERT INTO robot_info VALUES ('ChargePal1', 'RBS_1');")
+        changelog = ChangeLog(access, Dialect.SQLITE, {"robot_info": "name"})
+        changelog.install()
+        # Check reporting all rows as changed before the first acknowledgement.
+        batch = changelog.consume()
+        assert batch.get_keys("robot_info") is None
+        changelog.ack(batch)
+        assert changelog.consume().get_keys("robot_info") == set()
+        # Check logging inserts, updates, and deletes.
+        with access() as cursor:
+            cursor.execute("INSERT INTO robot_info VALUES ('ChargePal2', 'RBS_2');")
+            cursor.execute("UPDATE robot_info SET robot_location = 'ADS_1';")
+            cursor.execute("DELETE FROM robot_info WHERE name = 'ChargePal1';")
+        batch = changelog.consume()
+        assert batch.get_keys("robot_info") == {"ChargePal1", "ChargePal2"}
+        # Check delivering changes again until they are acknowledged.
+        assert changelog.consume() == batch
+        assert changelog.consume(limit=1).get_keys("robot_info") == {"ChargePal2"}
+        assert changelog.ack(batch)
+        assert not changelog.ack(batch)
+        changelog.compact()
+        with access() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM changelog;")
+            assert cursor.fetchone()[0] == 0
+        changelog.reset()
+        assert changelog.consume().get_keys("robot_info") is None
+        changelog.uninstall()
+        with access() as cursor:
+            cursor.execute("DELETE FROM robot_info;")
+            cursor.execute("SELECT COUNT(*) FROM changelog;")
+            assert cursor.fetchone()[0] == 0
+
+
+def test_changelog_gaps() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        access = get_access(os.path.join(directory, "test.db"))
+        with access() as cursor:
+            cursor.execute("CREATE TABLE robot_info (name TEXT, robot_location TEXT);")
+        changelog = ChangeLog(access, Dialect.SQLITE, {"robot_info": "name"})
+        changelog.install()
+        changelog.ack(changelog.consume())
+
+        def log_change(seq: int, robot_name: str) -> None:
+            with access() as cursor:
+                cursor.execute(
+                    "INSERT INTO changelog VALUES (?, 'robot_info', ?);",
+                    (seq, robot_name),
+                )
+
+        # Check that a change visible after one with a greater seq is not missed.
+        log_change(2, "ChargePal2")
+        batch = changelog.consume()
+        assert batch.seq == 2 and batch.gaps == {1}
+        assert changelog.ack(batch)
+        changelog.compact()
+        log_change(1, "ChargePal1")
+        changelog.compact()
+        batch = changelog.consume()
+        assert batch.get_keys("robot_info") == {"ChargePal1"}
+        assert changelog.ack(batch)
+        assert not changelog.gaps
+        # Check syncing all rows if a skipped seq does not appear in time.
+        log_change(4, "ChargePal4")
+        changelog.ack(changelog.consume())
+        changelog.compact()
+        changelog.gap_timeout = 0.0
+        time.sleep(0.01)
+        batch = changelog.consume()
+        assert batch.get_keys("robot_info") is None and batch.seq == 4
+        changelog.ack(batch)
+        assert changelog.consume().get_keys("robot_info") == set()
+
+
+def test_changelogs_on_same_database() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        access = get_access(os.path.join(directory, "test.db"))
+        with access() as cursor:
+            cursor.execute("CREATE TABLE robot_info (name TEXT, robot_location TEXT);")
+            cursor.execute("CREATE TABLE cart_info (name TEXT, cart_location TEXT);")
+        # Note: Report any skipped sequence number at once by syncing all rows.
+        robot_changelog = ChangeLog(
+            access, Dialect.SQLITE, {"robot_info": "name"}, "changelog_robots", 0.0
+        )
+        cart_changelog = ChangeLog(
+            access, Dialect.SQLITE, {"cart_info": "name"}, "changelog_carts", 0.0
+        )
+        for changelog in (robot_changelog, cart_changelog):
+            changelog.install()
+            changelog.ack(changelog.consume())
+        # Check that compacting one change log does not skip changes of the other.
+        for number in range(1, 4):
+            with access() as cursor:
+                cursor.execute(
+                    f"INSERT INTO robot_info VALUES ('ChargePal{number}', 'RBS_1');"
+                )
+                cursor.execute(
+                    f"INSERT INTO cart_info VALUES ('BAT_{number}', 'BWS_1');"
+                )
+            for changelog, table, key in (
+                (robot_changelog, "robot_info", f"ChargePal{number}"),
+                (cart_changelog, "cart_info", f"BAT_{number}"),
+            ):
+                batch = changelog.consume()
+                assert batch.get_keys(table) == {key}
+                assert changelog.ack(batch)
+                changelog.compact()
+                assert not changelog.gaps
+
+
+def test_mysql_ddl() -> None:
+    statements = get_ddl(Dialect.MYSQL, {"CAN_MSG_RX_LIVE": "Battry_ID"})
+    assert "AUTO_INCREMENT" in statements[0]
+    assert statements[1] == "DROP TRIGGER IF EXISTS changelog_CAN_MSG_RX_LIVE_insert;"
+    assert statements[2].endswith(
+        "FOR EACH ROW INSERT INTO changelog (table_name, row_key)"
+        " VALUES ('CAN_MSG_RX_LIVE', NEW.Battry_ID);"
+    )
+
+
+def test_sync_with_changelog() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        # Note: Install the triggers into a copy of ldb to keep the original intact.
+        filepath = os.path.join(directory, "ldb.db")
+        copy_database(access_ldb.SQLITE_DB_FILEPATH, filepath)
+        original_filepath = access_ldb.SQLITE_DB_FILEPATH
+        access_ldb.SQLITE_DB_FILEPATH = filepath
+        SQLite3Access.pool.close_all()
+        try:
+            check_sync_with_changelog()
+        finally:
+            SQLite3Access.pool.close_all()
+            access_ldb.SQLITE_DB_FILEPATH = original_filepath
+
+
+def check_sync_with_changelog() -> None:
+    create_default_db()
+    update_pdb.use_changelogs()
+    try:
+        update_pdb.reset_sync()
+        robot_names = LDB.fetch_env_infos()["robot_names"]
+        assert copy_from_ldb().changed_robots == set(robot_names)
+        # Check syncing only the robot logged as changed.
+        robot_name = robot_names[0]
+        robot_location = LDB.fetch_by_first_header(
+            "robot_info", ["name", "robot_location"]
+        )[robot_name]["robot_location"]
+        LDB.update_location("RBS_99", robot_name)
+        assert copy_from_ldb().changed_robots == {robot_name}
+        report = copy_from_ldb()
+        assert not report.changed_robots and not report.changed_carts
+        LDB.update_location(robot_location, robot_name)
+    finally:
+        update_pdb.use_changelogs(False)
+
+
+if __name__ == "__main__":
+    test_changelog()
+    test_changelog_gaps()
+    test_changelogs_on_same_database()
+    test_mysql_ddl()
+    test_sync_with_changelog()
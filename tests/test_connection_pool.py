@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import os
+import sqlite3
+import tempfile
+import threading
+from chargepal_local_server.access_ldb import PooledAccess
+from chargepal_local_server.connection_pool import ConnectionPool
+
+
+def create_pool() -> ConnectionPool:
+    return ConnectionPool(
+        lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        lambda connection: bool(connection.execute("SELECT 1;").fetchone()),
+        health_check_interval=0.0,
+    )
+
+
+def test_reuse_per_thread() -> None:
+    pool = create_pool()
+    connection = pool.acquire()
+    assert pool.acquire() is connection
+    other_connections = []
+    thread = threading.Thread(target=lambda: other_connections.append(pool.acquire()))
+    thread.start()
+    thread.join()
+    assert other_connections[0] is not connection
+    statistics = pool.get_statistics()
+    assert statistics["created"] == 2
+    assert statistics["reused"] == 1
+    assert statistics["open"] == 2
+    pool.close_all()
+    assert pool.get_statistics()["open"] == 0
+
+
+def test_reconnect() -> None:
+    pool = create_pool()
+    connection = pool.acquire()
+    # Check replacing a connection which fails its health check.
+    connection.close()
+    new_connection = pool.acquire()
+    assert new_connection is not connection
+    new_connection.execute("SELECT 1;")
+    # Check replacing a discarded connection.
+    pool.discard()
+    assert pool.acquire() is not new_connection
+    statistics = pool.get_statistics()
+    assert statistics["reconnected"] == 1
+    assert statistics["discarded"] == 2
+    assert statistics["created"] == 3
+
+
+def test_nested_access() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        check_nested_access(os.path.join(directory, "nested.db"))
+
+
+def check_nested_access(filepath: str) -> None:
+    class NestedAccess(PooledAccess):
+        pool = ConnectionPool(
+            lambda: sqlite3.connect(filepath, check_same_thread=False),
+            lambda connection: True,
+        )
+
+        def __enter__(self) -> sqlite3.Cursor:
+            return self.cursor
+
+    def count_values() -> int:
+        with sqlite3.connect(filepath) as connection:
+            return connection.execute("SELECT COUNT(*) FROM entries;").fetchone()[0]
+
+    with NestedAccess() as cursor:
+        cursor.execute("CREATE TABLE entries (value INTEGER);")
+    with NestedAccess() as cursor:
+        cursor.execute("INSERT INTO entries VALUES (1);")
+        with NestedAccess() as inner_cursor:
+            inner_cursor.execute("SELECT COUNT(*) FROM entries;")
+        # Check that the inner block did not commit the outer block's write.
+        assert count_values() == 0
+    assert count_values() == 1
+    NestedAccess.pool.close_all()
+
+
+if __name__ == "__main__":
+    test_reuse_per_thread()
+    test_reconnect()
+    test_nested_access()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, create_engine
+from chargepal_local_server.create_pdb import (
+    add_default_ADSs,
+    add_default_carts,
+    add_default_robots,
+)
+from chargepal_local_server.fleet_store import FleetStore
+from chargepal_local_server.pdb_interfaces import Cart, Robot
+
+
+def create_fleet_db(filepath: str) -> Engine:
+    """Return an engine of a new pdb at filepath with two robots, carts, and ADSs."""
+    engine = create_engine(f"sqlite:///{filepath}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        add_default_robots(session, 2)
+        add_default_carts(session, 2)
+        add_default_ADSs(session, 2)
+        session.commit()
+    return engine
+
+
+def test_refresh() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_fleet_db(os.path.join(directory, "pdb.db"))
+        with Session(engine, expire_on_commit=False) as session:
+            store = FleetStore(session)
+            assert [robot.name for robot in store.get_available_robots()] == [
+                "ChargePal1",
+                "ChargePal2",
+            ]
+            assert [
+                station.station_name for station in store.get_free_stations("ADS_")
+            ] == [
+                "ADS_1",
+                "ADS_2",
+            ]
+            # Change robots and carts in pdb like a sync from ldb.
+            with Session(engine) as sync_session:
+                sync_session.get(Robot, "ChargePal1").robot_location = "ADS_1"
+                sync_session.get(Robot, "ChargePal2").available = False
+                cart = sync_session.get(Cart, "BAT_1")
+                cart.cart_location = "ADS_2"
+                cart.available = False
+                sync_session.commit()
+            # Check that only robots and carts with the given names are reloaded.
+            store.refresh(["ChargePal1"], ["BAT_1"])
+            assert store.get_robot("ChargePal1").robot_location == "ADS_1"
+            assert store.get_robot("ChargePal2").available
+            assert store.get_cart("BAT_1").cart_location == "ADS_2"
+            assert [cart.name for cart in store.get_available_carts()] == ["BAT_2"]
+            assert [
+                station.station_name for station in store.get_free_stations("ADS_")
+            ] == ["ADS_1"]
+            store.refresh()
+            assert [robot.name for robot in store.get_available_robots()] == [
+                "ChargePal1"
+            ]
+
+
+def test_available_events() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_fleet_db(os.path.join(directory, "pdb.db"))
+        with Session(engine, expire_on_commit=False) as session:
+            store = FleetStore(session)
+            # Check that setting available updates the available sets at once.
+            store.get_robot("ChargePal1").available = False
+            assert [robot.name for robot in store.get_available_robots()] == [
+                "ChargePal2"
+            ]
+            store.get_station("ADS_2").available = False
+            assert [
+                station.station_name for station in store.get_available_stations()
+            ] == ["ADS_1"]
+            store.get_robot("ChargePal1").available = True
+            assert [robot.name for robot in store.get_available_robots()] == [
+                "ChargePal1",
+                "ChargePal2",
+            ]
+            # Check that objects of other sessions do not change the store.
+            with Session(engine) as other_session:
+                other_session.get(Robot, "ChargePal2").available = False
+                assert "ChargePal2" in store.available_robots
+
+
+def test_rollback() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_fleet_db(os.path.join(directory, "pdb.db"))
+        with Session(engine, expire_on_commit=False) as session:
+            store = FleetStore(session)
+            store.get_robot("ChargePal1").available = False
+            store.get_cart("BAT_1").cart_location = "ADS_1"
+            store.get_station("ADS_2").reservation = "ChargePal2"
+            assert not store.get_free_stations("ADS_")
+            session.rollback()
+            # Check that the store matches pdb again after discarding the changes.
+            assert store.get_robot("ChargePal1").available
+            assert store.get_cart("BAT_1").cart_location == "BWS_1"
+            assert [robot.name for robot in store.get_available_robots()] == [
+                "ChargePal1",
+                "ChargePal2",
+            ]
+            assert [
+                station.station_name for station in store.get_free_stations("ADS_")
+            ] == [
+                "ADS_1",
+                "ADS_2",
+            ]
+
+
+if __name__ == "__main__":
+    test_refresh()
+    test_available_events()
+    test_rollback()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+from typing import Optional
+from datetime import datetime, timedelta
+from chargepal_local_server.job_queue import JobQueue
+from chargepal_local_server.pdb_interfaces import Job
+
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+def create_job(
+    job_type: str, schedule_minutes: int, deadline_minutes: Optional[int] = None
+) -> Job:
+    return Job(
+        type=job_type,
+        state="OPEN",
+        schedule=NOW + timedelta(minutes=schedule_minutes),
+        deadline=(
+            None
+            if deadline_minutes is None
+            else NOW + timedelta(minutes=deadline_minutes)
+        ),
+        currently_assigned=False,
+    )
+
+
+def test_job_queue_order() -> None:
+    queue = JobQueue()
+    retrieve = create_job("RETRIEVE_CHARGER", 0)
+    late = create_job("BRING_CHARGER", 0, 60)
+    urgent = create_job("BRING_CHARGER", 10, 20)
+    stow = create_job("STOW_CHARGER", -5)
+    for job in (retrieve, late, urgent, stow):
+        queue.push(job)
+    assert list(queue) == [urgent, late, stow, retrieve], list(queue)
+    assert queue.peek() is urgent
+    # Discard jobs during iteration.
+    for job in queue:
+        if job.type == "BRING_CHARGER":
+            queue.discard(job)
+    assert list(queue) == [stow, retrieve], list(queue)
+    assert len(queue) == 2
+    assert urgent not in queue
+    queue.push(urgent)
+    assert queue.peek() is urgent
+
+
+if __name__ == "__main__":
+    test_job_queue_order()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+from typing import List
+from chargepal_local_server.mailbox import Mailbox
+
+
+def test_mailbox_order() -> None:
+    handled: List[int] = []
+    notifications: List[None] = []
+    mailbox = Mailbox(on_request=lambda: notifications.append(None))
+    futures = [mailbox.request(handled.append, number) for number in range(5)]
+    assert len(notifications) == 5
+    assert mailbox.handle(max_count=2) == 2
+    assert handled == [0, 1]
+    assert mailbox.handle() == 3
+    assert handled == [0, 1, 2, 3, 4]
+    assert all(future.done() for future in futures)
+    assert mailbox.handle() == 0
+
+
+def test_mailbox_coalescing() -> None:
+    calls: List[str] = []
+
+    def fetch(name: str) -> str:
+        calls.append(name)
+        return f"job of {name}"
+
+    unclaimed: List[str] = []
+    mailbox = Mailbox()
+    first = mailbox.request(fetch, "a", key="a", unclaimed=unclaimed.append)
+    other = mailbox.request(fetch, "b", key="b", unclaimed=unclaimed.append)
+    second = mailbox.request(fetch, "a", key="a", unclaimed=unclaimed.append)
+    assert len(mailbox) == 2
+    assert other.cancel()
+    mailbox.handle()
+    assert calls == ["a", "b"]
+    assert first.result() == second.result() == "job of a"
+    # The result nobody waited for is passed on.
+    assert unclaimed == ["job of b"]
+    # Requests are only coalesced while they are queued.
+    third = mailbox.request(fetch, "a", key="a")
+    mailbox.handle()
+    assert third.result() == "job of a"
+    assert calls == ["a", "b", "a"]
+
+
+def test_mailbox_exception() -> None:
+    mailbox = Mailbox()
+    future = mailbox.request(lambda: 1 / 0)
+    next_future = mailbox.request(int, "1")
+    try:
+        mailbox.handle()
+    except ZeroDivisionError:
+        pass
+    else:
+        assert False, "Exception was not raised."
+    assert isinstance(future.exception(), ZeroDivisionError)
+    # Requests after the failed one are kept.
+    assert mailbox.handle() == 1
+    assert next_future.result() == 1
+
+
+if __name__ == "__main__":
+    test_mailbox_order()
+    test_mailbox_coalescing()
+    test_mailbox_exception()
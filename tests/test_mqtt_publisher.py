@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+from typing import Any, List, Tuple
+from concurrent import futures
+import threading
+import time
+import paho.mqtt.client as mqtt
+from chargepal_local_server.mqtt_publisher import MQTTPublisher
+
+
+class FakeMessageInfo:
+    def __init__(self, mid: int, rc: int) -> None:
+        self.mid = mid
+        self.rc = rc
+
+
+class FakeClient:
+    """In-process stand-in of mqtt.Client with a broker acknowledging messages."""
+
+    def __init__(self) -> None:
+        self.on_connect: Any = None
+        self.on_disconnect: Any = None
+        self.on_publish: Any = None
+        self.max_queued_messages = 0
+        self.connected = False
+        self.connects = 0
+        self.loop_running = False
+        self.next_mid = 0
+        self.queued: List[Tuple[int, str, str]] = []
+        self.delivered: List[Tuple[str, str]] = []
+        self.lock = threading.Lock()
+
+    def reconnect_delay_set(self, min_delay: int, max_delay: int) -> None:
+        pass
+
+    def max_queued_messages_set(self, queue_size: int) -> None:
+        self.max_queued_messages = queue_size
+
+    def connect_async(self, host: str, port: int, keepalive: int) -> None:
+        pass
+
+    def loop_start(self) -> None:
+        self.loop_running = True
+        self.connect()
+
+    def loop_stop(self) -> None:
+        self.loop_running = False
+
+    def connect(self) -> None:
+        """Connect and deliver queued messages like paho's network loop."""
+        self.connects += 1
+        self.connected = True
+        self.on_connect(self, None, {}, 0, None)
+        with self.lock:
+            queued = list(self.queued)
+            self.queued.clear()
+        for mid, topic, payload in queued:
+            self.deliver(mid, topic, payload)
+
+    def disconnect(self) -> None:
+        self.connected = False
+        self.on_disconnect(self, None, {}, 0, None)
+
+    def deliver(self, mid: int, topic: str, payload: str) -> None:
+        with self.lock:
+            self.delivered.append((topic, payload))
+        self.on_publish(self, None, mid, 0, None)
+
+    def publish(self, topic: str, payload: str, qos: int = 0) -> FakeMessageInfo:
+        with self.lock:
+            if 0 < self.max_queued_messages <= len(self.queued):
+                return FakeMessageInfo(0, mqtt.MQTT_ERR_QUEUE_SIZE)
+            self.next_mid += 1
+            mid = self.next_mid
+            if not self.connected:
+                self.queued.append((mid, topic, payload))
+                return FakeMessageInfo(mid, mqtt.MQTT_ERR_NO_CONN)
+        # Acknowledge from another thread like the broker.
+        threading.Thread(target=self.deliver, args=(mid, topic, payload)).start()
+        return FakeMessageInfo(mid, mqtt.MQTT_ERR_SUCCESS)
+
+
+def test_persistent_connection() -> None:
+    client = FakeClient()
+    publisher = MQTTPublisher("localhost", 1883, 60, client=client)
+    with futures.ThreadPoolExecutor(4) as executor:
+        results = list(
+            executor.map(
+                lambda index: publisher.publish(f"ChargePal{index % 2}_ORDER", "1"),
+                range(20),
+            )
+        )
+    assert all(results)
+    assert client.connects == 1
+    assert len(client.delivered) == 20
+    statistics = publisher.get_statistics()
+    assert statistics["published"] == statistics["confirmed"] == 20
+    assert statistics["connected"] == 1
+    assert statistics["waiting"] == 0
+    assert 0.0 < statistics["latency_mean"] <= statistics["latency_max"]
+    publisher.stop()
+    assert not client.loop_running
+
+
+def test_reconnect_and_queue_limit() -> None:
+    client = FakeClient()
+    publisher = MQTTPublisher(
+        "localhost", 1883, 60, max_queued_messages=2, publish_timeout=0.1, client=client
+    )
+    publisher.start()
+    client.disconnect()
+    # Check that messages published while disconnected are queued up to the limit.
+    assert not publisher.publish("ChargePal1_ORDER", "1")
+    assert not publisher.publish("ChargePal1_ORDER", "2")
+    assert not publisher.publish("ChargePal1_ORDER", "3")
+    statistics = publisher.get_statistics()
+    assert statistics["timeouts"] == 2
+    assert statistics["rejected"] == 1
+    assert statistics["connected"] == 0
+
+    # Check that queued messages are delivered after reconnecting.
+    client.connect()
+    assert client.delivered == [("ChargePal1_ORDER", "1"), ("ChargePal1_ORDER", "2")]
+    assert publisher.publish("ChargePal1_ORDER", "4")
+    statistics = publisher.get_statistics()
+    assert statistics["confirmed"] == 3
+    assert statistics["connects"] == 2
+    assert statistics["disconnects"] == 1
+    assert not publisher.abandoned_mids
+    publisher.stop()
+
+
+def test_reused_message_id() -> None:
+    client = FakeClient()
+    publisher = MQTTPublisher("localhost", 1883, 60, publish_timeout=0.1, client=client)
+    publisher.start()
+    client.disconnect()
+    assert not publisher.publish("ChargePal1_ORDER", "1")
+    assert publisher.abandoned_mids == {1}
+    # Let the abandoned message be lost and its message id be reused.
+    client.queued.clear()
+    client.next_mid = 0
+    publisher.publish_timeout = 5.0
+    with futures.ThreadPoolExecutor(1) as executor:
+        result = executor.submit(publisher.publish, "ChargePal1_ORDER", "2")
+        while publisher.get_statistics()["waiting"] == 0:
+            time.sleep(0.01)
+        client.connect()
+        # Check that the confirmation is not taken for the abandoned message.
+        assert result.result()
+    assert not publisher.abandoned_mids
+    publisher.stop()
+
+
+if __name__ == "__main__":
+    test_persistent_connection()
+    test_reconnect_and_queue_limit()
+    test_reused_message_id()
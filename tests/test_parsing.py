@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+from datetime import datetime, timedelta
+from chargepal_local_server.parsing import (
+    clear_caches,
+    parse_any,
+    parse_datetime,
+    parse_datetime_string,
+    parse_number,
+    parse_timedelta,
+)
+
+
+def test_parse_datetime() -> None:
+    assert parse_datetime("2024-01-02 03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+    # Check the fallback for fields without leading zeros.
+    assert parse_datetime("2024-1-2 3:4:5") == datetime(2024, 1, 2, 3, 4, 5)
+    now = datetime.now()
+    assert parse_datetime(now) is now
+    for invalid in (None, "", "None", "2024-01-02", "2024-01-02 03:04:05.6"):
+        assert parse_datetime(invalid) is None, invalid
+
+
+def test_parse_timedelta() -> None:
+    assert parse_timedelta("01:30:15") == timedelta(hours=1, minutes=30, seconds=15)
+    assert parse_timedelta("100:0:0") == timedelta(hours=100)
+    for invalid in (None, "", "1:30", "01:30:15.5"):
+        assert parse_timedelta(invalid) is None, invalid
+
+
+def test_parse_any() -> None:
+    assert parse_any("2024-01-02 03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+    assert parse_any("00:45:00") == timedelta(minutes=45)
+    assert parse_any("42") == 42
+    assert parse_number("042") is None
+    for obj in ("042", "ADS_1", "", None, 1.5):
+        assert parse_any(obj) == obj, obj
+
+
+def test_cache() -> None:
+    clear_caches()
+    for _ in range(3):
+        parse_datetime("2024-01-02 03:04:05")
+    cache_info = parse_datetime_string.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (2, 1)
+    clear_caches()
+    assert parse_datetime_string.cache_info().currsize == 0
+
+
+if __name__ == "__main__":
+    test_parse_datetime()
+    test_parse_timedelta()
+    test_parse_any()
+    test_cache()
@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import os
-import shutil
 from sqlmodel import Session, select
-from chargepal_local_server import debug_sqlite_db
+from chargepal_local_server import debug_sqlite_db, update_pdb
 from chargepal_local_server.access_ldb import LDB
 from chargepal_local_server.create_ldb_orders import create_sample_booking
 from chargepal_local_server.create_pdb import create_default_db
 from chargepal_local_server.pdb_interfaces import Cart, Robot, pdb_engine
 from chargepal_local_server.planner import BookingState
-from chargepal_local_server.update_pdb import copy_from_ldb, fetch_updated_bookings
+from chargepal_local_server.sqlite_connection import copy_database
+from chargepal_local_server.update_pdb import (
+    SyncStatistics,
+    Watermark,
+    copy_from_ldb,
+    fetch_updated_bookings,
+)
 
 
 def get_absolute_filepath(relative_filepath: str) -> str:
@@ -51,7 +58,7 @@ def test_database_consistency() -> None:
 
 
 def test_pdb_update() -> None:
-    shutil.copyfile(
+    copy_database(
         get_absolute_filepath("ldb_no_orders.db"),
         get_absolute_filepath("../src/chargepal_local_server/db/ldb.db"),
     )
@@ -64,18 +71,106 @@ def test_pdb_update() -> None:
     create_sample_booking()
     charging_session_id, _ = LDB.get_session_statuses()[-1]
     assert not fetch_updated_bookings()
-    copy_from_ldb()
+    assert copy_from_ldb().bookings == SyncStatistics(inserted=1)
     updated_bookings = fetch_updated_bookings()
     assert len(updated_bookings) == 1, updated_bookings
     assert not fetch_updated_bookings()
+    assert copy_from_ldb().bookings == SyncStatistics()
+    assert copy_from_ldb(full_sync=True).bookings == SyncStatistics(unchanged=1)
     # Check fetching one update and one new booking.
     LDB.update_session_status(charging_session_id, BookingState.READY)
     create_sample_booking()
-    copy_from_ldb()
+    with ThreadPoolExecutor(1) as executor:
+        report = copy_from_ldb(executor=executor)
+    assert report.bookings == SyncStatistics(inserted=1, updated=1)
     updated_bookings = fetch_updated_bookings()
     assert len(updated_bookings) == 2, updated_bookings
+    # Check forgetting a canceled booking once it is fetched.
+    LDB.update_session_status(charging_session_id, BookingState.CANCELED)
+    copy_from_ldb()
+    assert int(charging_session_id) not in update_pdb.booking_hashes.keys()
+    assert list(fetch_updated_bookings().keys()) == [int(charging_session_id)]
+    # Check syncing a booking without last_change after the first sync.
+    create_sample_booking()
+    charging_session_id, _ = LDB.get_session_statuses()[-1]
+    with LDB.get() as cursor:
+        cursor.execute(
+            "UPDATE orders_in SET last_change = NULL WHERE charging_session_id = ?;",
+            (charging_session_id,),
+        )
+    assert copy_from_ldb().bookings == SyncStatistics(inserted=1)
+    assert copy_from_ldb().bookings == SyncStatistics()
+    with LDB.get() as cursor:
+        cursor.execute(
+            "UPDATE orders_in SET charging_session_status = ?"
+            " WHERE charging_session_id = ?;",
+            (BookingState.READY, charging_session_id),
+        )
+    assert copy_from_ldb().bookings == SyncStatistics(updated=1)
+    assert list(fetch_updated_bookings().keys()) == [int(charging_session_id)]
+
+
+def test_robot_cart_sync() -> None:
+    create_default_db()
+    update_pdb.reset_sync()
+    report = copy_from_ldb()
+    robot_names = LDB.fetch_env_infos()["robot_names"]
+    assert report.changed_robots == set(robot_names)
+    # Check copying nothing if ldb did not change.
+    report = copy_from_ldb()
+    assert not report.changed_robots and not report.changed_carts
+    # Check copying only the robot which changed.
+    robot_name = robot_names[0]
+    robot_location = {
+        robot_info[0]: robot_info[1]
+        for robot_info in debug_sqlite_db.select("robot_info")
+    }[robot_name]
+    LDB.update_location("RBS_99", robot_name)
+    report = copy_from_ldb()
+    assert report.changed_robots == {robot_name}
+    assert not report.changed_carts
+    with Session(pdb_engine) as session:
+        robot = session.exec(select(Robot).where(Robot.name == robot_name)).one()
+        assert robot.robot_location == "RBS_99"
+    LDB.update_location(robot_location, robot_name)
+    assert copy_from_ldb(full_sync=True).changed_robots == set(robot_names)
+
+
+def test_watermark() -> None:
+    watermark = Watermark()
+    assert not watermark.get_condition()
+    now = datetime(2024, 1, 1, 12)
+    booked = (1, "booked", now)
+    watermark.update([(now, booked)])
+    assert watermark.get_condition() == (
+        " WHERE last_change >= '2024-01-01 12:00:00' OR last_change IS NULL"
+    )
+    assert not watermark.is_new(booked)
+    # Copy updates within the same second, even back to a previous row.
+    checked_in = (1, "checked_in", now)
+    assert watermark.is_new(checked_in)
+    watermark.update([(now, checked_in)])
+    assert not watermark.is_new(checked_in)
+    assert watermark.is_new(booked)
+    # Move the mark to later updates.
+    later = now + timedelta(seconds=1)
+    watermark.update([(now, (2, "booked", now)), (later, (1, "ready", later))])
+    assert watermark.last_change == later
+    assert watermark.is_new(checked_in)
+    # Copy rows without last_change whenever they differ from their last copy.
+    unchanged = (3, "booked", None)
+    assert watermark.is_new(unchanged)
+    watermark.update([(None, unchanged)])
+    assert watermark.last_change == later
+    assert not watermark.is_new(unchanged)
+    assert watermark.is_new((3, "ready", None))
+    watermark.reset()
+    assert not watermark.get_condition()
+    assert watermark.is_new(unchanged)
 
 
 if __name__ == "__main__":
     test_database_consistency()
     test_pdb_update()
+    test_robot_cart_sync()
+    test_watermark()
@@ -11,11 +11,13 @@ are not suited as real-time tests.
 from typing import Iterable, Optional, Type
 from types import TracebackType
 from concurrent import futures
-from chargepal_local_server.communication_pb2 import Response_Job
+from datetime import timedelta
+from chargepal_local_server.communication_pb2 import Request, Response_Job
 from chargepal_local_server import communication_pb2_grpc
 import grpc
 import logging
 import os
+import threading
 import time
 from chargepal_local_server import create_ldb, debug_sqlite_db
 from chargepal_local_server.access_ldb import LDB
@@ -50,7 +52,8 @@ class Environment:
             for number, name in enumerate(env_infos["robot_names"], start=1)
         }
 
-        self.planner = Planner()
+        # Note: Ticks are triggered manually, so do not wait for the planner on fetches.
+        self.planner = Planner(reply_timeout=0.0)
 
     def __enter__(self) -> "Environment":
         os.chdir(os.path.dirname(__file__))
@@ -69,6 +72,8 @@ class Environment:
     ) -> None:
         os.chdir(self.cwd)
         self.planner.active = False
+        # Release the port so that later environments do not share it.
+        self.server.stop(None)
 
     def wait_for_job(
         self,
@@ -117,6 +122,48 @@ def test_recharge_self() -> None:
             ), f"Robot got job but should not have: {response.job}"
 
 
+def test_fetch_job_in_one_round_trip() -> None:
+    with Environment(CONFIG_ALL_ONE) as environment:
+        environment.planner.reply_timeout = 5.0
+        thread = threading.Thread(target=environment.planner.run)
+        thread.start()
+        try:
+            client = environment.robot_clients["ChargePal1"]
+            # A first fetch may be needed to make the robot available for a new job,
+            # then the planner schedules the job and returns it within the request.
+            for _ in range(2):
+                response, _ = client.fetch_job()
+                if response.job.job_type:
+                    break
+            assert response.job.job_type == JobType.RECHARGE_SELF, response.job
+        finally:
+            environment.planner.stop()
+            thread.join()
+
+
+def test_subscribe_jobs() -> None:
+    with Environment(CONFIG_ALL_ONE) as environment:
+        thread = threading.Thread(target=environment.planner.run)
+        thread.start()
+        try:
+            stub = communication_pb2_grpc.CommunicationStub(
+                grpc.insecure_channel("localhost:55555")
+            )
+            request = Request(robot_name="ChargePal1")
+            # Receive the job without polling.
+            stream = stub.SubscribeJobs(request, timeout=10.0)
+            job = next(stream).job
+            assert job.job_type == JobType.RECHARGE_SELF, job
+            stream.cancel()
+            # Receive the ongoing job again after reconnecting.
+            stream = stub.SubscribeJobs(request, timeout=10.0)
+            assert next(stream).job.job_id == job.job_id
+            stream.cancel()
+        finally:
+            environment.planner.stop()
+            thread.join()
+
+
 def test_bring_and_recharge() -> None:
     monitoring = Monitoring(SCENARIO2)
     with Environment(SCENARIO2.config) as environment:
@@ -322,12 +369,49 @@ def test_cancel_booking() -> None:
         environment.wait_for_job(client, JobType.BRING_CHARGER)
 
 
+def test_lookahead_staging() -> None:
+    config = Config(
+        ADS_count=2,
+        BWS_names=["BWS_1", "BWS_2"],
+        robot_locations={"ChargePal1": "RBS_1"},
+        cart_locations={"BAT_1": "BWS_1"},
+    )
+    with Environment(config) as environment:
+        environment.planner.lookahead_horizon = timedelta(hours=1)
+        client = environment.robot_clients["ChargePal1"]
+        create_sample_booking(drop_location="ADS_2", charging_session_status="booked")
+        charging_session_id, _ = LDB.get_session_statuses()[-1]
+        # Stage BAT_1 at BWS_2, which is nearer to ADS_2, before check-in.
+        job = environment.wait_for_job(client, JobType.STOW_CHARGER)
+        assert job.cart == "BAT_1" and job.target_station == "BWS_2", job
+        client.update_job_monitor("STOW_CHARGER", "Success")
+        LDB.update_session_status(charging_session_id, BookingState.CHECKED_IN)
+        job = environment.wait_for_job(client, JobType.BRING_CHARGER)
+        assert job.cart == "BAT_1" and job.source_station == "BWS_2", job
+
+
+def test_single_transaction() -> None:
+    with Environment(CONFIG_ALL_ONE) as environment:
+        environment.planner.single_transaction = True
+        client = environment.robot_clients["ChargePal1"]
+        create_sample_booking(drop_location="ADS_1")
+        job = environment.wait_for_job(client, JobType.BRING_CHARGER)
+        client.update_job_monitor("BRING_CHARGER", "Success")
+        environment.wait_for_job(client, JobType.RECHARGE_SELF)
+        assert not environment.planner.get_cart(job.cart).available, job.cart
+        assert not environment.planner.session.in_transaction()
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     test_recharge_self()
+    test_fetch_job_in_one_round_trip()
+    test_subscribe_jobs()
     test_bring_and_recharge()
     test_failures()
     test_two_twice_in_parallel()
     test_status_update()
     test_plug_in_handshake()
     test_cancel_booking()
+    test_lookahead_staging()
+    test_single_transaction()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+from typing import Dict, List
+import queue
+import threading
+import time
+import grpc
+from chargepal_local_server import communication_pb2_grpc
+from chargepal_local_server.battery_operations import BatteryOperationExecutor
+from chargepal_local_server.communication_pb2 import Request
+from chargepal_local_server.server import CommunicationServicer, create_server
+
+
+class FakePlanner:
+    """Planner answering job subscriptions with queues which never get a job."""
+
+    def __init__(self, robot_count: int, cart_count: int = 6) -> None:
+        self.robot_count = robot_count
+        self.cart_count = cart_count
+        self.lock = threading.Lock()
+        self.subscriptions: List[queue.Queue] = []
+
+    def subscribe_jobs(self, robot_name: str) -> queue.Queue:
+        subscription: queue.Queue = queue.Queue()
+        with self.lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe_jobs(self, robot_name: str, subscription: queue.Queue) -> None:
+        pass
+
+    def fetch_job(self, robot_name: str) -> Dict[str, str]:
+        return {"robot_name": robot_name}
+
+
+def test_unary_rpc_with_open_streams() -> None:
+    planner = FakePlanner(robot_count=10)
+    servicer = CommunicationServicer(planner)
+    server = create_server(servicer)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    channel = grpc.insecure_channel(f"localhost:{port}")
+    streams = []
+    try:
+        stub = communication_pb2_grpc.CommunicationStub(channel)
+        streams = [
+            stub.SubscribeJobs(Request(robot_name=f"ChargePal{number}"))
+            for number in range(1, planner.robot_count + 1)
+        ]
+        deadline = time.monotonic() + 5.0
+        while len(planner.subscriptions) < planner.robot_count:
+            assert time.monotonic() < deadline, "Streams were not started."
+            time.sleep(0.01)
+        # Check that unary RPCs are served while each robot holds a stream.
+        response = stub.OperationTime(Request(cart_name="BAT_1"), timeout=5.0)
+        assert response.msec == 30000
+    finally:
+        for stream in streams:
+            stream.cancel()
+        channel.close()
+        server.stop(0)
+        servicer.battery_operations.shutdown()
+
+
+def test_battery_request_timeout() -> None:
+    release = threading.Event()
+
+    def run(request_name: str, cart_name: str, station_name: str) -> bool:
+        return release.wait(5.0)
+
+    servicer = CommunicationServicer(FakePlanner(robot_count=1))
+    servicer.battery_operations.shutdown()
+    servicer.battery_operations = BatteryOperationExecutor(run)
+    servicer.battery_request_timeout = 0.1
+    try:
+        request = Request(request_name="wakeup", cart_name="BAT_1")
+        # Check that a battery request taking too long fails instead of blocking.
+        assert not servicer.BatteryCommunication(request, None).success
+        release.set()
+        servicer.battery_request_timeout = 5.0
+        assert servicer.BatteryCommunication(request, None).success
+    finally:
+        release.set()
+        servicer.battery_operations.shutdown()
+
+
+def test_unary_rpc_with_battery_requests() -> None:
+    planner = FakePlanner(robot_count=1, cart_count=10)
+    servicer = CommunicationServicer(planner)
+    lock = threading.Lock()
+    started: List[str] = []
+    release = threading.Event()
+
+    def run(request_name: str, cart_name: str, station_name: str) -> bool:
+        with lock:
+            started.append(cart_name)
+        return release.wait(10.0)
+
+    servicer.battery_operations.shutdown()
+    servicer.battery_operations = BatteryOperationExecutor(run, planner.cart_count)
+    server = create_server(servicer)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    channel = grpc.insecure_channel(f"localhost:{port}")
+    try:
+        stub = communication_pb2_grpc.CommunicationStub(channel)
+        calls = [
+            stub.BatteryCommunication.future(
+                Request(request_name="wakeup", cart_name=f"BAT_{number}")
+            )
+            for number in range(1, planner.cart_count + 1)
+        ]
+        deadline = time.monotonic() + 5.0
+        while len(started) < planner.cart_count:
+            assert time.monotonic() < deadline, "Battery requests were not started."
+            time.sleep(0.01)
+        # Check that jobs are fetched while each cart waits for its battery.
+        response = stub.FetchJob(Request(robot_name="ChargePal1"), timeout=5.0)
+        assert response.job.robot_name == "ChargePal1"
+        release.set()
+        assert all(call.result(timeout=5.0).success for call in calls)
+    finally:
+        release.set()
+        channel.close()
+        server.stop(0)
+        servicer.battery_operations.shutdown()
+
+
+if __name__ == "__main__":
+    test_unary_rpc_with_open_streams()
+    test_battery_request_timeout()
+    test_unary_rpc_with_battery_requests()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+from chargepal_local_server.sqlite_connection import (
+    PROFILE_ENVIRONMENT_VARIABLE,
+    connect,
+    copy_database,
+    get_pragmas,
+)
+
+
+def test_pragma_profiles() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        connection = connect(os.path.join(directory, "test.db"), "wal")
+        assert connection.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+        assert connection.execute("PRAGMA synchronous;").fetchone()[0] == 1
+        connection.close()
+        connection = connect(os.path.join(directory, "legacy.db"), "legacy")
+        assert connection.execute("PRAGMA journal_mode;").fetchone()[0] == "delete"
+        connection.close()
+    os.environ[PROFILE_ENVIRONMENT_VARIABLE] = "durable"
+    try:
+        assert get_pragmas()["synchronous"] == "FULL"
+    finally:
+        del os.environ[PROFILE_ENVIRONMENT_VARIABLE]
+    try:
+        get_pragmas("unknown")
+        assert False, "Unknown profile was accepted."
+    except ValueError:
+        pass
+
+
+def test_copy_database() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        source_filepath = os.path.join(directory, "source.db")
+        target_filepath = os.path.join(directory, "target.db")
+        source = connect(source_filepath, "wal")
+        source.execute("CREATE TABLE entries (value INTEGER);")
+        source.execute("INSERT INTO entries VALUES (1);")
+        source.commit()
+        # Check copying committed rows still in the write-ahead log.
+        copy_database(source_filepath, target_filepath, journal_mode="DELETE")
+        source.close()
+        target = connect(target_filepath, "legacy")
+        assert target.execute("SELECT value FROM entries;").fetchall() == [(1,)]
+        target.close()
+        # Check that a missing source is not created as an empty database.
+        missing_filepath = os.path.join(directory, "missing.db")
+        try:
+            copy_database(missing_filepath, target_filepath)
+        except FileNotFoundError:
+            pass
+        else:
+            assert False, "Copying a missing database did not fail."
+        assert not os.path.exists(missing_filepath)
+
+
+if __name__ == "__main__":
+    test_pragma_profiles()
+    test_copy_database()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+from typing import Dict, Optional, Tuple
+import os
+import tempfile
+from sqlmodel import Session, SQLModel, create_engine
+from chargepal_local_server.create_pdb import add_default_ADSs, add_default_carts
+from chargepal_local_server.fleet_store import FleetStore
+from chargepal_local_server.station_occupancy import (
+    StationOccupancy,
+    parse_station_names,
+)
+
+
+STATION_NAMES = ["ADS_1", "ADS_2", "BCS_1", "BWS_1", "BWS_2"]
+
+
+def get_index(occupancy: StationOccupancy) -> Tuple[object, ...]:
+    return (
+        {name: carts for name, carts in occupancy.station_carts.items() if carts},
+        occupancy.reservations,
+        {prefix: names for prefix, names in occupancy.free_stations.items() if names},
+    )
+
+
+def build(
+    cart_locations: Dict[str, str], reservations: Dict[str, Optional[str]]
+) -> StationOccupancy:
+    """Return the occupancy built at once from cart_locations and reservations."""
+    occupancy = StationOccupancy(STATION_NAMES)
+    for station_name, reservation in reservations.items():
+        occupancy.update_reservation(station_name, reservation)
+    for cart_name, location in cart_locations.items():
+        occupancy.update_cart_location(cart_name, location)
+    return occupancy
+
+
+def test_free_stations() -> None:
+    assert parse_station_names("ADS_1_BCS_2") == ["ADS_1", "BCS_2"]
+    assert parse_station_names(None) == []
+    occupancy = StationOccupancy(STATION_NAMES)
+    assert occupancy.get_free_stations("ADS_") == {"ADS_1", "ADS_2"}
+    assert occupancy.get_free_stations("BWS_") == {"BWS_1", "BWS_2"}
+    assert occupancy.get_free_stations("RBS_") == set()
+    assert occupancy.get_free_stations("XYZ_") == set()
+
+    # Check that occupancy moves with the cart's location.
+    occupancy.update_cart_location("BAT_1", "BWS_1")
+    assert occupancy.get_free_stations("BWS_") == {"BWS_2"}
+    occupancy.update_cart_location("BAT_1", "ADS_1")
+    assert occupancy.get_free_stations("BWS_") == {"BWS_1", "BWS_2"}
+    assert occupancy.get_free_stations("ADS_") == {"ADS_2"}
+    # Check that a station stays occupied while another cart is located there.
+    occupancy.update_cart_location("BAT_2", "ADS_1")
+    occupancy.update_cart_location("BAT_1", "BCS_1")
+    assert occupancy.get_free_stations("ADS_") == {"ADS_2"}
+    assert occupancy.get_free_stations("BCS_") == set()
+    # Check that stations not known before are added.
+    occupancy.update_cart_location("BAT_2", "BCS_2")
+    assert occupancy.get_free_stations("ADS_") == {"ADS_1", "ADS_2"}
+    assert occupancy.is_occupied("BCS_2")
+
+
+def test_reservations() -> None:
+    occupancy = StationOccupancy(STATION_NAMES)
+    occupancy.update_reservation("ADS_2", "BAT_1")
+    assert occupancy.get_free_stations("ADS_") == {"ADS_1"}
+    occupancy.update_reservation("ADS_2", "BAT_2")
+    assert occupancy.reservations == {"ADS_2": "BAT_2"}
+    # Check that a released station stays occupied by a cart located there.
+    occupancy.update_cart_location("BAT_2", "ADS_2")
+    occupancy.update_reservation("ADS_2", None)
+    assert occupancy.get_free_stations("ADS_") == {"ADS_1"}
+    occupancy.update_cart_location("BAT_2", "BWS_2")
+    assert occupancy.get_free_stations("ADS_") == {"ADS_1", "ADS_2"}
+    occupancy.update_reservation("ADS_1", "")
+    assert not occupancy.reservations
+
+
+def test_rebuild() -> None:
+    cart_locations = {"BAT_1": "BWS_1", "BAT_2": "BWS_2"}
+    reservations: Dict[str, Optional[str]] = {}
+    occupancy = build(cart_locations, reservations)
+    for cart_name, location, station_name, reservation in (
+        ("BAT_1", "ADS_1", "ADS_2", "BAT_2"),
+        ("BAT_2", "ADS_2", "ADS_2", None),
+        ("BAT_1", "BCS_1", "BWS_1", "BAT_1"),
+        ("BAT_1", "BWS_1", "BWS_1", None),
+        ("BAT_2", "ADS_1_BCS_1", "ADS_2", "BAT_3"),
+    ):
+        occupancy.update_cart_location(cart_name, location)
+        occupancy.update_reservation(station_name, reservation)
+        cart_locations[cart_name] = location
+        reservations[station_name] = reservation
+        # Check that incremental updates give the same index as a full rebuild.
+        assert get_index(occupancy) == get_index(build(cart_locations, reservations))
+
+
+def test_fleet_store_occupancy() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'pdb.db')}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            add_default_carts(session, 2)
+            add_default_ADSs(session, 2)
+            session.commit()
+        with Session(engine, expire_on_commit=False) as session:
+            store = FleetStore(session)
+            # Check writing the location of a delivered cart like Planner.update_job().
+            store.get_cart("BAT_1").cart_location = "ADS_1"
+            assert store.occupancy.get_free_stations("ADS_") == {"ADS_2"}
+            assert store.occupancy.get_free_stations("BWS_") == {"BWS_1"}
+            store.get_station("ADS_2").reservation = "BAT_2"
+            assert not store.get_free_stations("ADS_")
+            store.get_station("ADS_2").reservation = None
+            assert [
+                station.station_name for station in store.get_free_stations("ADS_")
+            ] == ["ADS_2"]
+            session.commit()
+        # Check that loading from pdb gives the same index.
+        with Session(engine) as other_session:
+            loaded_store = FleetStore(other_session)
+            assert get_index(store.occupancy) == get_index(loaded_store.occupancy)
+
+
+if __name__ == "__main__":
+    test_free_stations()
+    test_reservations()
+    test_rebuild()
+    test_fleet_store_occupancy()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+from concurrent import futures
+from sqlalchemy.pool import NullPool
+from sqlmodel import create_engine, text
+from chargepal_local_server import access_ldb
+from chargepal_local_server.access_ldb import SQLite3Access, use_statement_listener
+from chargepal_local_server.tick_profiler import PhaseExecutor, TICK, TickProfiler
+import logging
+import os
+import tempfile
+import threading
+import time
+
+
+def test_phase_statistics() -> None:
+    engine = create_engine("sqlite://", poolclass=NullPool)
+    profiler = TickProfiler(window=10)
+    profiler.count_statements(engine)
+    for _ in range(20):
+        with profiler.tick():
+            with profiler.phase("query"):
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                    connection.execute(text("SELECT 2"))
+            with profiler.phase("sleep"):
+                time.sleep(0.001)
+    # Statements executed outside of ticks are not counted.
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 3"))
+    # Statements from other threads are not counted either.
+    with profiler.tick():
+
+        def execute() -> None:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 4"))
+
+        thread = threading.Thread(target=execute)
+        thread.start()
+        thread.join()
+
+    statistics = profiler.get_statistics()
+    assert set(statistics.keys()) == {TICK, "query", "sleep"}
+    assert statistics[TICK]["count"] == 21
+    assert statistics["query"]["count"] == 20
+    assert statistics["query"]["sql"] == 2.0
+    assert statistics[TICK]["sql"] == 1.8
+    sleep = statistics["sleep"]
+    assert 1.0 <= sleep["p50_ms"] <= sleep["p95_ms"] <= sleep["max_ms"]
+    assert "query" in profiler.get_report()
+
+
+def test_slow_tick_report(caplog) -> None:
+    profiler = TickProfiler(slow_tick_threshold=0.01)
+    with caplog.at_level(logging.WARNING):
+        with profiler.tick():
+            with profiler.phase("fast"):
+                pass
+        assert not caplog.records
+        with profiler.tick():
+            with profiler.phase("slow"):
+                time.sleep(0.02)
+    assert len(caplog.records) == 1
+    assert "slow" in caplog.records[0].getMessage()
+
+
+def test_phases_in_threads() -> None:
+    engine = create_engine("sqlite://", poolclass=NullPool)
+    profiler = TickProfiler()
+    profiler.count_statements(engine)
+    executor = PhaseExecutor(profiler, futures.ThreadPoolExecutor(2))
+
+    def fetch_rows() -> int:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        time.sleep(0.01)
+        return 2
+
+    try:
+        with profiler.tick():
+            with profiler.phase("submit"):
+                future = executor.submit(fetch_rows)
+                other_future = executor.submit_phase("fetch_other_rows", fetch_rows)
+            with profiler.phase("wait"):
+                assert future.result() == other_future.result() == 2
+    finally:
+        executor.shutdown()
+    # Check that functions run in other threads are measured as their own phases.
+    statistics = profiler.get_statistics()
+    assert statistics["fetch_rows"]["sql"] == 2.0
+    assert statistics["fetch_rows"]["max_ms"] >= 10.0
+    assert statistics["fetch_other_rows"]["sql"] == 2.0
+    assert statistics["submit"]["sql"] == statistics["wait"]["sql"] == 0.0
+    assert statistics[TICK]["sql"] == 4.0
+
+
+def test_pooled_statements() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        original_filepath = access_ldb.SQLITE_DB_FILEPATH
+        access_ldb.SQLITE_DB_FILEPATH = os.path.join(directory, "ldb.db")
+        SQLite3Access.pool.close_all()
+        profiler = TickProfiler()
+        use_statement_listener(profiler.on_execute)
+        try:
+            with profiler.tick():
+                with profiler.phase("read_ldb"):
+                    with SQLite3Access() as cursor:
+                        cursor.execute("CREATE TABLE robot_info (name TEXT);")
+                        cursor.executemany(
+                            "INSERT INTO robot_info VALUES (?);", [("ChargePal1",)]
+                        )
+                        cursor.execute("SELECT name FROM robot_info;")
+                        assert cursor.fetchall() == [("ChargePal1",)]
+        finally:
+            use_statement_listener(None)
+            SQLite3Access.pool.close_all()
+            access_ldb.SQLITE_DB_FILEPATH = original_filepath
+    statistics = profiler.get_statistics()
+    assert statistics["read_ldb"]["sql"] == 3.0
+    assert statistics[TICK]["sql"] == 3.0
+
+
+if __name__ == "__main__":
+    test_phase_statistics()
+    test_phases_in_threads()
+    test_pooled_statements()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+from typing import Dict, Iterable, List, Tuple
+from concurrent import futures
+import threading
+import time
+from chargepal_local_server.waiter import ConditionWaiter, RowValues
+
+
+class FakeTable:
+    """Rows of tables in memory, counting reads."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, Dict[str, Dict[str, object]]] = {}
+        self.reads: List[Tuple[str, List[str], List[str]]] = []
+        self.lock = threading.Lock()
+
+    def read(
+        self, table: str, columns: Iterable[str], keys: Iterable[str]
+    ) -> RowValues:
+        with self.lock:
+            self.reads.append((table, list(columns), list(keys)))
+            return {
+                key: dict(values)
+                for key, values in self.rows.get(table, {}).items()
+                if key in keys
+            }
+
+
+def test_condition_met() -> None:
+    table = FakeTable()
+    table.rows["CAN_MSG_RX_LIVE"] = {"ChargePal1": {"Mode_Bat_only": 0}}
+    waiter = ConditionWaiter(table.read, poll_interval=0.01, max_poll_interval=0.05)
+    with futures.ThreadPoolExecutor(1) as executor:
+        future = executor.submit(
+            waiter.wait_for, "CAN_MSG_RX_LIVE", "ChargePal1", "Mode_Bat_only", 1, 5.0
+        )
+        time.sleep(0.1)
+        assert not future.done()
+        with table.lock:
+            table.rows["CAN_MSG_RX_LIVE"]["ChargePal1"]["Mode_Bat_only"] = 1
+        assert future.result(timeout=1.0)
+
+
+def test_timeout() -> None:
+    table = FakeTable()
+    waiter = ConditionWaiter(table.read, poll_interval=0.01, max_poll_interval=0.05)
+    start_time = time.monotonic()
+    assert not waiter.wait_for("CAN_MSG_RX_LIVE", "ChargePal1", "Mode_Bat_only", 1, 0.2)
+    assert 0.2 <= time.monotonic() - start_time < 1.0
+    # Check that the poller backed off instead of busy-waiting.
+    assert waiter.poll_count < 20
+
+
+def test_shared_polls() -> None:
+    table = FakeTable()
+    table.rows["TX_ChargeOrdersFeedback"] = {
+        f"ChargePal{index}": {"Bat_State_actual": "standby"} for index in range(4)
+    }
+    waiter = ConditionWaiter(table.read, poll_interval=0.01, max_poll_interval=0.05)
+    with futures.ThreadPoolExecutor(4) as executor:
+        results = [
+            executor.submit(
+                waiter.wait_for,
+                "TX_ChargeOrdersFeedback",
+                f"ChargePal{index}",
+                "Bat_State_actual",
+                "idle",
+                5.0,
+            )
+            for index in range(4)
+        ]
+        time.sleep(0.1)
+        with table.lock:
+            for values in table.rows["TX_ChargeOrdersFeedback"].values():
+                values["Bat_State_actual"] = "idle"
+        assert all(result.result(timeout=1.0) for result in results)
+    # Check that waiters share one read per poll.
+    assert len(table.reads) == waiter.poll_count
+    assert max(len(keys) for _, _, keys in table.reads) > 1
+
+
+if __name__ == "__main__":
+    test_condition_met()
+    test_timeout()
+    test_shared_polls()